@@ -13,6 +13,7 @@ import argparse
 import importlib.util
 import time
 import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 # Add the AddonSystem directory to path so we can import spz
@@ -25,15 +26,47 @@ except ImportError:
     print("Error: Could not import spz module. Make sure spz.py is in the AddonSystem directory.")
     sys.exit(1)
 
-# Try to import FastAPI (optional - will fall back if not available)
-try:
-    from fastapi import FastAPI
-    import uvicorn
-    FASTAPI_AVAILABLE = True
-except ImportError:
-    FASTAPI_AVAILABLE = False
-    print("Warning: FastAPI not available. Install with: pip install fastapi uvicorn")
-    print("HTTP REST API will not be available.")
+
+class StartupTimer:
+    """Wall time of each startup phase, printed as a breakdown once the server is up"""
+    
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._phases = []
+    
+    @contextmanager
+    def phase(self, name, overlapped=False):
+        """Time the enclosed block as one phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases.append((name, time.perf_counter() - start, overlapped))
+    
+    def report(self):
+        """Print every phase and the total time since the timer was created"""
+        total = time.perf_counter() - self._start
+        print("Startup timing:")
+        for name, seconds, overlapped in self._phases:
+            note = "  (while waiting for Unity)" if overlapped else ""
+            print(f"  {name:<20} {seconds * 1000:8.1f} ms{note}")
+        print(f"  {'total':<20} {total * 1000:8.1f} ms")
+
+
+def import_http_server():
+    """Import the FastAPI HTTP server module (optional - returns None if not available)
+    
+    FastAPI is slow to import, so main() does this while it waits for Unity.
+    """
+    try:
+        import http_server
+        return http_server
+    except ImportError:
+        print("Warning: FastAPI not available. Install with: pip install fastapi uvicorn")
+        print("HTTP REST API will not be available.")
+    except Exception as e:
+        print(f"[Add-on Server] Warning: Could not load HTTP server: {e}")
+    return None
 
 
 def discover_addons(addons_dir):
@@ -61,8 +94,12 @@ def discover_addons(addons_dir):
     return addons
 
 
-def load_addon(addon_info):
-    """Load and register an add-on"""
+def import_addon(addon_info):
+    """Import an add-on's module without registering it
+    
+    Importing doesn't need Unity, so main() does it while waiting for the
+    connection. Returns the module, or None if it could not be loaded.
+    """
     addon_id = addon_info["id"]
     init_file = addon_info["init_file"]
     
@@ -71,39 +108,59 @@ def load_addon(addon_info):
         spec = importlib.util.spec_from_file_location(f"addon_{addon_id}", init_file)
         if spec is None or spec.loader is None:
             print(f"Error: Could not load add-on {addon_id}")
-            return False
+            return None
         
         module = importlib.util.module_from_spec(spec)
         sys.modules[f"addon_{addon_id}"] = module
         spec.loader.exec_module(module)
-        
-        # Call register() if it exists
-        if hasattr(module, "register"):
-            try:
-                module.register()
-                print(f"Registered add-on: {addon_id}")
-                return True
-            except Exception as e:
-                print(f"Error registering add-on {addon_id}: {e}")
-                return False
-        else:
-            print(f"Warning: Add-on {addon_id} has no register() function")
-            return False
+        return module
             
     except Exception as e:
         print(f"Error loading add-on {addon_id}: {e}")
         import traceback
         traceback.print_exc()
+        return None
+
+
+def register_addon(addon_id, module):
+    """Call an imported add-on's register() (needs the Unity connection)"""
+    if not hasattr(module, "register"):
+        print(f"Warning: Add-on {addon_id} has no register() function")
+        return False
+    try:
+        module.register()
+        print(f"Registered add-on: {addon_id}")
+        return True
+    except Exception as e:
+        print(f"Error registering add-on {addon_id}: {e}")
         return False
 
 
+def load_addon(addon_info):
+    """Load and register an add-on"""
+    module = import_addon(addon_info)
+    return module is not None and register_addon(addon_info["id"], module)
+
+
 def main():
     parser = argparse.ArgumentParser(description="StableProjectorz Add-on Server")
     parser.add_argument("--port", type=int, default=5555, help="Port to connect to Unity (default: 5555)")
     parser.add_argument("--http-port", type=int, default=5557, help="Port for HTTP REST API (default: 5557)")
     parser.add_argument("--addons-dir", type=str, default=None, help="Path to Addons directory")
     parser.add_argument("--no-http", action="store_true", help="Disable HTTP REST API server")
+    parser.add_argument("--json-codec", type=str, default=None, choices=["auto", "orjson", "ujson", "json"],
+                        help="JSON codec for Unity and HTTP traffic (default: SPZ_JSON_CODEC or auto)")
+    parser.add_argument("--cache-ttl", type=float, default=0.0,
+                        help="Seconds to cache per-mesh reads for add-ons and HTTP GETs (default: 0, off)")
     args = parser.parse_args()
+    timer = StartupTimer()
+    
+    # Select the JSON codec before the HTTP server is imported so both sides use it
+    if args.json_codec:
+        try:
+            spz.set_json_codec(args.json_codec)
+        except ImportError as e:
+            print(f"Warning: {e}; using {spz.get_json_codec()}")
     
     # Determine addons directory
     if args.addons_dir:
@@ -115,71 +172,79 @@ def main():
     
     print(f"StableProjectorz Add-on Server")
     print(f"Addons directory: {addons_dir}")
+    print(f"JSON codec: {spz.get_json_codec()}")
     print(f"Connecting to Unity on port {args.port}...")
     
     # Initialize API connection
     api = spz.get_api()
+    if args.cache_ttl > 0:
+        api.enable_cache(ttl=args.cache_ttl)
+        print(f"Scene cache: {args.cache_ttl}s")
+    
+    # Discover and import add-ons (and the HTTP server) while waiting for
+    # Unity; only register() and serving requests need the connection
+    prepared = {"addons": [], "modules": [], "http_server": None}
+    
+    def prepare():
+        with timer.phase("discover add-ons", overlapped=True):
+            prepared["addons"] = discover_addons(addons_dir)
+        with timer.phase("import add-ons", overlapped=True):
+            prepared["modules"] = [(info["id"], import_addon(info)) for info in prepared["addons"]]
+        if not args.no_http:
+            with timer.phase("import HTTP server", overlapped=True):
+                prepared["http_server"] = import_http_server()
     
-    # Wait for connection (Unity might not be ready yet)
-    max_retries = 30
-    retry_count = 0
-    connected = False
+    preparer = threading.Thread(target=prepare, daemon=True)
+    preparer.start()
     
-    while retry_count < max_retries:
+    # Wait for Unity (it might not be ready yet): cheap pings with exponential backoff
+    with timer.phase("wait for Unity"):
         try:
-            # Try a simple request to test connection
-            api.cameras.get_pos(0)
-            connected = True
-            break
-        except Exception as e:
-            retry_count += 1
-            if retry_count < max_retries:
-                print(f"Waiting for Unity connection... ({retry_count}/{max_retries})")
-                time.sleep(1)
-            else:
-                print(f"Failed to connect to Unity: {e}")
-                return 1
-    
-    if not connected:
-        print("Could not establish connection to Unity")
-        return 1
+            api.wait_until_ready(timeout=30.0)
+        except TimeoutError as e:
+            print(f"Failed to connect to Unity: {e}")
+            return 1
     
     print("Connected to Unity!")
+    preparer.join()
     
-    # Discover and load add-ons
-    addons = discover_addons(addons_dir)
-    
+    addons = prepared["addons"]
     if not addons:
         print("No add-ons found")
+        timer.report()
         return 0
     
     print(f"Loading {len(addons)} add-on(s)...")
     
     loaded_count = 0
-    for addon_info in addons:
-        if load_addon(addon_info):
-            loaded_count += 1
+    with timer.phase("register add-ons"):
+        for addon_id, module in prepared["modules"]:
+            if module is not None and register_addon(addon_id, module):
+                loaded_count += 1
     
     print(f"Loaded {loaded_count}/{len(addons)} add-on(s)")
     
     # Start HTTP server if FastAPI is available and not disabled
     http_thread = None
-    if FASTAPI_AVAILABLE and not args.no_http:
-        try:
-            from http_server import start_server, set_api_instance
-            set_api_instance(api)
-            
-            # Start HTTP server in background thread
-            http_thread = threading.Thread(
-                target=start_server,
-                args=("127.0.0.1", args.http_port),
-                daemon=True
-            )
-            http_thread.start()
-            print(f"[Add-on Server] HTTP REST API available on port {args.http_port}")
-            print(f"[Add-on Server] API docs: http://127.0.0.1:{args.http_port}/docs")
-        except Exception as e:
-            print(f"[Add-on Server] Warning: Could not start HTTP server: {e}")
+    http_server = prepared["http_server"]
+    if http_server is not None:
+        with timer.phase("start HTTP server"):
+            try:
+                http_server.set_api_instance(api)
+                
+                # Start HTTP server in background thread
+                http_thread = threading.Thread(
+                    target=http_server.start_server,
+                    args=("127.0.0.1", args.http_port),
+                    daemon=True
+                )
+                http_thread.start()
+                print(f"[Add-on Server] HTTP REST API available on port {args.http_port}")
+                print(f"[Add-on Server] API docs: http://127.0.0.1:{args.http_port}/docs")
+            except Exception as e:
+                print(f"[Add-on Server] Warning: Could not start HTTP server: {e}")
+    
+    timer.report()
     
     # Keep server running
     print("Add-on server running. Press Ctrl+C to stop.")
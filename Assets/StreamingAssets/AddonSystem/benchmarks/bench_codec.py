@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON codec encode/decode time for typical batch payloads
+
+Measures every installed codec (orjson, ujson, stdlib json) on:
+  - a set_mesh_positions request with 10k entries (encode)
+  - a get_all_camera_positions-style reply with 10k entries (decode)
+  - a JSON-RPC batch array of 1k set_mesh_visibility requests (encode)
+
+Usage:
+    python bench_codec.py [--count 10000] [--repeat 5]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import spz
+
+
+def available_codecs():
+    """Names of the codecs that can be loaded here"""
+    names = []
+    for name in ("orjson", "ujson", "json"):
+        try:
+            spz._make_codec(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def best_of(repeat, func, *args):
+    """Best wall time of func(*args) over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs")
+    parser.add_argument("--count", type=int, default=10000, help="Vectors per payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    
+    positions = [{"x": i * 0.001, "y": -i * 0.5, "z": 3.25} for i in range(args.count)]
+    set_positions = {
+        "jsonrpc": "2.0",
+        "method": "spz.cmd.set_mesh_positions",
+        "params": {"mesh_ids": list(range(args.count)), "positions": positions},
+        "id": 1
+    }
+    reply = {"jsonrpc": "2.0", "result": {"success": True, "positions": positions}, "id": "1"}
+    batch = [
+        {"jsonrpc": "2.0", "method": "spz.cmd.set_mesh_visibility",
+         "params": {"mesh_id": i, "visible": False}, "id": i}
+        for i in range(1000)
+    ]
+    
+    print(f"{'codec':<8} {'encode set_positions':>22} {'decode reply':>14} {'encode batch':>14}")
+    for name in available_codecs():
+        dumps, loads = spz._make_codec(name)
+        encoded_reply = dumps(reply)
+        encode = best_of(args.repeat, dumps, set_positions)
+        decode = best_of(args.repeat, loads, encoded_reply)
+        encode_batch = best_of(args.repeat, dumps, batch)
+        print(f"{name:<8} {encode * 1000:>20.2f}ms {decode * 1000:>12.2f}ms {encode_batch * 1000:>12.2f}ms")
+    print(f"\nspz is using: {spz.get_json_codec()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
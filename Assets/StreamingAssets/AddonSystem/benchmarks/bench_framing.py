@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: receiving large newline-framed replies
+
+Compares the old receive loop (4096-byte recv + bytes concatenation) with
+spz._MessageReader on multi-megabyte replies shaped like get_all_mesh_ids and
+get_all_camera_positions results. No Unity instance is needed; replies are
+streamed through a local socket pair.
+
+Usage:
+    python bench_framing.py [--sizes 1 4 16] [--repeat 3]
+"""
+
+import sys
+import json
+import socket
+import threading
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import spz
+
+
+def make_reply(target_mb):
+    """Build a get_all_camera_positions-style reply of roughly target_mb megabytes"""
+    position = {"x": 123.456789, "y": -98.7654321, "z": 0.5}
+    entry_size = len(json.dumps(position)) + 2
+    count = int(target_mb * 1024 * 1024 / entry_size)
+    reply = {
+        "jsonrpc": "2.0",
+        "result": {"success": True, "positions": [position] * count},
+        "id": "1"
+    }
+    return (json.dumps(reply) + "\n").encode("utf-8")
+
+
+def old_receive(sock):
+    """The original SPZClient receive loop"""
+    response_data = b""
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        response_data += chunk
+        if b"\n" in response_data:
+            break
+    return json.loads(response_data.decode("utf-8").strip())
+
+
+def new_receive(sock):
+    """Receive through spz._MessageReader"""
+    return json.loads(spz._MessageReader(sock).read_message())
+
+
+def time_receive(receive, payload):
+    """Stream payload through a socket pair and time how long receive() takes"""
+    reader, writer = socket.socketpair()
+    sender = threading.Thread(target=writer.sendall, args=(payload,))
+    try:
+        start = time.perf_counter()
+        sender.start()
+        result = receive(reader)
+        elapsed = time.perf_counter() - start
+    finally:
+        sender.join()
+        reader.close()
+        writer.close()
+    assert result["id"] == "1"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark large reply framing")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="Reply sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    
+    print(f"{'size':>8} {'old loop':>12} {'_MessageReader':>15} {'speedup':>9}")
+    for size_mb in args.sizes:
+        payload = make_reply(size_mb)
+        old = min(time_receive(old_receive, payload) for _ in range(args.repeat))
+        new = min(time_receive(new_receive, payload) for _ in range(args.repeat))
+        print(f"{len(payload) / 1e6:>6.1f}MB {old * 1000:>10.1f}ms {new * 1000:>13.1f}ms {old / new:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk transform setters from Python lists vs NumPy arrays
+
+Builds set_mesh_positions / set_mesh_rotations requests the way
+ModelsAPI.set_positions / set_rotations do - validation included - and
+encodes them for both wire formats. Compares a list of tuples, a float64
+(n, k) array and a float32 (n, k) array. No Unity instance is needed.
+
+Usage:
+    python bench_setters.py [--counts 1000 10000 100000] [--repeat 5]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import spz
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def best_of(repeat, func, *args):
+    """Best wall time of func(*args) over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def build(mesh_ids, name, vectors, keys, binary):
+    """Validate and encode one bulk setter request"""
+    params = spz._bulk_params(mesh_ids, name, vectors, keys)
+    return spz._encode_request(1, "spz.cmd.set_mesh_" + name, params, binary)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk setters from lists vs NumPy arrays")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000], help="Meshes per request")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    
+    if np is None:
+        print("NumPy is not installed (pip install numpy)")
+        return 1
+    
+    rng = np.random.default_rng(0)
+    print(f"codec: {spz.get_json_codec()}")
+    print(f"{'request':<20} {'input':<10} {'ndjson':>10} {'binary':>10} {'speedup':>8}")
+    for count in args.counts:
+        mesh_ids = np.arange(count) % 65536  # mesh ids are ushort
+        for name, keys in (("positions", "xyz"), ("rotations", "xyzw")):
+            vectors64 = rng.uniform(-100.0, 100.0, (count, len(keys)))
+            inputs = (
+                ("list", mesh_ids.tolist(), [tuple(v) for v in vectors64.tolist()]),
+                ("float64", mesh_ids, vectors64),
+                ("float32", mesh_ids.astype(np.uint16), vectors64.astype(np.float32)),
+            )
+            baseline = None
+            for label, ids, vectors in inputs:
+                ndjson = best_of(args.repeat, build, ids, name, vectors, keys, False)
+                binary = best_of(args.repeat, build, ids, name, vectors, keys, True)
+                baseline = baseline or binary
+                print(f"{name + ' x' + str(count):<20} {label:<10} {ndjson * 1000:>8.2f}ms {binary * 1000:>8.2f}ms "
+                      f"{baseline / binary:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NDJSON vs negotiated binary framing for bulk transform requests
+
+Encodes set_mesh_positions / set_mesh_rotations requests the way
+ModelsAPI builds them and reports the bytes on the wire and the client-side
+encode time for each protocol. No Unity instance is needed.
+
+Usage:
+    python bench_wire.py [--counts 1000 10000 100000] [--repeat 5]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import spz
+
+
+def best_of(repeat, func, *args):
+    """Best wall time of func(*args) over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_params(count, keys):
+    """set_mesh_* params for count random vectors with the given components"""
+    vectors = [tuple(random.uniform(-100.0, 100.0) for _ in keys) for _ in range(count)]
+    return {
+        "mesh_ids": spz._Packed("H", [i % 65536 for i in range(count)]),  # mesh ids are ushort
+        "values": spz._Packed("f", spz._flatten_vectors(vectors, keys), keys=keys),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NDJSON vs binary framing")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000], help="Meshes per request")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    
+    print(f"codec: {spz.get_json_codec()}")
+    print(f"{'request':<22} {'ndjson':>12} {'binary':>12} {'size':>7} {'ndjson enc':>11} {'binary enc':>11}")
+    for count in args.counts:
+        for name, keys in (("positions", "xyz"), ("rotations", "xyzw")):
+            params = make_params(count, keys)
+            encode = lambda binary: spz._encode_request(1, "spz.cmd.set_mesh_" + name, params, binary)
+            ndjson_bytes = len(encode(False))
+            binary_bytes = len(encode(True))
+            ndjson_time = best_of(args.repeat, encode, False)
+            binary_time = best_of(args.repeat, encode, True)
+            print(f"{name + ' x' + str(count):<22} {ndjson_bytes / 1e3:>10.1f}KB {binary_bytes / 1e3:>10.1f}KB "
+                  f"{ndjson_bytes / binary_bytes:>6.1f}x {ndjson_time * 1000:>9.2f}ms {binary_time * 1000:>9.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,10 +6,11 @@ Provides REST API endpoints that forward to Unity via JSON-RPC
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import uvicorn
+import asyncio
 import threading
 
 # Import spz for Unity communication
@@ -22,16 +23,23 @@ except ImportError:
 # Global API instance (will be set by addon_server.py)
 _api = None
 
+# Async client used by the endpoints (created lazily on uvicorn's event loop)
+_async_client = None
+
 def set_api_instance(api_instance):
     """Set the global API instance"""
     global _api
     _api = api_instance
 
+# Responses are encoded with orjson when spz selected it (see spz.set_json_codec)
+_response_class = ORJSONResponse if spz.get_json_codec() == "orjson" else JSONResponse
+
 # FastAPI app
 app = FastAPI(
     title="StableProjectorz API",
     description="REST API for controlling StableProjectorz",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=_response_class
 )
 
 # CORS middleware
@@ -63,17 +71,29 @@ class ProjectPath(BaseModel):
     filepath: str
 
 # Helper function to call Unity API
-def call_unity(method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Call Unity via JSON-RPC and return result"""
+def _get_async_client():
+    """Get the asyncio client, connecting to the same Unity port as the API instance"""
+    global _async_client
+    if _async_client is None:
+        client = _api._client
+        _async_client = spz.AsyncSPZClient(client.host, client.port)
+    return _async_client
+
+async def call_unity(method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Call Unity via JSON-RPC and return result
+    
+    Awaits the reply on the asyncio client, so a slow Unity frame doesn't
+    stall other requests being served by the event loop. When the API
+    instance has its scene cache on (addon_server.py --cache-ttl), per-mesh
+    reads are answered from it and writes keep it up to date.
+    """
     if _api is None:
         raise HTTPException(status_code=503, detail="Not connected to Unity")
     
     try:
-        # Use the spz client to send JSON-RPC request
-        # _api is the result of spz.get_api(), which has a _client attribute
-        client = _api._client
-        result = client._send_request(method, params or {})
-        return result
+        if isinstance(_api._client, spz._SceneCache):
+            return await _api._client._send_request_async(_get_async_client(), method, params or {})
+        return await _get_async_client()._send_request(method, params or {})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -84,7 +104,7 @@ def call_unity(method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
 @app.get("/api/v1/cameras/{camera_id}/position")
 async def get_camera_position(camera_id: int):
     """Get camera position"""
-    result = call_unity("spz.cmd.get_camera_pos", {"camera_index": camera_id})
+    result = await call_unity("spz.cmd.get_camera_pos", {"camera_index": camera_id})
     if "success" in result and result["success"]:
         return {
             "x": result.get("x", 0.0),
@@ -96,7 +116,7 @@ async def get_camera_position(camera_id: int):
 @app.post("/api/v1/cameras/{camera_id}/position")
 async def set_camera_position(camera_id: int, position: Position):
     """Set camera position"""
-    result = call_unity("spz.cmd.set_camera_pos", {
+    result = await call_unity("spz.cmd.set_camera_pos", {
         "camera_index": camera_id,
         "x": position.x,
         "y": position.y,
@@ -107,7 +127,7 @@ async def set_camera_position(camera_id: int, position: Position):
 @app.get("/api/v1/cameras/{camera_id}/rotation")
 async def get_camera_rotation(camera_id: int):
     """Get camera rotation"""
-    result = call_unity("spz.cmd.get_camera_rot", {"camera_index": camera_id})
+    result = await call_unity("spz.cmd.get_camera_rot", {"camera_index": camera_id})
     if "success" in result and result["success"]:
         return {
             "x": result.get("x", 0.0),
@@ -120,7 +140,7 @@ async def get_camera_rotation(camera_id: int):
 @app.post("/api/v1/cameras/{camera_id}/rotation")
 async def set_camera_rotation(camera_id: int, rotation: Rotation):
     """Set camera rotation"""
-    result = call_unity("spz.cmd.set_camera_rot", {
+    result = await call_unity("spz.cmd.set_camera_rot", {
         "camera_index": camera_id,
         "x": rotation.x,
         "y": rotation.y,
@@ -132,7 +152,7 @@ async def set_camera_rotation(camera_id: int, rotation: Rotation):
 @app.get("/api/v1/cameras/{camera_id}/fov")
 async def get_camera_fov(camera_id: int):
     """Get camera FOV"""
-    result = call_unity("spz.cmd.get_camera_fov", {"camera_index": camera_id})
+    result = await call_unity("spz.cmd.get_camera_fov", {"camera_index": camera_id})
     if "success" in result and result["success"]:
         return {"fov": result.get("fov", 60.0)}
     raise HTTPException(status_code=404, detail="Camera not found")
@@ -140,7 +160,7 @@ async def get_camera_fov(camera_id: int):
 @app.post("/api/v1/cameras/{camera_id}/fov")
 async def set_camera_fov(camera_id: int, fov: float):
     """Set camera FOV"""
-    result = call_unity("spz.cmd.set_camera_fov", {
+    result = await call_unity("spz.cmd.set_camera_fov", {
         "camera_index": camera_id,
         "fov": float(fov)
     })
@@ -149,19 +169,19 @@ async def set_camera_fov(camera_id: int, fov: float):
 @app.get("/api/v1/cameras/positions")
 async def get_all_camera_positions():
     """Get all camera positions"""
-    result = call_unity("spz.cmd.get_all_camera_positions", {})
+    result = await call_unity("spz.cmd.get_all_camera_positions", {})
     return result
 
 @app.get("/api/v1/cameras/rotations")
 async def get_all_camera_rotations():
     """Get all camera rotations"""
-    result = call_unity("spz.cmd.get_all_camera_rotations", {})
+    result = await call_unity("spz.cmd.get_all_camera_rotations", {})
     return result
 
 @app.get("/api/v1/cameras/fovs")
 async def get_all_camera_fovs():
     """Get all camera FOVs"""
-    result = call_unity("spz.cmd.get_all_camera_fovs", {})
+    result = await call_unity("spz.cmd.get_all_camera_fovs", {})
     return result
 
 # ============================================
@@ -171,13 +191,13 @@ async def get_all_camera_fovs():
 @app.get("/api/v1/meshes")
 async def get_meshes():
     """Get all mesh IDs"""
-    result = call_unity("spz.cmd.get_all_mesh_ids", {})
+    result = await call_unity("spz.cmd.get_all_mesh_ids", {})
     return result
 
 @app.get("/api/v1/meshes/{mesh_id}/position")
 async def get_mesh_position(mesh_id: int):
     """Get mesh position"""
-    result = call_unity("spz.cmd.get_mesh_pos", {"mesh_id": mesh_id})
+    result = await call_unity("spz.cmd.get_mesh_pos", {"mesh_id": mesh_id})
     if "success" in result and result["success"]:
         return {
             "x": result.get("x", 0.0),
@@ -189,7 +209,7 @@ async def get_mesh_position(mesh_id: int):
 @app.post("/api/v1/meshes/{mesh_id}/position")
 async def set_mesh_position(mesh_id: int, position: Position):
     """Set mesh position"""
-    result = call_unity("spz.cmd.set_mesh_pos", {
+    result = await call_unity("spz.cmd.set_mesh_pos", {
         "mesh_id": mesh_id,
         "x": position.x,
         "y": position.y,
@@ -202,7 +222,7 @@ async def set_mesh_positions_batch(request: Dict[str, Any]):
     """Set multiple mesh positions (batch operation)"""
     mesh_ids = request.get("mesh_ids", [])
     positions = request.get("positions", [])
-    result = call_unity("spz.cmd.set_mesh_positions", {
+    result = await call_unity("spz.cmd.set_mesh_positions", {
         "mesh_ids": mesh_ids,
         "positions": positions
     })
@@ -215,8 +235,10 @@ async def set_mesh_positions_batch(request: Dict[str, Any]):
 @app.get("/api/v1/scene/info")
 async def get_scene_info():
     """Get scene information"""
-    total = call_unity("spz.cmd.get_total_mesh_count", {})
-    selected = call_unity("spz.cmd.get_selected_mesh_count", {})
+    total, selected = await asyncio.gather(
+        call_unity("spz.cmd.get_total_mesh_count", {}),
+        call_unity("spz.cmd.get_selected_mesh_count", {})
+    )
     return {
         "total_meshes": total.get("count", 0),
         "selected_meshes": selected.get("count", 0)
@@ -225,13 +247,13 @@ async def get_scene_info():
 @app.post("/api/v1/scene/select_all")
 async def select_all_meshes():
     """Select all meshes"""
-    result = call_unity("spz.cmd.select_all_meshes", {})
+    result = await call_unity("spz.cmd.select_all_meshes", {})
     return result
 
 @app.post("/api/v1/scene/deselect_all")
 async def deselect_all_meshes():
     """Deselect all meshes"""
-    result = call_unity("spz.cmd.deselect_all_meshes", {})
+    result = await call_unity("spz.cmd.deselect_all_meshes", {})
     return result
 
 # ============================================
@@ -241,8 +263,10 @@ async def deselect_all_meshes():
 @app.get("/api/v1/sd/prompt")
 async def get_sd_prompt():
     """Get Stable Diffusion prompts"""
-    positive = call_unity("spz.cmd.get_positive_prompt", {})
-    negative = call_unity("spz.cmd.get_negative_prompt", {})
+    positive, negative = await asyncio.gather(
+        call_unity("spz.cmd.get_positive_prompt", {}),
+        call_unity("spz.cmd.get_negative_prompt", {})
+    )
     return {
         "positive": positive.get("prompt", ""),
         "negative": negative.get("prompt", "")
@@ -253,11 +277,11 @@ async def set_sd_prompt(prompt: Prompt):
     """Set Stable Diffusion prompts"""
     results = {}
     if prompt.positive is not None:
-        results["positive"] = call_unity("spz.cmd.set_positive_prompt", {
+        results["positive"] = await call_unity("spz.cmd.set_positive_prompt", {
             "prompt": prompt.positive
         })
     if prompt.negative is not None:
-        results["negative"] = call_unity("spz.cmd.set_negative_prompt", {
+        results["negative"] = await call_unity("spz.cmd.set_negative_prompt", {
             "prompt": prompt.negative
         })
     return results
@@ -265,14 +289,16 @@ async def set_sd_prompt(prompt: Prompt):
 @app.post("/api/v1/sd/generate")
 async def trigger_sd_generation():
     """Trigger Stable Diffusion generation"""
-    result = call_unity("spz.cmd.trigger_generation", {})
+    result = await call_unity("spz.cmd.trigger_generation", {})
     return result
 
 @app.get("/api/v1/sd/status")
 async def get_sd_status():
     """Get Stable Diffusion status"""
-    is_generating = call_unity("spz.cmd.is_generating", {})
-    is_connected = call_unity("spz.cmd.is_connected", {})
+    is_generating, is_connected = await asyncio.gather(
+        call_unity("spz.cmd.is_generating", {}),
+        call_unity("spz.cmd.is_connected", {})
+    )
     return {
         "generating": is_generating.get("is_generating", False),
         "connected": is_connected.get("is_connected", False)
@@ -281,7 +307,7 @@ async def get_sd_status():
 @app.post("/api/v1/sd/stop")
 async def stop_sd_generation():
     """Stop Stable Diffusion generation"""
-    result = call_unity("spz.cmd.stop_generation", {})
+    result = await call_unity("spz.cmd.stop_generation", {})
     return result
 
 # ============================================
@@ -291,9 +317,11 @@ async def stop_sd_generation():
 @app.get("/api/v1/project/info")
 async def get_project_info():
     """Get project information"""
-    path = call_unity("spz.cmd.get_project_path", {})
-    version = call_unity("spz.cmd.get_project_version", {})
-    data_dir = call_unity("spz.cmd.get_project_data_dir", {})
+    path, version, data_dir = await asyncio.gather(
+        call_unity("spz.cmd.get_project_path", {}),
+        call_unity("spz.cmd.get_project_version", {}),
+        call_unity("spz.cmd.get_project_data_dir", {})
+    )
     return {
         "path": path.get("filepath", ""),
         "version": version.get("version", ""),
@@ -303,7 +331,7 @@ async def get_project_info():
 @app.post("/api/v1/project/save")
 async def save_project(project_path: ProjectPath):
     """Save project"""
-    result = call_unity("spz.cmd.save_project", {
+    result = await call_unity("spz.cmd.save_project", {
         "filepath": project_path.filepath
     })
     return result
@@ -311,7 +339,7 @@ async def save_project(project_path: ProjectPath):
 @app.post("/api/v1/project/load")
 async def load_project(project_path: ProjectPath):
     """Load project"""
-    result = call_unity("spz.cmd.load_project", {
+    result = await call_unity("spz.cmd.load_project", {
         "filepath": project_path.filepath
     })
     return result
@@ -337,7 +365,7 @@ async def health():
         return {"status": "disconnected", "unity": False}
     try:
         # Try a simple call to Unity
-        call_unity("spz.cmd.get_total_mesh_count", {})
+        await call_unity("spz.cmd.get_total_mesh_count", {})
         return {"status": "connected", "unity": True}
     except:
         return {"status": "disconnected", "unity": False}
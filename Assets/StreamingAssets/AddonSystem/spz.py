@@ -5,1070 +5,4284 @@ This module provides a Python interface to communicate with StableProjectorz
 via JSON-RPC over TCP.
 """
 
+import os
+import sys
+import struct
 import socket
+import select
 import json
 import threading
+import asyncio
 import time
+import math
+import copy
+import heapq
+import bisect
+import itertools
+import contextvars
+import mmap
+import tempfile
+import weakref
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
+# Optional faster JSON libraries (picked up automatically when installed)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# Optional NumPy support for bulk arrays
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ============================================
+# JSON Codec
+# ============================================
+
+def _make_codec(name):
+    """Return (dumps, loads) for a codec; dumps returns UTF-8 bytes"""
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed (pip install orjson)")
+        return orjson.dumps, orjson.loads
+    if name == "ujson":
+        if ujson is None:
+            raise ImportError("ujson is not installed (pip install ujson)")
+        return (lambda obj: ujson.dumps(obj, ensure_ascii=False).encode('utf-8'),
+                lambda data: ujson.loads(bytes(data) if isinstance(data, (bytearray, memoryview)) else data))
+    if name == "json":
+        return (lambda obj: json.dumps(obj, separators=(",", ":")).encode('utf-8'),
+                json.loads)
+    raise ValueError(f"Unknown JSON codec: {name} (expected auto, orjson, ujson or json)")
+
+
+def set_json_codec(name="auto"):
+    """Select the JSON codec used for all traffic with StableProjectorz
+    
+    Args:
+        name: "orjson", "ujson", "json" (stdlib) or "auto" for the fastest
+            one installed. The SPZ_JSON_CODEC environment variable sets the
+            initial choice.
+    
+    Returns:
+        str: Name of the codec now in use
+    """
+    global _json_codec, _json_dumps, _json_loads
+    if name == "auto":
+        name = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+    _json_dumps, _json_loads = _make_codec(name)
+    _json_codec = name
+    return name
+
+
+def get_json_codec():
+    """Get the name of the JSON codec in use"""
+    return _json_codec
+
+
+_json_codec = None
+_json_dumps = None
+_json_loads = None
+set_json_codec(os.environ.get("SPZ_JSON_CODEC", "auto"))
+
+
+# ============================================
+# Wire Format
+# ============================================
+#
+# Messages are newline-delimited JSON (NDJSON) unless the connection
+# negotiated binary framing with "spz.sys.handshake". A binary frame is
+#
+#     [uint32 header length][uint32 payload length][JSON header][payload]
+#
+# (lengths little-endian). The header is the usual JSON-RPC message; packed
+# array parameters inside it are {"$f32": [byte offset, count]} (or "$u16",
+# "$u8") references into the payload.
+#
+# A connection may also attach a shared-memory buffer with
+# "spz.sys.shm_attach" (see _SharedMemory). Arrays placed there are
+# referenced as {"$shm": [byte offset, count, "f32"]} in either wire format
+# and never travel over the socket.
+
+_FRAME_PREFIX = struct.Struct("<II")
+
+# array typecode -> dtype name used in packed array references
+_DTYPES = {"f": "f32", "H": "u16", "B": "u8"}
+_TYPECODES = {dtype: typecode for typecode, dtype in _DTYPES.items()}
+_NUMPY_DTYPES = {"f": "<f4", "H": "<u2", "B": "u1"}
+_ITEMSIZES = {typecode: array(typecode).itemsize for typecode in _DTYPES}
+
+
+def _is_ndarray(values):
+    """Whether values is a NumPy array (False when NumPy isn't installed)"""
+    return np is not None and isinstance(values, np.ndarray)
+
+
+class _Packed:
+    """Array parameter sent as packed binary data when the connection allows it
+    
+    On binary connections the values travel in the frame payload as
+    little-endian float32 (typecode "f"), uint16 ("H") or uint8 ("B"); with
+    shared memory attached, large arrays are placed in the shared buffer
+    instead. On NDJSON connections they expand to the JSON the server has
+    always accepted: a list of numbers, or a list of {"x", "y", ...} dicts
+    when keys are given. values may be a flat sequence or a NumPy array.
+    """
+    
+    def __init__(self, typecode, values, keys=None):
+        self.typecode = typecode
+        self.values = values
+        self.keys = keys
+    
+    @property
+    def count(self):
+        """Number of elements"""
+        return self.values.size if _is_ndarray(self.values) else len(self.values)
+    
+    def rows(self, start, end):
+        """_Packed of rows start:end (a row is one value, or one vector when keys are given)"""
+        width = len(self.keys) if self.keys else 1
+        if _is_ndarray(self.values):
+            values = self.values.reshape(-1, width)[start:end]
+        else:
+            values = self.values[start * width:end * width]
+        return _Packed(self.typecode, values, self.keys)
+    
+    def to_json(self):
+        """Plain JSON form of the values"""
+        if not self.keys:
+            return self.values.ravel().tolist() if _is_ndarray(self.values) else list(self.values)
+        width = len(self.keys)
+        if _is_ndarray(self.values):
+            rows = self.values.reshape(-1, width).tolist()
+        else:
+            rows = zip(*[iter(self.values)] * width)
+        return [dict(zip(self.keys, row)) for row in rows]
+    
+    def to_bytes(self):
+        """Little-endian packed form of the values"""
+        if _is_ndarray(self.values):
+            return np.ascontiguousarray(self.values, dtype=_NUMPY_DTYPES[self.typecode]).tobytes()
+        packed = array(self.typecode, self.values)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return packed.tobytes()
+
+
+class _Output:
+    """Placeholder parameter for a bulk result the server may write to shared memory
+    
+    With shared memory attached, the client reserves room for count
+    elements (or uses out, a NumPy array already living in the shared
+    buffer) and passes the range to the server. Otherwise the parameter is
+    left out and the result comes back in the reply.
+    """
+    
+    def __init__(self, typecode, count, out=None):
+        self.typecode = typecode
+        self.count = count
+        self.out = out
+
+
+class _SharedMemory:
+    """Memory-mapped buffer shared with the server for bulk arrays
+    
+    Backed by a temporary file that both processes map, which works the
+    same on Windows and Linux. Arrays of at least min_bytes are copied into
+    a range leased for the duration of one request and sent as a
+    reference; NumPy arrays created with array() already live in the buffer
+    and are sent without any copy.
+    """
+    
+    ALIGNMENT = 64
+    
+    def __init__(self, size, min_bytes=64 * 1024):
+        fd, self.path = tempfile.mkstemp(prefix="spz_shm_", suffix=".bin")
+        try:
+            os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.size = size
+        self.min_bytes = min_bytes
+        self._lock = threading.Lock()
+        self._ranges = {}     # start offset -> end offset of every range in use
+        self._arrays = set()  # start offsets owned by arrays handed out by array()
+        self._address = None  # address of the mapping, for locating NumPy arrays
+    
+    def _allocate(self, nbytes):
+        """Reserve nbytes (first fit); returns the offset or None if nothing fits"""
+        nbytes = -(-max(nbytes, 1) // self.ALIGNMENT) * self.ALIGNMENT
+        with self._lock:
+            start = 0
+            for offset in sorted(self._ranges):
+                if offset - start >= nbytes:
+                    break
+                start = self._ranges[offset]
+            else:
+                if self.size - start < nbytes:
+                    return None
+            self._ranges[start] = start + nbytes
+            return start
+    
+    def release(self, offsets):
+        """Return leased ranges to the buffer"""
+        with self._lock:
+            for offset in offsets:
+                if offset not in self._arrays:
+                    self._ranges.pop(offset, None)
+    
+    def reset(self):
+        """Drop every lease (the connection using them is gone); arrays stay valid"""
+        with self._lock:
+            self._ranges = {offset: end for offset, end in self._ranges.items() if offset in self._arrays}
+    
+    def array(self, shape, dtype="float32"):
+        """NumPy array that lives in the shared buffer
+        
+        Its range is reserved until the array is garbage collected, so keep
+        the array itself (not just a view of it) alive while it is in use.
+        """
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        offset = self._allocate(count * dtype.itemsize)
+        if offset is None:
+            raise MemoryError(f"Shared memory buffer ({self.size} bytes) is full")
+        with self._lock:
+            self._arrays.add(offset)
+        shared = np.frombuffer(self._mmap, dtype, count, offset).reshape(shape)
+        weakref.finalize(shared, self._free_array, offset)
+        return shared
+    
+    def _free_array(self, offset):
+        with self._lock:
+            self._arrays.discard(offset)
+            self._ranges.pop(offset, None)
+    
+    def offset_of(self, values, typecode):
+        """Offset of a NumPy array that already lives in the buffer, else None"""
+        if not _is_ndarray(values) or values.dtype != np.dtype(_NUMPY_DTYPES[typecode]):
+            return None
+        if not values.flags.c_contiguous:
+            return None
+        if self._address is None:
+            mapping = np.frombuffer(self._mmap, np.uint8)
+            self._address = mapping.__array_interface__["data"][0]
+            del mapping
+        offset = values.__array_interface__["data"][0] - self._address
+        return offset if 0 <= offset and offset + values.nbytes <= self.size else None
+    
+    def place(self, packed, leases):
+        """Shared-memory reference for a _Packed value, or None to send it inline"""
+        offset = self.offset_of(packed.values, packed.typecode)
+        if offset is None:
+            nbytes = packed.count * _ITEMSIZES[packed.typecode]
+            if nbytes < self.min_bytes:
+                return None
+            offset = self._allocate(nbytes)
+            if offset is None:
+                return None
+            leases.append(offset)
+            if _is_ndarray(packed.values):
+                target = np.frombuffer(self._mmap, _NUMPY_DTYPES[packed.typecode], packed.count, offset)
+                target[...] = packed.values.reshape(-1)
+                del target
+            else:
+                self._mmap[offset:offset + nbytes] = packed.to_bytes()
+        return {"$shm": [offset, packed.count, _DTYPES[packed.typecode]]}
+    
+    def reserve(self, output, leases):
+        """Shared-memory reference for an _Output, or None to get the result inline"""
+        offset = None
+        if output.out is not None:
+            offset = self.offset_of(output.out, output.typecode)
+        if offset is None:
+            nbytes = output.count * _ITEMSIZES[output.typecode]
+            if nbytes < self.min_bytes:
+                return None
+            offset = self._allocate(nbytes)
+            if offset is None:
+                return None
+            leases.append(offset)
+        return {"$shm": [offset, output.count, _DTYPES[output.typecode]]}
+    
+    def read(self, offset, count, typecode):
+        """Values the server left in the buffer
+        
+        Leased ranges are copied out, since the lease ends with the request;
+        ranges of arrays handed out by array() come back as views.
+        """
+        nbytes = count * _ITEMSIZES[typecode]
+        if offset < 0 or offset + nbytes > self.size:
+            raise ValueError("Shared memory reference out of bounds")
+        if np is not None:
+            with self._lock:
+                owned = offset in self._arrays
+            values = np.frombuffer(self._mmap, _NUMPY_DTYPES[typecode], count, offset)
+            return values if owned else values.copy()
+        values = array(typecode)
+        values.frombytes(self._mmap[offset:offset + nbytes])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+    
+    def close(self):
+        """Unmap the buffer and delete its file"""
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # NumPy arrays still reference it; the mapping goes away with them
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _flatten_vectors(vectors, keys):
+    """Flatten tuples or dicts with the given component keys into one list of floats"""
+    flat = []
+    for vector in vectors:
+        if isinstance(vector, dict):
+            flat.extend(float(vector[key]) for key in keys)
+        else:
+            flat.extend(float(vector[i]) for i in range(len(keys)))
+    return flat
+
+
+# FastPath_API.IsValidFloat rejects components beyond this (and NaN/Inf)
+MAX_REASONABLE_VALUE = 1e6
+
+
+def _vector_values(vectors, keys):
+    """Flat component values for a bulk setter, checked like FastPath_API.IsValidFloat
+    
+    NumPy arrays become (n, width) float32 views (no copy if they already
+    are float32, so shared arrays stay shared) and are validated with array
+    operations; sequences are flattened and checked element by element.
+    
+    Raises:
+        ValueError: On a shape mismatch, or if any component is NaN, infinite
+            or larger than MAX_REASONABLE_VALUE in magnitude
+    """
+    width = len(keys)
+    if _is_ndarray(vectors):
+        if vectors.size % width or (vectors.ndim > 1 and vectors.shape[-1] != width):
+            raise ValueError(f"Expected an array of {width}-component vectors, got shape {vectors.shape}")
+        values = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, width)
+        valid = np.isfinite(values)
+        valid &= np.abs(values) <= MAX_REASONABLE_VALUE
+        invalid = np.flatnonzero(~valid.all(axis=1))
+        if invalid.size:
+            _raise_invalid_vectors(invalid.size, int(invalid[0]), values[invalid[0]].tolist())
+        return values
+    
+    values = _flatten_vectors(vectors, keys)
+    invalid = [i for i, v in enumerate(values) if not (math.isfinite(v) and abs(v) <= MAX_REASONABLE_VALUE)]
+    if invalid:
+        rows = {i // width for i in invalid}
+        first = invalid[0] // width
+        _raise_invalid_vectors(len(rows), first, values[first * width:(first + 1) * width])
+    return values
+
+
+def _raise_invalid_vectors(count, first, vector):
+    raise ValueError(f"{count} vector(s) with NaN, infinite or out-of-range (|v| > {MAX_REASONABLE_VALUE:g}) "
+                     f"components; first at index {first}: {vector}")
+
+
+def _mesh_id_values(mesh_ids):
+    """Mesh ids for a packed uint16 parameter; NumPy arrays stay arrays (range-checked)"""
+    if _is_ndarray(mesh_ids):
+        ids = mesh_ids.ravel()
+        if ids.dtype != np.uint16 and ids.size:
+            if ids.dtype.kind not in "iu":
+                raise ValueError(f"Mesh ids must be integers, got {ids.dtype}")
+            if ids.min() < 0 or ids.max() > 0xFFFF:
+                raise ValueError("Mesh ids must be in 0..65535")
+        return ids
+    return [int(id) for id in mesh_ids]
+
+
+def _bulk_params(mesh_ids, name, vectors, keys):
+    """Params of a set_mesh_positions/rotations/scales request"""
+    ids = _mesh_id_values(mesh_ids)
+    values = _vector_values(vectors, keys)
+    id_count = len(ids)
+    vector_count = len(values) if _is_ndarray(values) else len(values) // len(keys)
+    if id_count != vector_count:
+        raise ValueError(f"Got {id_count} mesh ids but {vector_count} {name}")
+    return {"mesh_ids": _Packed("H", ids), name: _Packed("f", values, keys=keys)}
+
+
+def _vectors_from_result(values, keys, out=None):
+    """Turn a bulk getter result into vectors
+    
+    values is a JSON list of {"x", ...} dicts (None for missing meshes), a
+    packed array, or a NumPy array read from shared memory. Returns an
+    (n, width) float32 NumPy array (NaN rows for missing meshes), filling
+    out if given; without NumPy, a list of tuples with None for missing
+    meshes.
+    """
+    width = len(keys)
+    if isinstance(values, list):
+        if np is None:
+            return [None if item is None else tuple(float(item[key]) for key in keys) for item in values]
+        nan = float("nan")
+        flat = []
+        for item in values:
+            flat.extend((nan,) * width if item is None else (float(item[key]) for key in keys))
+        values = flat
+    
+    if np is None:
+        if out is not None:
+            raise ImportError("out= requires NumPy (pip install numpy)")
+        flat = list(values)
+        vectors = [tuple(flat[i:i + width]) for i in range(0, len(flat), width)]
+        return [None if vector[0] != vector[0] else vector for vector in vectors]
+    
+    vectors = np.asarray(values, dtype=np.float32).reshape(-1, width)
+    if out is None:
+        return vectors
+    if not np.may_share_memory(out, vectors):
+        out[...] = vectors.reshape(out.shape)
+    return out
+
+
+# Columns of a scene snapshot: result key -> (field, components per mesh)
+_SNAPSHOT_COLUMNS = (("mesh_ids", "id", 1), ("positions", "position", 3), ("rotations", "rotation", 4),
+                     ("scales", "scale", 3), ("bounds", "bounds", 6), ("visible", "visible", 1),
+                     ("selected", "selected", 1))
+
+
+def _snapshot_from_result(result):
+    """Turn a get_scene_snapshot result into a structured array (or columns)
+    
+    Each column arrives packed or as a flat JSON list. With NumPy the result
+    is one record per mesh (see SceneAPI.snapshot); without it, a dict of
+    lists with tuples for the vector fields.
+    """
+    count = int(result.get("count", 0))
+    names = list(result.get("names", []))
+    columns = {}
+    for key, field, width in _SNAPSHOT_COLUMNS:
+        values = result.get(key, [])
+        if np is not None:
+            values = np.asarray(values).reshape(count, width) if width > 1 else np.asarray(values)
+        elif width > 1:
+            values = list(values)
+            values = [tuple(values[i:i + width]) for i in range(0, len(values), width)]
+        else:
+            values = list(values)
+        columns[field] = values
+    
+    if np is None:
+        bounds = columns.pop("bounds")
+        columns["bounds_center"] = [vector[:3] for vector in bounds]
+        columns["bounds_size"] = [vector[3:] for vector in bounds]
+        columns["visible"] = [bool(flag) for flag in columns["visible"]]
+        columns["selected"] = [bool(flag) for flag in columns["selected"]]
+        columns["name"] = names
+        return columns
+    
+    snapshot = np.empty(count, dtype=[
+        ("id", "<u2"), ("name", f"U{max([len(name) for name in names] + [1])}"),
+        ("position", "<f4", (3,)), ("rotation", "<f4", (4,)), ("scale", "<f4", (3,)),
+        ("bounds_center", "<f4", (3,)), ("bounds_size", "<f4", (3,)),
+        ("visible", "?"), ("selected", "?")
+    ])
+    bounds = columns.pop("bounds")
+    snapshot["name"] = names
+    snapshot["bounds_center"] = bounds[:, :3]
+    snapshot["bounds_size"] = bounds[:, 3:]
+    for field, values in columns.items():
+        snapshot[field] = values
+    return snapshot
+
+
+def _pack_params(params, payload, shared=None, leases=None):
+    """Replace _Packed and _Output values in params for the wire
+    
+    payload is the bytearray collecting a binary frame's payload, or None
+    for NDJSON (values are expanded inline). shared is the connection's
+    attached _SharedMemory, if any; ranges leased from it are appended to
+    leases.
+    """
+    if not params or not any(isinstance(value, (_Packed, _Output)) for value in params.values()):
+        return params or {}
+    packed_params = {}
+    for key, value in params.items():
+        if isinstance(value, _Packed):
+            reference = shared.place(value, leases) if shared is not None else None
+            if reference is not None:
+                packed_params[key] = reference
+            elif payload is None:
+                packed_params[key] = value.to_json()
+            else:
+                packed_params[key] = {"$" + _DTYPES[value.typecode]: [len(payload), value.count]}
+                payload += value.to_bytes()
+        elif isinstance(value, _Output):
+            reference = shared.reserve(value, leases) if shared is not None else None
+            if reference is not None:
+                packed_params[key] = reference
+        else:
+            packed_params[key] = value
+    return packed_params
+
+
+def _encode_message(requests, binary=False, shared=None, leases=None):
+    """Encode one request dict or a batch list for the wire"""
+    payload = bytearray() if binary else None
+    if isinstance(requests, list):
+        message = [dict(request, params=_pack_params(request.get("params"), payload, shared, leases))
+                   for request in requests]
+    else:
+        message = dict(requests, params=_pack_params(requests.get("params"), payload, shared, leases))
+    
+    if not binary:
+        return _json_dumps(message) + b"\n"
+    header = _json_dumps(message)
+    return _FRAME_PREFIX.pack(len(header), len(payload)) + header + payload
+
+
+def _encode_request(request_id, method, params, binary=False, shared=None, leases=None, timeout_ms=None):
+    """Encode one JSON-RPC request for the wire"""
+    request = {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params or {},
+        "id": request_id
+    }
+    if timeout_ms is not None:
+        request["timeout_ms"] = timeout_ms
+    return _encode_message(request, binary, shared, leases)
+
+
+def _unpack_payload(value, payload, shared=None):
+    """Replace packed array references in a decoded message with arrays"""
+    if isinstance(value, dict):
+        if len(value) == 1:
+            kind, reference = next(iter(value.items()))
+            if kind == "$shm" and shared is not None:
+                offset, count, dtype = reference
+                return shared.read(offset, count, _TYPECODES[dtype])
+            typecode = _TYPECODES.get(kind[1:]) if kind.startswith("$") else None
+            if typecode is not None:
+                offset, count = reference
+                unpacked = array(typecode)
+                unpacked.frombytes(bytes(payload[offset:offset + count * unpacked.itemsize]))
+                if sys.byteorder == "big":
+                    unpacked.byteswap()
+                return unpacked
+        return {key: _unpack_payload(item, payload, shared) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_unpack_payload(item, payload, shared) for item in value]
+    return value
+
+
+def _is_server_message(message):
+    """Whether a decoded message is a request from the server rather than a reply"""
+    return isinstance(message, dict) and "method" in message and "id" not in message
+
+
+def _notification_failure(method, error):
+    """The message Unity sends when a notification failed"""
+    return {"jsonrpc": "2.0", "method": "spz.sys.notification_failed",
+            "params": {"method": method, "error": str(error)}}
+
+
+def _unpack_response(response):
+    """Return the result of a JSON-RPC response or raise its error"""
+    if "error" in response:
+        error = response["error"]
+        message = error.get("message", "Unknown error")
+        if error.get("code") == _TIMEOUT_ERROR_CODE or message == "Command execution timeout":
+            raise SPZTimeoutError(f"StableProjectorz did not run the command in time ({message})")
+        raise RuntimeError(f"Server error: {message}")
+    return response.get("result", {})
+
+
+class _MessageReader:
+    """Buffered message reader over a socket (NDJSON lines or binary frames)
+    
+    Received bytes are written straight into one growable bytearray, and the
+    newline search resumes where the previous one stopped, so a reply costs
+    time linear in its size. Bytes that arrive after a message stay buffered
+    and start the next one instead of being dropped.
+    """
+    
+    def __init__(self, sock, chunk_size=65536):
+        self._sock = sock
+        self._chunk_size = chunk_size
+        self._buffer = bytearray(chunk_size)
+        self._start = 0    # first byte of the current message
+        self._end = 0      # end of received data
+        self._scanned = 0  # no newline in [_start, _scanned)
+    
+    def read_message(self):
+        """Return the next message (without its newline), or None at end of stream"""
+        while True:
+            newline = self._buffer.find(b"\n", self._scanned, self._end)
+            if newline != -1:
+                message = self._buffer[self._start:newline]
+                self._start = self._scanned = newline + 1
+                return message
+            self._scanned = self._end
+            
+            if not self._fill():
+                return None
+    
+    def read_frame(self):
+        """Return the next binary frame as (header, payload), or None at end of stream"""
+        if not self._ensure(_FRAME_PREFIX.size):
+            return None
+        header_length, payload_length = _FRAME_PREFIX.unpack_from(self._buffer, self._start)
+        # Receiving may move the buffered bytes, so offsets are taken afterwards
+        if not self._ensure(_FRAME_PREFIX.size + header_length + payload_length):
+            return None
+        frame_end = self._start + _FRAME_PREFIX.size + header_length + payload_length
+        header_start = self._start + _FRAME_PREFIX.size
+        header = self._buffer[header_start:header_start + header_length]
+        payload = self._buffer[header_start + header_length:frame_end]
+        self._start = self._scanned = frame_end
+        return header, payload
+    
+    def _ensure(self, count):
+        """Receive until count unread bytes are buffered; returns False at end of stream"""
+        while self._end - self._start < count:
+            if not self._fill():
+                return False
+        return True
+    
+    def _fill(self):
+        """Receive more bytes into the buffer; returns False at end of stream"""
+        if len(self._buffer) - self._end < self._chunk_size:
+            self._make_room()
+        view = memoryview(self._buffer)[self._end:]
+        try:
+            received = self._sock.recv_into(view)
+        finally:
+            view.release()
+        if received == 0:
+            return False
+        self._end += received
+        return True
+    
+    def _make_room(self):
+        """Drop consumed bytes and grow the buffer if the pending message needs it"""
+        pending = self._end - self._start
+        if self._start > 0:
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._scanned -= self._start
+            self._start = 0
+            self._end = pending
+        if len(self._buffer) - self._end < self._chunk_size:
+            self._buffer.extend(bytes(max(len(self._buffer), self._chunk_size)))
+
+
+# ============================================
+# Deadlines
+# ============================================
+#
+# Every request gets a timeout: the client's default, an explicit one
+# (api.with_timeout(0.05).cameras.set_pos(...)) or what is left of the
+# deadline of an enclosing "with api.with_timeout(...)" block, whichever is
+# shortest. Explicit timeouts travel with the request as "timeout_ms", so
+# Unity drops a queued command whose caller has already given up on it
+# instead of running it late.
+
+# JSON-RPC error code for commands Unity didn't get to within their timeout
+_TIMEOUT_ERROR_CODE = -32001
+
+
+class SPZTimeoutError(TimeoutError):
+    """A request didn't complete within its timeout
+    
+    Attributes:
+        method: JSON-RPC method of the request (None if not known)
+        timeout: Seconds the request was allowed (None if not known)
+    """
+    
+    def __init__(self, message, method=None, timeout=None):
+        super().__init__(message)
+        self.method = method
+        self.timeout = timeout
+
+
+class SPZPartialUpdateError(RuntimeError):
+    """A bulk setter split into several requests was only partly applied
+    
+    Attributes:
+        method: JSON-RPC method of the setter
+        count: Number of meshes the chunks that succeeded updated
+        failed: List of (start, end, error) for the chunks that didn't,
+            where start:end indexes the ids passed in and error is the
+            exception raised or the unsuccessful reply
+    """
+    
+    def __init__(self, method, count, failed):
+        ranges = ", ".join(f"{start}:{end}" for start, end, _ in failed)
+        super().__init__(f"{method} failed for ids {ranges}; {count} meshes were updated")
+        self.method = method
+        self.count = count
+        self.failed = failed
+
+
+def _no_reply(method, seconds):
+    return SPZTimeoutError(f"No reply to {method} within {seconds:.3g}s", method, seconds)
+
+
+class _DeadlineScope:
+    """Deadline shared by every request made inside one with_timeout() block"""
+    
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.futures = []  # pipelined requests sent inside the block
+    
+    def track(self, future):
+        self.futures.append(future)
+    
+    def cancel_pending(self):
+        """Cancel the requests of the block that are still waiting for a reply"""
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.cancel()
+
+
+# Innermost with_timeout() block of the current thread or asyncio task
+_deadline_scope = contextvars.ContextVar("spz_deadline_scope", default=None)
+
+
+def _request_timeout(method, timeout, default):
+    """Work out how long a request may take
+    
+    Args:
+        timeout: Timeout asked for by the caller (seconds), or None
+        default: Timeout to use otherwise (None: wait indefinitely)
+    
+    Returns:
+        (seconds, timeout_ms): seconds is None for no limit; timeout_ms is
+        what to send to Unity, None unless the limit was asked for
+    
+    Raises:
+        SPZTimeoutError: If the enclosing deadline has already passed
+    """
+    explicit = timeout is not None
+    seconds = timeout if explicit else default
+    scope = _deadline_scope.get()
+    if scope is not None:
+        remaining = scope.deadline - time.monotonic()
+        if seconds is None or remaining < seconds:
+            seconds, explicit = remaining, True
+    if seconds is not None and seconds <= 0:
+        raise SPZTimeoutError(f"Deadline passed before {method} was sent", method, 0.0)
+    return seconds, (max(1, int(seconds * 1000)) if explicit else None)
+
+
+def _time_left(deadline, method, seconds):
+    """Seconds until deadline (None: no deadline); raises once it has passed"""
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise _no_reply(method, seconds)
+    return remaining
+
+
+def _fail(future, error):
+    """Fail a future unless it is already done (replied, cancelled or expired)"""
+    try:
+        future.set_exception(error)
+    except InvalidStateError:
+        pass
+
+
+class _Expiry:
+    """Fails pipelined futures whose timeout runs out before their reply arrives
+    
+    One timer thread serves every client; it starts with the first future
+    that has a timeout.
+    """
+    
+    def __init__(self):
+        self._heap = []  # (deadline, sequence, future, error)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+    
+    def add(self, future, seconds, error):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + seconds, next(self._sequence), future, error))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                deadline, _, future, error = self._heap[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            _fail(future, error)
+
+
+_expiry = _Expiry()
+
+
+class _TimeoutClient:
+    """Client wrapper that gives every request the same timeout (see SPZAPI.with_timeout)"""
+    
+    def __init__(self, client, timeout):
+        self._client = client
+        self.timeout = timeout
+    
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+    
+    def _send_request(self, method, params=None, timeout=None):
+        return self._client._send_request(method, params, self.timeout if timeout is None else timeout)
+    
+    def _submit_request(self, method, params=None, timeout=None):
+        return self._client._submit_request(method, params, self.timeout if timeout is None else timeout)
+    
+    def _submit_batch(self, calls, timeout=None):
+        return self._client._submit_batch(calls, self.timeout if timeout is None else timeout)
+    
+    def _sync_notifications(self, timeout=None):
+        return self._client._sync_notifications(self.timeout if timeout is None else timeout)
+
+
+# ============================================
+# Clients
+# ============================================
 
 class SPZClient:
-    """Client for communicating with StableProjectorz via JSON-RPC"""
+    """Client for communicating with StableProjectorz via JSON-RPC
+    
+    By default every request is a blocking round trip. With pipelined=True a
+    dedicated reader thread matches replies to requests by their JSON-RPC id,
+    so many requests can be in flight on one socket at the same time.
+    
+    protocol selects the wire format: "auto" negotiates binary framing (bulk
+    arrays as packed float32/uint16) and falls back to NDJSON on hosts that
+    don't support it, "binary" requires it, and "ndjson" never asks for it.
+    
+    shared_memory (bytes) maps a buffer shared with the server: large bulk
+    arrays are passed through it by reference instead of over the socket,
+    and NumPy arrays from shared_array() are passed without any copy.
+    
+    timeout is the default per-request timeout in seconds (see
+    SPZAPI.with_timeout for shorter or longer ones). A blocking client has
+    to reconnect after a timeout, since the late reply would still arrive
+    on its socket; a pipelined client just forgets the request.
+    """
+    
+    PROTOCOLS = ("auto", "binary", "ndjson")
+    
+    def __init__(self, host='127.0.0.1', port=5555, pipelined=False, timeout=5.0, protocol="auto",
+                 shared_memory=0):
+        if protocol not in self.PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}; expected one of {', '.join(self.PROTOCOLS)}")
+        self.host = host
+        self.port = port
+        self.pipelined = pipelined
+        self.timeout = timeout
+        self.protocol = protocol
+        self.socket = None
+        
+        # Whether the current connection negotiated binary framing, whether
+        # the host accepts notifications (requests without an id) and whether
+        # it can push events
+        self._binary = False
+        self._notifications = False
+        self._events = False
+        
+        # Called with every message the server sends on its own (see add_message_handler)
+        self._message_handlers = []
+        
+        # Events the server pushes to this client, renewed on every reconnect
+        self._subscriptions = ()
+        
+        # Shared-memory buffer (kept across reconnects) and whether the
+        # current connection has it attached
+        self.shared_memory = shared_memory
+        self._shared = None
+        self._shared_attached = False
+        self._lock = threading.Lock()
+        self._request_id = 0
+        
+        # Serializes writes (and whole round trips in blocking mode) on the socket
+        self._send_lock = threading.Lock()
+        
+        # Framing reader for the current socket
+        self._reader = None
+        
+        # Pipelined mode: request id -> Future waiting for its reply
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._reader_thread = None
+    
+    def _get_next_id(self):
+        """Get next request ID"""
+        with self._lock:
+            self._request_id += 1
+            return self._request_id
+    
+    def _connect(self, timeout=None):
+        """Establish connection to server (timeout: seconds for connecting, default self.timeout)"""
+        if self.socket is None or self.socket.fileno() == -1:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.settimeout(self.timeout if timeout is None else timeout)
+            try:
+                self.socket.connect((self.host, self.port))
+            except Exception as e:
+                self.socket = None
+                raise ConnectionError(f"Failed to connect to StableProjectorz: {e}")
+            self._reader = _MessageReader(self.socket)
+            self._binary = False
+            self._notifications = False
+            self._events = False
+            self._shared_attached = False
+            try:
+                self._negotiate()
+                if self.shared_memory:
+                    self._attach_shared_memory()
+                if self._subscriptions and self._events:
+                    self._call_direct("spz.sys.subscribe", {"events": list(self._subscriptions)})
+            except Exception:
+                self._drop_connection(ConnectionError("Connection closed"))
+                raise
+            
+            if self.pipelined:
+                # The reader thread blocks on recv indefinitely; per-request
+                # timeouts are enforced on the futures instead
+                self.socket.settimeout(None)
+                self._reader_thread = threading.Thread(
+                    target=self._reader_loop,
+                    args=(self.socket, self._reader, self._binary),
+                    daemon=True
+                )
+                self._reader_thread.start()
+    
+    def _call_direct(self, method, params):
+        """Round trip while setting up a connection (before any reader thread runs)"""
+        request_id = self._get_next_id()
+        self.socket.sendall(_encode_request(request_id, method, params, self._binary))
+        response = self._read_response(self._reader, self._binary)
+        if response is None:
+            raise ConnectionError(f"Connection to StableProjectorz closed during {method}")
+        return _unpack_response(response)
+    
+    def _negotiate(self):
+        """Agree on the wire format and optional features on a fresh connection
+        
+        Hosts that predate the handshake reject it as an unknown method,
+        which leaves the connection on NDJSON without any features.
+        """
+        protocols = ["ndjson"] if self.protocol == "ndjson" else ["binary", "ndjson"]
+        try:
+            result = self._call_direct("spz.sys.handshake", {"protocols": protocols})
+        except RuntimeError:
+            result = {}
+        if not isinstance(result, dict):
+            result = {}
+        self._binary = result.get("protocol") == "binary"
+        self._notifications = "notifications" in (result.get("features") or [])
+        self._events = "events" in (result.get("features") or [])
+        if self.protocol == "binary" and not self._binary:
+            raise ConnectionError("StableProjectorz does not support binary framing")
+    
+    def _attach_shared_memory(self):
+        """Map the shared-memory buffer into the server for this connection
+        
+        Hosts without shared-memory support reject the request and bulk
+        arrays keep travelling over the socket.
+        """
+        if self._shared is None:
+            self._shared = _SharedMemory(self.shared_memory)
+        try:
+            result = self._call_direct("spz.sys.shm_attach", {"path": self._shared.path, "size": self._shared.size})
+        except RuntimeError:
+            result = {}
+        self._shared_attached = isinstance(result, dict) and bool(result.get("success"))
+    
+    def shared_array(self, shape, dtype="float32"):
+        """Create a NumPy array in the shared-memory buffer
+        
+        Bulk setters pass such arrays to the server without copying them,
+        and bulk getters given one as out= receive results straight into it.
+        Keep the returned array alive while it is in use.
+        
+        Args:
+            shape: Array shape, e.g. (mesh_count, 3)
+            dtype: "float32", "uint16" or "uint8"
+        """
+        if np is None:
+            raise ImportError("shared_array requires NumPy (pip install numpy)")
+        if not self.shared_memory:
+            raise RuntimeError("Create the client with shared_memory=<bytes> to use shared arrays")
+        if self._shared is None:
+            self._shared = _SharedMemory(self.shared_memory)
+        return self._shared.array(shape, dtype)
+    
+    def _build_request(self, method, params, timeout_ms=None):
+        """Build a JSON-RPC request, returning (request_id, encoded bytes, shared-memory leases)"""
+        request_id = self._get_next_id()
+        leases = []
+        shared = self._shared if self._shared_attached else None
+        request_bytes = _encode_request(request_id, method, params, self._binary, shared, leases, timeout_ms)
+        return request_id, request_bytes, leases
+    
+    def _release_after(self, futures, leases):
+        """Return leased shared-memory ranges once every future is done"""
+        if not leases:
+            return
+        remaining = [len(futures)]
+        lock = threading.Lock()
+        shared = self._shared
+        
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                shared.release(leases)
+        
+        for future in futures:
+            future.add_done_callback(done)
+    
+    def add_message_handler(self, handler):
+        """Call handler(message) for every message the server sends on its own
+        
+        Those are JSON-RPC requests without an id, such as
+        "spz.sys.notification_failed". Handlers run on whichever thread reads
+        the connection and should return quickly.
+        """
+        self._message_handlers.append(handler)
+    
+    def remove_message_handler(self, handler):
+        """Stop calling a handler added with add_message_handler"""
+        if handler in self._message_handlers:
+            self._message_handlers.remove(handler)
+    
+    def _subscribe(self, events):
+        """Have the server push these events to the message handlers
+        
+        Replaces the previous subscription; it is renewed whenever the client
+        reconnects. Only useful on a pipelined client, whose reader thread
+        receives the "spz.event" messages between replies.
+        
+        Returns:
+            bool: False if the host can't push events
+        """
+        with self._send_lock:
+            self._subscriptions = tuple(events)
+            connected = self.socket is not None and self.socket.fileno() != -1
+            # A fresh connection subscribes while it is set up
+            self._connect()
+            if not self._events:
+                return False
+        if connected:
+            self._send_request("spz.sys.subscribe", {"events": list(events)})
+        return True
+    
+    def _handle_server_message(self, message):
+        for handler in list(self._message_handlers):
+            try:
+                handler(message)
+            except Exception:
+                pass
+    
+    def _read_response(self, reader, binary):
+        """Read and decode the next reply, or return None at end of stream
+        
+        Messages the server sends on its own are passed to the message
+        handlers instead of being returned.
+        """
+        while True:
+            response = self._read_message(reader, binary)
+            if isinstance(response, list):
+                replies = [item for item in response if not _is_server_message(item)]
+                for item in response:
+                    if _is_server_message(item):
+                        self._handle_server_message(item)
+                if replies or not response:
+                    return replies
+            elif _is_server_message(response):
+                self._handle_server_message(response)
+            else:
+                return response
+    
+    def _read_message(self, reader, binary):
+        """Read and decode the next message, or return None at end of stream"""
+        if not binary:
+            message = reader.read_message()
+            if message is None:
+                return None
+            if not message.strip():
+                return {}
+            response = _json_loads(message)
+            if self._shared_attached and b"$shm" in message:
+                return _unpack_payload(response, b"", self._shared)
+            return response
+        frame = reader.read_frame()
+        if frame is None:
+            return None
+        header, payload = frame
+        response = _json_loads(header)
+        # Empty arrays leave the payload empty but still have a reference
+        if payload or b'"$' in header:
+            return _unpack_payload(response, payload, self._shared)
+        return response
+    
+    def _send_request(self, method, params=None, timeout=None):
+        """Send a JSON-RPC request and return the response
+        
+        timeout (seconds) overrides the client's default for this request.
+        Raises SPZTimeoutError if the reply doesn't arrive in time.
+        """
+        seconds, timeout_ms = _request_timeout(method, timeout, self.timeout)
+        if self.pipelined:
+            future = self._submit(method, params, timeout_ms)
+            try:
+                return future.result(timeout=seconds)
+            except SPZTimeoutError:
+                raise
+            except FutureTimeoutError:
+                future.cancel()
+                raise _no_reply(method, seconds)
+        
+        deadline = None if seconds is None else time.monotonic() + seconds
+        if not self._send_lock.acquire(timeout=-1 if seconds is None else seconds):
+            raise SPZTimeoutError(f"Connection busy; {method} not sent within {seconds:.3g}s", method, seconds)
+        try:
+            self._connect(_time_left(deadline, method, seconds))
+            
+            _, request_bytes, leases = self._build_request(method, params, timeout_ms)
+            
+            try:
+                self.socket.settimeout(_time_left(deadline, method, seconds))
+                self.socket.sendall(request_bytes)
+                
+                # Receive response
+                response = self._read_response(self._reader, self._binary)
+                if response is None:
+                    raise ConnectionError("Connection to StableProjectorz closed")
+                
+                return _unpack_response(response)
+            except SPZTimeoutError:
+                raise
+            except socket.timeout:
+                # The reply may still arrive later; start over on a fresh connection
+                self._drop_connection(ConnectionError("Request timed out"))
+                raise _no_reply(method, seconds)
+            except Exception as e:
+                self.socket = None  # Reset connection on error
+                raise
+            finally:
+                if leases:
+                    self._shared.release(leases)
+        finally:
+            self._send_lock.release()
+    
+    def _send_notification(self, method, params=None, timeout=None):
+        """Send a JSON-RPC notification: no id, no reply, no waiting
+        
+        Unity reports a notification that failed with a
+        "spz.sys.notification_failed" message to the message handlers. Hosts
+        without notification support get a regular request instead, and a
+        failure is reported the same way. With a timeout (seconds) Unity drops
+        the notification, as failed, if it can't start it in time.
+        """
+        _, timeout_ms = _request_timeout(method, timeout, None)
+        with self._send_lock:
+            self._connect()
+            if self._notifications:
+                message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+                if timeout_ms is not None:
+                    message["timeout_ms"] = timeout_ms
+                try:
+                    self.socket.sendall(_encode_message(message, self._binary))
+                except Exception as e:
+                    self._drop_connection(ConnectionError(f"Connection to StableProjectorz lost: {e}"))
+                    raise ConnectionError(f"Connection to StableProjectorz lost: {e}")
+                return
+        
+        try:
+            result = self._send_request(method, params, timeout)
+            error = None if result.get("success", True) else result.get("error", "Command failed")
+        except (RuntimeError, TimeoutError) as e:
+            error = str(e)
+        if error is not None:
+            self._handle_server_message(_notification_failure(method, error))
+    
+    def _sync_notifications(self, timeout=None):
+        """Wait until Unity has run every request sent so far on this connection"""
+        try:
+            self._send_request("spz.sys.sync", None, timeout)
+        except RuntimeError:
+            pass  # Older host: the error reply still comes back in queue order
+    
+    def _submit(self, method, params, timeout_ms=None):
+        """Pipelined mode: write a request and return the future waiting for its reply"""
+        future = Future()
+        with self._send_lock:
+            self._connect()
+            request_id, request_bytes, leases = self._build_request(method, params, timeout_ms)
+            key = str(request_id)
+            future.spz_request_id = key
+            self._release_after([future], leases)
+            with self._pending_lock:
+                self._pending[key] = future
+            try:
+                self.socket.sendall(request_bytes)
+            except Exception as e:
+                with self._pending_lock:
+                    self._pending.pop(key, None)
+                future.cancel()
+                self._drop_connection(ConnectionError(f"Connection to StableProjectorz lost: {e}"))
+                raise ConnectionError(f"Connection to StableProjectorz lost: {e}")
+        # A cancelled or expired request no longer waits for its reply
+        future.add_done_callback(self._discard_pending)
+        return future
+    
+    def _submit_request(self, method, params=None, timeout=None):
+        """Send a JSON-RPC request without waiting for the reply
+        
+        Returns:
+            concurrent.futures.Future resolving to the request's result.
+            In blocking mode the request runs immediately and the returned
+            future is already done. With a timeout (or inside a
+            with_timeout() block) the future fails with SPZTimeoutError once
+            it runs out; cancelling it abandons the request.
+        """
+        future = Future()
+        if not self.pipelined:
+            try:
+                future.set_result(self._send_request(method, params, timeout))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        seconds, timeout_ms = _request_timeout(method, timeout, None)
+        future = self._submit(method, params, timeout_ms)
+        if seconds is not None:
+            _expiry.add(future, seconds, _no_reply(method, seconds))
+        scope = _deadline_scope.get()
+        if scope is not None:
+            scope.track(future)
+        return future
+    
+    def _submit_batch(self, calls, timeout=None):
+        """Send several requests as one JSON-RPC batch array
+        
+        Args:
+            calls: List of (method, params) pairs
+            timeout: Seconds for the whole batch (default: the client's)
+        
+        Returns:
+            List of futures, one per call, in the same order
+        """
+        futures = [Future() for _ in calls]
+        if not calls:
+            return futures
+        
+        seconds, timeout_ms = _request_timeout("batch", timeout, None if self.pipelined else self.timeout)
+        with self._send_lock:
+            self._connect(seconds)
+            keys = []
+            requests = []
+            for method, params in calls:
+                request_id = self._get_next_id()
+                keys.append(str(request_id))
+                request = {
+                    "jsonrpc": "2.0",
+                    "method": method,
+                    "params": params or {},
+                    "id": request_id
+                }
+                if timeout_ms is not None:
+                    request["timeout_ms"] = timeout_ms
+                requests.append(request)
+            leases = []
+            shared = self._shared if self._shared_attached else None
+            batch_bytes = _encode_message(requests, self._binary, shared, leases)
+            
+            if self.pipelined:
+                self._release_after(futures, leases)
+                with self._pending_lock:
+                    for key, future in zip(keys, futures):
+                        future.spz_request_id = key
+                        self._pending[key] = future
+                try:
+                    self.socket.sendall(batch_bytes)
+                except Exception as e:
+                    with self._pending_lock:
+                        for key in keys:
+                            self._pending.pop(key, None)
+                    for future in futures:
+                        future.cancel()
+                    self._drop_connection(ConnectionError(f"Connection to StableProjectorz lost: {e}"))
+                    raise ConnectionError(f"Connection to StableProjectorz lost: {e}")
+                scope = _deadline_scope.get()
+                for (method, _), future in zip(calls, futures):
+                    future.add_done_callback(self._discard_pending)
+                    if seconds is not None:
+                        _expiry.add(future, seconds, _no_reply(method, seconds))
+                    if scope is not None:
+                        scope.track(future)
+                return futures
+            
+            try:
+                self.socket.settimeout(seconds)
+                self.socket.sendall(batch_bytes)
+                responses = self._read_response(self._reader, self._binary)
+                if responses is None:
+                    raise ConnectionError("Connection to StableProjectorz closed")
+            except socket.timeout:
+                self._drop_connection(ConnectionError("Request timed out"))
+                raise _no_reply(f"batch of {len(calls)} requests", seconds)
+            except Exception as e:
+                self.socket = None  # Reset connection on error
+                raise
+            finally:
+                if leases:
+                    shared.release(leases)
+        
+        if isinstance(responses, dict):
+            # The whole batch was rejected
+            responses = [dict(responses, id=key) for key in keys]
+        by_id = {str(response.get("id")): response for response in responses}
+        for key, future in zip(keys, futures):
+            response = by_id.get(key)
+            try:
+                if response is None:
+                    raise RuntimeError("Server error: no reply for batched request")
+                future.set_result(_unpack_response(response))
+            except Exception as e:
+                future.set_exception(e)
+        return futures
+    
+    def _discard_pending(self, future):
+        """Forget a pipelined request whose caller stopped waiting for it"""
+        key = getattr(future, "spz_request_id", None)
+        if key is not None:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+    
+    def _reader_loop(self, sock, reader, binary):
+        """Pipelined mode: read replies and resolve the matching futures"""
+        error = ConnectionError("Connection to StableProjectorz closed")
+        try:
+            while True:
+                response = self._read_response(reader, binary)
+                if response is None:
+                    break
+                if response:
+                    self._dispatch_response(response)
+        except Exception as e:
+            error = ConnectionError(f"Connection to StableProjectorz lost: {e}")
+        
+        if self.socket is sock:
+            self._drop_connection(error)
+    
+    def _dispatch_response(self, response):
+        """Resolve the pending future matching a reply's id"""
+        if isinstance(response, list):
+            for item in response:
+                self._dispatch_response(item)
+            return
+        key = response.get("id")
+        with self._pending_lock:
+            future = self._pending.pop(str(key), None) if key is not None else None
+        if future is None:
+            return
+        try:
+            future.set_result(_unpack_response(response))
+        except InvalidStateError:
+            pass  # Cancelled or expired while the reply was on its way
+        except Exception as e:
+            _fail(future, e)
+    
+    def _drop_connection(self, error):
+        """Close the socket and fail every request still waiting on it"""
+        sock, self.socket = self.socket, None
+        if sock:
+            try:
+                sock.close()
+            except:
+                pass
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            _fail(future, error)
+        if self._shared is not None:
+            # Ranges of requests whose caller gave up waiting were never released
+            self._shared.reset()
+    
+    def is_alive(self):
+        """Cheap health check for an idle connection (no round trip)"""
+        sock = self.socket
+        if sock is None or sock.fileno() == -1:
+            return False
+        if self.pipelined:
+            return self._reader_thread is not None and self._reader_thread.is_alive()
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        # Nothing should arrive on an idle blocking connection; if the socket is
+        # readable the server closed it (or sent a stray reply we can't match)
+        return not readable
+    
+    def close(self):
+        """Close the connection"""
+        if self.socket:
+            self._drop_connection(ConnectionError("Connection closed"))
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+
+class SPZConnectionPool:
+    """Bounded pool of SPZClient connections shared between threads
+    
+    Every request checks a connection out, so concurrent callers (add-on
+    callbacks, HTTP handler threads) each get their own socket instead of
+    interleaving bytes on one stream. The Unity side serves every connection
+    on its own thread.
+    
+    Idle connections are health-checked before reuse and closed once they
+    have been idle for longer than idle_timeout seconds. When all max_size
+    connections are busy, callers wait up to acquire_timeout seconds.
+    """
+    
+    def __init__(self, host='127.0.0.1', port=5555, max_size=8, idle_timeout=60.0,
+                 acquire_timeout=5.0, pipelined=False, timeout=5.0, protocol="auto", shared_memory=0):
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.pipelined = pipelined
+        self.timeout = timeout
+        self.protocol = protocol
+        self.shared_memory = shared_memory
+        self._idle = []  # (client, idle since) pairs, most recently used last
+        self._size = 0   # connections created and not yet closed
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        # Shared by every connection of the pool
+        self._message_handlers = []
+        
+        # Notifications all go over one dedicated pipelined connection, so
+        # they stay in order and failure reports are read as they arrive
+        self._notifier = None
+    
+    def _acquire(self, timeout=None):
+        """Check out a connection, creating one if the pool isn't full
+        
+        Waits for a free connection for at most acquire_timeout seconds, or
+        timeout if that is shorter.
+        """
+        wait = self.acquire_timeout if timeout is None else min(self.acquire_timeout, timeout)
+        deadline = time.monotonic() + wait
+        stale = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise ConnectionError("Connection pool is closed")
+                    stale.extend(self._evict_idle_locked())
+                    
+                    while self._idle:
+                        client, _ = self._idle.pop()
+                        # Unconnected clients connect lazily on their next request
+                        if client.socket is None or client.is_alive():
+                            return client
+                        stale.append(client)
+                        self._size -= 1
+                    
+                    if self._size < self.max_size:
+                        self._size += 1
+                        client = SPZClient(self.host, self.port, pipelined=self.pipelined,
+                                           timeout=self.timeout, protocol=self.protocol,
+                                           shared_memory=self.shared_memory)
+                        client._message_handlers = self._message_handlers
+                        return client
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise SPZTimeoutError(
+                            f"No free connection to StableProjectorz within {wait:.3g}s "
+                            f"({self.max_size} in use)", timeout=wait)
+                    self._cond.wait(remaining)
+        finally:
+            # Close sockets outside the lock
+            for client in stale:
+                client.close()
+    
+    def _release(self, client):
+        """Return a checked-out connection to the pool"""
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((client, time.monotonic()))
+                client = None
+            self._cond.notify()
+        if client is not None:
+            client.close()
+    
+    def _evict_idle_locked(self):
+        """Remove connections idle for too long; returns them for closing"""
+        cutoff = time.monotonic() - self.idle_timeout
+        # The list is ordered by idle time, oldest first
+        expired = 0
+        while expired < len(self._idle) and self._idle[expired][1] < cutoff:
+            expired += 1
+        evicted = [client for client, _ in self._idle[:expired]]
+        del self._idle[:expired]
+        self._size -= expired
+        return evicted
+    
+    def _checkout(self, method, timeout, default):
+        """Acquire a connection within a request's timeout
+        
+        Returns:
+            (client, timeout): timeout is what is left of an explicit timeout
+            once a connection is free (None if none was given)
+        """
+        seconds, _ = _request_timeout(method, timeout, default)
+        started = time.monotonic()
+        client = self._acquire(seconds)
+        if timeout is not None:
+            timeout -= time.monotonic() - started
+        return client, timeout
+    
+    def _send_request(self, method, params=None, timeout=None):
+        """Send a JSON-RPC request on a pooled connection and return the response"""
+        client, timeout = self._checkout(method, timeout, self.timeout)
+        try:
+            return client._send_request(method, params, timeout)
+        finally:
+            self._release(client)
+    
+    def _submit_request(self, method, params=None, timeout=None):
+        """Send a JSON-RPC request on a pooled connection without waiting for the reply
+        
+        Pipelined connections go back to the pool as soon as the request is
+        written, so many futures can share one socket.
+        """
+        client, timeout = self._checkout(method, timeout, None)
+        try:
+            return client._submit_request(method, params, timeout)
+        finally:
+            self._release(client)
+    
+    def _submit_batch(self, calls, timeout=None):
+        """Send a JSON-RPC batch on a pooled connection; returns one future per call"""
+        client, timeout = self._checkout("batch", timeout, None)
+        try:
+            return client._submit_batch(calls, timeout)
+        finally:
+            self._release(client)
+    
+    def add_message_handler(self, handler):
+        """Call handler(message) for every message the server sends on its own (see SPZClient)"""
+        self._message_handlers.append(handler)
+    
+    def remove_message_handler(self, handler):
+        """Stop calling a handler added with add_message_handler"""
+        if handler in self._message_handlers:
+            self._message_handlers.remove(handler)
+    
+    def _notification_client(self):
+        with self._cond:
+            if self._closed:
+                raise ConnectionError("Connection pool is closed")
+            if self._notifier is None:
+                self._notifier = SPZClient(self.host, self.port, pipelined=True, timeout=self.timeout,
+                                           protocol=self.protocol)
+                self._notifier._message_handlers = self._message_handlers
+            return self._notifier
+    
+    def _send_notification(self, method, params=None, timeout=None):
+        """Send a JSON-RPC notification on the pool's notification connection"""
+        self._notification_client()._send_notification(method, params, timeout)
+    
+    def _sync_notifications(self, timeout=None):
+        """Wait until Unity has run every notification sent so far"""
+        self._notification_client()._sync_notifications(timeout)
+    
+    def stats(self):
+        """Get pool usage counters
+        
+        Returns:
+            dict with size (open connections), idle, in_use and max_size
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size
+            }
+    
+    def close(self):
+        """Close idle connections; connections in use are closed when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            notifier, self._notifier = self._notifier, None
+            self._cond.notify_all()
+        for client, _ in idle:
+            client.close()
+        if notifier is not None:
+            notifier.close()
+
+
+class AsyncSPZClient:
+    """asyncio client for communicating with StableProjectorz via JSON-RPC
+    
+    Built on asyncio streams: a background task reads replies and resolves
+    the matching futures by id, so any number of coroutines can await
+    requests on one connection without blocking the event loop.
+    """
+    
+    # StreamReader buffer limit; must fit the largest single reply
+    STREAM_LIMIT = 256 * 1024 * 1024
+    
+    def __init__(self, host='127.0.0.1', port=5555, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._request_id = 0
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._pending = {}
+        self._connect_lock = None
+    
+    async def _connect(self, timeout=None):
+        """Establish connection to server (timeout: seconds for connecting, default self.timeout)"""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, limit=self.STREAM_LIMIT),
+                    self.timeout if timeout is None else timeout)
+            except Exception as e:
+                self._reader = self._writer = None
+                raise ConnectionError(f"Failed to connect to StableProjectorz: {e}")
+            self._read_task = asyncio.ensure_future(self._read_loop(self._reader, self._writer))
+    
+    async def _send_request(self, method, params=None, timeout=None):
+        """Send a JSON-RPC request and await the response
+        
+        timeout (seconds) overrides the client's default for this request.
+        Raises SPZTimeoutError if the reply doesn't arrive in time.
+        """
+        seconds, timeout_ms = _request_timeout(method, timeout, self.timeout)
+        deadline = None if seconds is None else time.monotonic() + seconds
+        await self._connect(seconds)
+        
+        self._request_id += 1
+        key = str(self._request_id)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            self._writer.write(_encode_request(self._request_id, method, params, timeout_ms=timeout_ms))
+            await self._writer.drain()
+            return await asyncio.wait_for(future, _time_left(deadline, method, seconds))
+        except SPZTimeoutError:
+            raise
+        except asyncio.TimeoutError:
+            raise _no_reply(method, seconds)
+        finally:
+            self._pending.pop(key, None)
+    
+    async def _read_loop(self, reader, writer):
+        """Read replies and resolve the matching futures"""
+        error = ConnectionError("Connection to StableProjectorz closed")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = _json_loads(line)
+                future = self._pending.get(str(response.get("id")))
+                if future is None or future.done():
+                    continue
+                try:
+                    future.set_result(_unpack_response(response))
+                except Exception as e:
+                    future.set_exception(e)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = ConnectionError(f"Connection to StableProjectorz lost: {e}")
+        finally:
+            if self._writer is writer:
+                self._reader = self._writer = None
+                writer.close()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(error)
+    
+    async def close(self):
+        """Close the connection"""
+        writer, self._writer = self._writer, None
+        self._reader = None
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Connection closed"))
+
+
+# Global client instance
+_client = None
+
+
+def _get_client():
+    """Get or create the global client instance
+    
+    The global client is a connection pool, so the add-on server, add-on
+    callbacks and HTTP handler threads can all call into Unity concurrently.
+    """
+    global _client
+    if _client is None:
+        _client = SPZConnectionPool()
+    return _client
+
+
+# ============================================
+# Camera API
+# ============================================
+
+# FastPath_API applies at most one camera update per frame (its 16 ms rate
+# limit is measured in frame time), so poses are streamed at up to 60 Hz
+_CAMERA_UPDATE_INTERVAL = 1.0 / 60.0
+
+
+def _slerp(a, b, t):
+    """Spherical interpolation between two (x, y, z, w) quaternions, shortest way round"""
+    dot = sum(p * q for p, q in zip(a, b))
+    if dot < 0.0:
+        b, dot = [-q for q in b], -dot
+    if dot > 0.9995:
+        # Nearly parallel: lerp is accurate and avoids dividing by sin(~0)
+        result = [p + (q - p) * t for p, q in zip(a, b)]
+    else:
+        theta = math.acos(dot)
+        sin_theta = math.sin(theta)
+        wa = math.sin((1.0 - t) * theta) / sin_theta
+        wb = math.sin(t * theta) / sin_theta
+        result = [wa * p + wb * q for p, q in zip(a, b)]
+    norm = math.sqrt(sum(v * v for v in result))
+    return [v / norm for v in result]
+
+
+class _CameraPath:
+    """Camera poses between keyframes: Catmull-Rom spline positions, slerped rotations
+    
+    Keyframes are dicts with "time" (seconds), "position" (x, y, z),
+    "rotation" (x, y, z, w) and optionally "fov" (on every keyframe or none),
+    linearly interpolated. A closed path whose first and last positions
+    match gets tangents that continue smoothly across the seam.
+    """
+    
+    def __init__(self, keyframes, closed=False):
+        keyframes = sorted(keyframes, key=lambda key: float(key["time"]))
+        if len(keyframes) < 2:
+            raise ValueError("A camera path needs at least two keyframes")
+        self.times = [float(key["time"]) for key in keyframes]
+        if any(b <= a for a, b in zip(self.times, self.times[1:])):
+            raise ValueError("Keyframe times must be distinct")
+        self.positions = [[float(v) for v in key["position"]] for key in keyframes]
+        self.rotations = [[float(v) for v in key["rotation"]] for key in keyframes]
+        if any(len(p) != 3 for p in self.positions) or any(len(q) != 4 for q in self.rotations):
+            raise ValueError("Keyframe positions need 3 values and rotations 4 (x, y, z, w)")
+        with_fov = ["fov" in key for key in keyframes]
+        if any(with_fov) and not all(with_fov):
+            raise ValueError("Give a fov on every keyframe or on none")
+        self.fovs = [float(key["fov"]) for key in keyframes] if all(with_fov) else None
+        self.start = self.times[0]
+        self.duration = self.times[-1] - self.times[0]
+        self._tangents = self._catmull_rom_tangents(closed and self.positions[0] == self.positions[-1])
+    
+    def _catmull_rom_tangents(self, closed):
+        t, p, n = self.times, self.positions, len(self.times)
+        def slope(i, j, dt):
+            return [(b - a) / dt for a, b in zip(p[i], p[j])]
+        tangents = [slope(i - 1, i + 1, t[i + 1] - t[i - 1]) for i in range(1, n - 1)]
+        if closed and n > 2:
+            seam = slope(n - 2, 1, (t[1] - t[0]) + (t[-1] - t[-2]))
+            return [seam] + tangents + [seam]
+        return [slope(0, 1, t[1] - t[0])] + tangents + [slope(n - 2, n - 1, t[-1] - t[-2])]
+    
+    def pose(self, time_offset):
+        """(position, rotation, fov) time_offset seconds into the path (clamped to its ends)"""
+        t = self.start + min(max(time_offset, 0.0), self.duration)
+        i = min(bisect.bisect_right(self.times, t), len(self.times) - 1) - 1
+        dt = self.times[i + 1] - self.times[i]
+        u = (t - self.times[i]) / dt
+        
+        # Cubic Hermite basis
+        u2, u3 = u * u, u * u * u
+        h00, h10 = 2 * u3 - 3 * u2 + 1, u3 - 2 * u2 + u
+        h01, h11 = -2 * u3 + 3 * u2, u3 - u2
+        position = [h00 * p0 + h10 * dt * m0 + h01 * p1 + h11 * dt * m1
+                    for p0, m0, p1, m1 in zip(self.positions[i], self._tangents[i],
+                                              self.positions[i + 1], self._tangents[i + 1])]
+        rotation = _slerp(self.rotations[i], self.rotations[i + 1], u)
+        fov = None if self.fovs is None else self.fovs[i] + (self.fovs[i + 1] - self.fovs[i]) * u
+        return position, rotation, fov
+
+
+class CameraAPI:
+    """API for camera operations"""
+    
+    def __init__(self, client):
+        self._client = client
+    
+    def set_pos(self, camera_index, x, y, z):
+        """Set camera position"""
+        result = self._client._send_request("spz.cmd.set_camera_pos", {
+            "camera_index": camera_index,
+            "x": float(x),
+            "y": float(y),
+            "z": float(z)
+        })
+        return result.get("success", False)
+    
+    def set_rot(self, camera_index, x, y, z, w):
+        """Set camera rotation (quaternion)"""
+        result = self._client._send_request("spz.cmd.set_camera_rot", {
+            "camera_index": camera_index,
+            "x": float(x),
+            "y": float(y),
+            "z": float(z),
+            "w": float(w)
+        })
+        return result.get("success", False)
+    
+    def set_fov(self, camera_index, fov):
+        """Set camera field of view"""
+        result = self._client._send_request("spz.cmd.set_camera_fov", {
+            "camera_index": camera_index,
+            "fov": float(fov)
+        })
+        return result.get("success", False)
+    
+    def set_pose(self, camera_index, position, rotation, fov=None):
+        """Set camera position, rotation (quaternion) and optionally field of view at once
+        
+        Unity rate-limits camera updates to one per frame, so a set_pos
+        followed by a set_rot can have the rotation rejected; set_pose
+        applies the whole pose under a single check.
+        """
+        result = self._client._send_request("spz.cmd.set_camera_pose",
+                                            self._pose_params(camera_index, position, rotation, fov))
+        return result.get("success", False)
+    
+    @staticmethod
+    def _pose_params(camera_index, position, rotation, fov):
+        x, y, z = position
+        qx, qy, qz, qw = rotation
+        params = {"camera_index": camera_index, "x": float(x), "y": float(y), "z": float(z),
+                  "qx": float(qx), "qy": float(qy), "qz": float(qz), "qw": float(qw)}
+        if fov is not None:
+            params["fov"] = float(fov)
+        return params
+    
+    def play_path(self, keyframes, fps=60, camera_index=0, loop=False, stop=None):
+        """Fly a camera along keyframes in real time (turntables, fly-throughs)
+        
+        Example:
+            api.cameras.play_path([
+                {"time": 0.0, "position": (0, 1, -5), "rotation": (0, 0, 0, 1)},
+                {"time": 2.0, "position": (5, 1, 0), "rotation": (0, -0.707, 0, 0.707)},
+                {"time": 4.0, "position": (0, 1, 5), "rotation": (0, 1, 0, 0)},
+            ], fps=30)
+        
+        Positions follow a Catmull-Rom spline through the keyframes and
+        rotations are slerped between them (see _CameraPath for the keyframe
+        format), all on this side. One pose per frame is streamed as a
+        notification at fps, capped at Unity's camera rate limit (60 Hz).
+        Frames that are already late when their turn comes are dropped, never
+        queued: playback jumps to the pose that is due now, and each pose
+        carries a one-frame timeout so Unity drops it too if it can't run it
+        in time. Blocks until the path has played; with loop=True it starts
+        over until stop (a threading.Event) is set.
+        
+        Returns:
+            dict with frames (poses sent), dropped (late frames skipped here),
+            failed (poses Unity rejected or dropped) and seconds (elapsed)
+        """
+        if getattr(self._client, "_single_request", False):
+            raise TypeError("play_path streams poses in real time and can't be pipelined, "
+                            "batched, awaited or sent as notifications; call it on the API directly")
+        path = _CameraPath(keyframes, closed=loop)
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        interval = max(1.0 / fps, _CAMERA_UPDATE_INTERVAL)
+        
+        counts = {"failed": 0}
+        def on_message(message):
+            params = message.get("params") or {}
+            if (message.get("method") == "spz.sys.notification_failed"
+                    and params.get("method") == "spz.cmd.set_camera_pose"):
+                counts["failed"] += 1
+        
+        frames = dropped = 0
+        frame = 0
+        self._client.add_message_handler(on_message)
+        started = time.monotonic()
+        try:
+            while stop is None or not stop.is_set():
+                due = started + frame * interval
+                lag = time.monotonic() - due
+                if lag < 0:
+                    time.sleep(-lag)
+                elif lag >= interval:
+                    # Late: skip straight to the latest frame that is due
+                    skipped = int(lag / interval)
+                    dropped += skipped
+                    frame += skipped
+                
+                offset = frame * interval
+                if loop and path.duration > 0:
+                    offset %= path.duration
+                position, rotation, fov = path.pose(offset)
+                self._client._send_notification(
+                    "spz.cmd.set_camera_pose", self._pose_params(camera_index, position, rotation, fov),
+                    interval)
+                frames += 1
+                frame += 1
+                if not loop and offset >= path.duration:
+                    break
+            self._client._sync_notifications()
+        finally:
+            self._client.remove_message_handler(on_message)
+        return {"frames": frames, "dropped": dropped, "failed": counts["failed"],
+                "seconds": time.monotonic() - started}
+    
+    def get_pos(self, camera_index):
+        """Get camera position"""
+        result = self._client._send_request("spz.cmd.get_camera_pos", {
+            "camera_index": camera_index
+        })
+        if result.get("success", False):
+            return {
+                "x": result.get("x", 0.0),
+                "y": result.get("y", 0.0),
+                "z": result.get("z", 0.0)
+            }
+        return None
+    
+    def get_all_positions(self):
+        """Get positions of all cameras"""
+        result = self._client._send_request("spz.cmd.get_all_camera_positions", {})
+        if result.get("success", False):
+            positions = result.get("positions", [])
+            return [{"x": p.get("x", 0.0), "y": p.get("y", 0.0), "z": p.get("z", 0.0)} 
+                    for p in positions]
+        return []
+    
+    def get_all_rotations(self):
+        """Get rotations of all cameras"""
+        result = self._client._send_request("spz.cmd.get_all_camera_rotations", {})
+        if result.get("success", False):
+            rotations = result.get("rotations", [])
+            return [{"x": r.get("x", 0.0), "y": r.get("y", 0.0), 
+                     "z": r.get("z", 0.0), "w": r.get("w", 1.0)} 
+                    for r in rotations]
+        return []
+    
+    def get_all_fovs(self):
+        """Get FOVs of all cameras"""
+        result = self._client._send_request("spz.cmd.get_all_camera_fovs", {})
+        if result.get("success", False):
+            return result.get("fovs", [])
+        return []
+
+
+# ============================================
+# Models API
+# ============================================
+
+class ModelsAPI:
+    """API for mesh/model operations"""
+    
+    # Ids per bulk getter request; longer lists are split (and the parts
+    # sent concurrently on pipelined clients) so no command holds up a frame
+    MAX_IDS_PER_REQUEST = 8192
+    
+    # FastPath_API drops everything past this many meshes in a bulk setter
+    MAX_SET_BATCH = 1000
+    
+    def __init__(self, client):
+        self._client = client
+    
+    def _send_chunked(self, method, count, chunk_size, params_for):
+        """Send method once per chunk of at most chunk_size ids
+        
+        params_for(start, end) builds the params for ids start:end. Deferred
+        calls (pipeline, batch, notify, async) replay a single reply, so they
+        always send the whole list as one request (see _set_many).
+        
+        Returns:
+            List of (start, end, result) for every chunk; when the list was
+            split, result is the exception a chunk raised instead of its reply
+        """
+        if count <= chunk_size or getattr(self._client, "_single_request", False):
+            return [(0, count, self._client._send_request(method, params_for(0, count)))]
+        chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+        futures = [self._client._submit_request(method, params_for(start, end)) for start, end in chunks]
+        results = []
+        for (start, end), future in zip(chunks, futures):
+            try:
+                results.append((start, end, future.result()))
+            except Exception as e:
+                results.append((start, end, e))
+        return results
+    
+    @staticmethod
+    def _all_succeeded(results):
+        """_send_chunked results, or None if any chunk failed (re-raising the first exception)"""
+        for _, _, result in results:
+            if isinstance(result, Exception):
+                raise result
+        if not all(result.get("success", False) for _, _, result in results):
+            return None
+        return results
+    
+    def _set_many(self, method, params):
+        """Send a bulk setter in chunks FastPath_API accepts; returns the total count"""
+        count = params["mesh_ids"].count
+        if count > self.MAX_SET_BATCH and getattr(self._client, "_single_request", False):
+            raise ValueError(f"Deferred bulk setters send one request and FastPath_API applies at most "
+                             f"{self.MAX_SET_BATCH} meshes of it (got {count}); split the list, "
+                             "or call the setter on the API directly")
+        results = self._send_chunked(method, count, self.MAX_SET_BATCH,
+                                     lambda start, end: {key: value.rows(start, end) for key, value in params.items()})
+        applied = 0
+        failed = []
+        for start, end, result in results:
+            if isinstance(result, dict) and result.get("success", False):
+                applied += result.get("count", 0)
+            else:
+                failed.append((start, end, result))
+        # Earlier chunks were applied already, so a split write can't just report 0
+        if failed and len(results) > 1:
+            raise SPZPartialUpdateError(method, applied, failed)
+        return applied
+    
+    def _get_vectors(self, method, name, mesh_ids, keys, out):
+        """Run a bulk vector getter; see get_positions"""
+        ids = _mesh_id_values(mesh_ids)
+        width = len(keys)
+        results = self._all_succeeded(self._send_chunked(method, len(ids), self.MAX_IDS_PER_REQUEST, lambda start, end: {
+            "mesh_ids": _Packed("H", ids[start:end]),
+            "out": _Output("f", width * (end - start), None if out is None else out[start:end])
+        }))
+        if results is None:
+            return None
+        if len(results) == 1:
+            return _vectors_from_result(results[0][2].get(name, []), keys, out)
+        
+        parts = [_vectors_from_result(result.get(name, []), keys, None if out is None else out[start:end])
+                 for start, end, result in results]
+        if out is not None:
+            return out
+        if np is not None:
+            return np.concatenate(parts)
+        return [vector for part in parts for vector in part]
+    
+    def _get_list(self, method, name, mesh_ids):
+        """Run a bulk getter whose result is one value per id"""
+        ids = _mesh_id_values(mesh_ids)
+        results = self._all_succeeded(self._send_chunked(method, len(ids), self.MAX_IDS_PER_REQUEST, lambda start, end: {
+            "mesh_ids": _Packed("H", ids[start:end])
+        }))
+        if results is None:
+            return None
+        values = []
+        for _, _, result in results:
+            part = result.get(name, [])
+            values.extend(part.tolist() if _is_ndarray(part) else part)
+        return values
+    
+    def select(self, mesh_id):
+        """Select a mesh by ID"""
+        result = self._client._send_request("spz.cmd.select_mesh", {
+            "mesh_id": int(mesh_id)
+        })
+        return result.get("success", False)
+    
+    def deselect(self, mesh_id):
+        """Deselect a mesh by ID"""
+        result = self._client._send_request("spz.cmd.deselect_mesh", {
+            "mesh_id": int(mesh_id)
+        })
+        return result.get("success", False)
+    
+    def get_selected(self):
+        """Get list of selected mesh IDs"""
+        result = self._client._send_request("spz.cmd.get_selected_meshes", {})
+        if result.get("success", False):
+            return result.get("mesh_ids", [])
+        return []
+    
+    def select_all(self):
+        """Select all meshes in scene"""
+        result = self._client._send_request("spz.cmd.select_all_meshes", {})
+        return result.get("success", False)
+    
+    def deselect_all(self):
+        """Deselect all meshes"""
+        result = self._client._send_request("spz.cmd.deselect_all_meshes", {})
+        return result.get("success", False)
+    
+    def select_many(self, mesh_ids):
+        """Select several meshes with one command
+        
+        Returns:
+            int: Number of meshes found and selected
+        """
+        result = self._client._send_request("spz.cmd.select_meshes", {
+            "mesh_ids": _Packed("H", _mesh_id_values(mesh_ids))
+        })
+        if result.get("success", False):
+            return result.get("count", 0)
+        return 0
+    
+    def deselect_many(self, mesh_ids):
+        """Deselect several meshes with one command
+        
+        Returns:
+            int: Number of meshes found and deselected
+        """
+        result = self._client._send_request("spz.cmd.deselect_meshes", {
+            "mesh_ids": _Packed("H", _mesh_id_values(mesh_ids))
+        })
+        if result.get("success", False):
+            return result.get("count", 0)
+        return 0
+    
+    def select_where(self, predicate):
+        """Select the meshes a predicate picks from a scene snapshot
+        
+        Example:
+            api.models.select_where(lambda snap: snap["position"][:, 1] > 0)
+        
+        Args:
+            predicate: Called with api.scene.snapshot(); returns one truth
+                value per mesh (a boolean NumPy array, or a list)
+        
+        Returns:
+            int: Number of meshes selected (two requests in all)
+        """
+        return self.select_many(self._ids_where(predicate))
+    
+    def set_pos(self, mesh_id, x, y, z):
+        """Set mesh position"""
+        result = self._client._send_request("spz.cmd.set_mesh_pos", {
+            "mesh_id": int(mesh_id),
+            "x": float(x),
+            "y": float(y),
+            "z": float(z)
+        })
+        return result.get("success", False)
+    
+    def set_rot(self, mesh_id, x, y, z, w):
+        """Set mesh rotation (quaternion)"""
+        result = self._client._send_request("spz.cmd.set_mesh_rot", {
+            "mesh_id": int(mesh_id),
+            "x": float(x),
+            "y": float(y),
+            "z": float(z),
+            "w": float(w)
+        })
+        return result.get("success", False)
+    
+    def set_scale(self, mesh_id, x, y, z):
+        """Set mesh scale"""
+        result = self._client._send_request("spz.cmd.set_mesh_scale", {
+            "mesh_id": int(mesh_id),
+            "x": float(x),
+            "y": float(y),
+            "z": float(z)
+        })
+        return result.get("success", False)
+    
+    def set_positions(self, mesh_ids, positions):
+        """Batch set mesh positions (performance optimization)
+        
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            positions: List of (x, y, z) tuples or dicts with x, y, z, or an
+                (n, 3) NumPy array (float32 is sent without a copy)
+        
+        Returns:
+            int: Number of successfully updated meshes
+        
+        Raises:
+            ValueError: If the counts differ or any component is NaN,
+                infinite or beyond MAX_REASONABLE_VALUE (FastPath_API would
+                drop those meshes); nothing is sent
+            SPZPartialUpdateError: If the ids were sent in several requests
+                (more than MAX_SET_BATCH) and some of them failed; its count
+                and failed say what was and wasn't applied
+        """
+        return self._set_many("spz.cmd.set_mesh_positions", _bulk_params(mesh_ids, "positions", positions, "xyz"))
+    
+    def set_rotations(self, mesh_ids, rotations):
+        """Batch set mesh rotations (performance optimization)
+        
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            rotations: List of (x, y, z, w) tuples or dicts with x, y, z, w,
+                or an (n, 4) NumPy array (float32 is sent without a copy)
+        
+        Returns:
+            int: Number of successfully updated meshes
+        
+        Raises:
+            ValueError: If the counts differ or any component is NaN,
+                infinite or beyond MAX_REASONABLE_VALUE (FastPath_API would
+                drop those meshes); nothing is sent
+            SPZPartialUpdateError: If the ids were sent in several requests
+                (more than MAX_SET_BATCH) and some of them failed; its count
+                and failed say what was and wasn't applied
+        """
+        return self._set_many("spz.cmd.set_mesh_rotations", _bulk_params(mesh_ids, "rotations", rotations, "xyzw"))
+    
+    def set_scales(self, mesh_ids, scales):
+        """Batch set mesh scales (performance optimization)
+        
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            scales: List of (x, y, z) tuples or dicts with x, y, z, or an
+                (n, 3) NumPy array (float32 is sent without a copy)
+        
+        Returns:
+            int: Number of successfully updated meshes
+        
+        Raises:
+            ValueError: If the counts differ or any component is NaN,
+                infinite or beyond MAX_REASONABLE_VALUE (FastPath_API would
+                drop those meshes); nothing is sent
+            SPZPartialUpdateError: If the ids were sent in several requests
+                (more than MAX_SET_BATCH) and some of them failed; its count
+                and failed say what was and wasn't applied
+        """
+        return self._set_many("spz.cmd.set_mesh_scales", _bulk_params(mesh_ids, "scales", scales, "xyz"))
+    
+    def set_visibility(self, mesh_id, visible):
+        """Set mesh visibility"""
+        result = self._client._send_request("spz.cmd.set_mesh_visibility", {
+            "mesh_id": int(mesh_id),
+            "visible": bool(visible)
+        })
+        return result.get("success", False)
+    
+    def set_visibilities(self, mesh_ids, visible):
+        """Show or hide several meshes with one command
+        
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            visible: One bool for all of them, or one per mesh (a sequence
+                or boolean NumPy array)
+        
+        Returns:
+            int: Number of meshes found and updated
+        """
+        ids = _mesh_id_values(mesh_ids)
+        if not hasattr(visible, "__len__") or (_is_ndarray(visible) and visible.ndim == 0):
+            mask = bool(visible)
+        else:
+            if _is_ndarray(visible):
+                mask = np.asarray(visible, dtype=bool).ravel().view(np.uint8)
+            else:
+                mask = [1 if flag else 0 for flag in visible]
+            if len(mask) != len(ids):
+                raise ValueError(f"Got {len(ids)} mesh ids but {len(mask)} visibility flags")
+            mask = _Packed("B", mask)
+        result = self._client._send_request("spz.cmd.set_mesh_visibilities", {
+            "mesh_ids": _Packed("H", ids),
+            "visible": mask
+        })
+        if result.get("success", False):
+            return result.get("count", 0)
+        return 0
+    
+    def set_visibility_by_selection(self, selected=None, unselected=None):
+        """Show or hide meshes by selection state with one command
+        
+        Args:
+            selected: Visibility for selected meshes (None leaves them as they are)
+            unselected: Visibility for unselected meshes (None leaves them)
+        
+        Returns:
+            int: Number of meshes updated
+        """
+        result = self._client._send_request("spz.cmd.set_visibility_by_selection", {
+            "selected": None if selected is None else bool(selected),
+            "unselected": None if unselected is None else bool(unselected)
+        })
+        if result.get("success", False):
+            return result.get("count", 0)
+        return 0
+    
+    def isolate_selected(self):
+        """Show the selected meshes and hide all others"""
+        return self.set_visibility_by_selection(selected=True, unselected=False)
+    
+    def hide_unselected(self):
+        """Hide every mesh that isn't selected"""
+        return self.set_visibility_by_selection(unselected=False)
+    
+    def show_all(self):
+        """Show every mesh"""
+        return self.set_visibility_by_selection(selected=True, unselected=True)
+    
+    def set_visibility_where(self, predicate, visible):
+        """Show or hide the meshes a predicate picks from a scene snapshot
+        
+        Example:
+            api.models.set_visibility_where(lambda snap: snap["bounds_size"][:, 1] < 0.1, False)
+        
+        Returns:
+            int: Number of meshes updated (two requests in all)
+        """
+        return self.set_visibilities(self._ids_where(predicate), visible)
+    
+    def _ids_where(self, predicate):
+        """Ids of the meshes predicate(snapshot) picks"""
+        if getattr(self._client, "_single_request", False):
+            raise TypeError("Predicate helpers send two requests and can't be pipelined, "
+                            "batched or awaited; call them on the API directly")
+        snapshot = SceneAPI(self._client).snapshot()
+        if snapshot is None:
+            return []
+        mask = predicate(snapshot)
+        if np is not None:
+            return snapshot["id"][np.asarray(mask, dtype=bool)]
+        return [mesh_id for mesh_id, picked in zip(snapshot["id"], mask) if picked]
+    
+    def get_pos(self, mesh_id):
+        """Get mesh position"""
+        result = self._client._send_request("spz.cmd.get_mesh_pos", {
+            "mesh_id": int(mesh_id)
+        })
+        if result.get("success", False):
+            return {
+                "x": result.get("x", 0.0),
+                "y": result.get("y", 0.0),
+                "z": result.get("z", 0.0)
+            }
+        return None
+    
+    def get_rot(self, mesh_id):
+        """Get mesh rotation (quaternion)"""
+        result = self._client._send_request("spz.cmd.get_mesh_rot", {
+            "mesh_id": int(mesh_id)
+        })
+        if result.get("success", False):
+            return {
+                "x": result.get("x", 0.0),
+                "y": result.get("y", 0.0),
+                "z": result.get("z", 0.0),
+                "w": result.get("w", 1.0)
+            }
+        return None
+    
+    def get_scale(self, mesh_id):
+        """Get mesh scale"""
+        result = self._client._send_request("spz.cmd.get_mesh_scale", {
+            "mesh_id": int(mesh_id)
+        })
+        if result.get("success", False):
+            return {
+                "x": result.get("x", 1.0),
+                "y": result.get("y", 1.0),
+                "z": result.get("z", 1.0)
+            }
+        return None
+    
+    def get_positions(self, mesh_ids, out=None):
+        """Batch get mesh positions in one request (performance optimization)
+        
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            out: Optional (n, 3) float32 NumPy array to fill. With
+                SPZClient(shared_memory=...), pass one from
+                client.shared_array() and the server writes straight into it.
+        
+        Returns:
+            (n, 3) float32 NumPy array (NaN rows for missing meshes), or a
+            list of (x, y, z) tuples (None for missing meshes) without NumPy
+        """
+        return self._get_vectors("spz.cmd.get_mesh_positions", "positions", mesh_ids, "xyz", out)
+    
+    def get_rotations(self, mesh_ids, out=None):
+        """Batch get mesh rotations in one request
+        
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            out: Optional (n, 4) float32 NumPy array to fill (see get_positions)
+        
+        Returns:
+            (n, 4) float32 NumPy array of x, y, z, w (NaN rows for missing
+            meshes), or a list of tuples (None for missing meshes) without NumPy
+        """
+        return self._get_vectors("spz.cmd.get_mesh_rotations", "rotations", mesh_ids, "xyzw", out)
     
-    def __init__(self, host='127.0.0.1', port=5555):
-        self.host = host
-        self.port = port
-        self.socket = None
-        self._lock = threading.Lock()
-        self._request_id = 0
+    def get_scales(self, mesh_ids, out=None):
+        """Batch get mesh scales in one request
         
-    def _get_next_id(self):
-        """Get next request ID"""
-        with self._lock:
-            self._request_id += 1
-            return self._request_id
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            out: Optional (n, 3) float32 NumPy array to fill (see get_positions)
+        
+        Returns:
+            (n, 3) float32 NumPy array (NaN rows for missing meshes), or a
+            list of (x, y, z) tuples (None for missing meshes) without NumPy
+        """
+        return self._get_vectors("spz.cmd.get_mesh_scales", "scales", mesh_ids, "xyz", out)
     
-    def _connect(self):
-        """Establish connection to server"""
-        if self.socket is None or self.socket.fileno() == -1:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(5.0)
-            try:
-                self.socket.connect((self.host, self.port))
-            except Exception as e:
-                self.socket = None
-                raise ConnectionError(f"Failed to connect to StableProjectorz: {e}")
+    def get_bounds_many(self, mesh_ids, out=None):
+        """Batch get mesh bounds in one request
+        
+        Args:
+            mesh_ids: List (or NumPy array) of mesh IDs
+            out: Optional (n, 6) float32 NumPy array to fill (see get_positions)
+        
+        Returns:
+            (n, 6) float32 NumPy array of center x, y, z and size x, y, z
+            (NaN rows for missing meshes), or a list of 6-tuples (None for
+            missing meshes) without NumPy
+        """
+        keys = ("center_x", "center_y", "center_z", "size_x", "size_y", "size_z")
+        return self._get_vectors("spz.cmd.get_mesh_bounds_many", "bounds", mesh_ids, keys, out)
     
-    def _send_request(self, method, params=None):
-        """Send a JSON-RPC request and return the response"""
-        self._connect()
+    def get_visibilities(self, mesh_ids):
+        """Batch get mesh visibility in one request
+        
+        Returns:
+            List of bools (None for missing meshes)
+        """
+        values = self._get_list("spz.cmd.get_mesh_visibilities", "visible", mesh_ids)
+        if values is None:
+            return None
+        return [None if value is None or value == 255 else bool(value) for value in values]
+    
+    def get_names(self, mesh_ids):
+        """Batch get mesh names in one request
         
-        request = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params or {},
-            "id": self._get_next_id()
-        }
+        Returns:
+            List of names (None for missing meshes)
+        """
+        return self._get_list("spz.cmd.get_mesh_names", "names", mesh_ids)
+    
+    def get_bounds(self, mesh_id):
+        """Get mesh bounds"""
+        result = self._client._send_request("spz.cmd.get_mesh_bounds", {
+            "mesh_id": int(mesh_id)
+        })
+        if result.get("success", False):
+            return {
+                "center": {
+                    "x": result.get("center_x", 0.0),
+                    "y": result.get("center_y", 0.0),
+                    "z": result.get("center_z", 0.0)
+                },
+                "size": {
+                    "x": result.get("size_x", 0.0),
+                    "y": result.get("size_y", 0.0),
+                    "z": result.get("size_z", 0.0)
+                }
+            }
+        return None
+    
+    def get_visibility(self, mesh_id):
+        """Get mesh visibility"""
+        result = self._client._send_request("spz.cmd.get_mesh_visibility", {
+            "mesh_id": int(mesh_id)
+        })
+        if result.get("success", False):
+            return result.get("visible", True)
+        return None
+    
+    def get_name(self, mesh_id):
+        """Get mesh name"""
+        result = self._client._send_request("spz.cmd.get_mesh_name", {
+            "mesh_id": int(mesh_id)
+        })
+        if result.get("success", False):
+            return result.get("name", "")
+        return None
+
+
+# ============================================
+# Scene API
+# ============================================
+
+class SceneAPI:
+    """API for scene information"""
+    
+    def __init__(self, client):
+        self._client = client
+    
+    def get_total_mesh_count(self):
+        """Get total number of meshes in scene"""
+        result = self._client._send_request("spz.cmd.get_total_mesh_count", {})
+        if result.get("success", False):
+            return result.get("count", 0)
+        return 0
+    
+    def get_selected_mesh_count(self):
+        """Get number of selected meshes"""
+        result = self._client._send_request("spz.cmd.get_selected_mesh_count", {})
+        if result.get("success", False):
+            return result.get("count", 0)
+        return 0
+    
+    def get_all_mesh_ids(self):
+        """Get all mesh IDs in scene"""
+        result = self._client._send_request("spz.cmd.get_all_mesh_ids", {})
+        if result.get("success", False):
+            return result.get("mesh_ids", [])
+        return []
+    
+    def snapshot(self):
+        """Get the state of every mesh in one round trip
         
-        request_json = json.dumps(request) + "\n"
+        Example:
+            snap = api.scene.snapshot()
+            hidden = snap["id"][~snap["visible"]]
+            lowest = snap[snap["position"][:, 1].argmin()]["name"]
         
-        try:
-            self.socket.sendall(request_json.encode('utf-8'))
-            
-            # Receive response
-            response_data = b""
-            while True:
-                chunk = self.socket.recv(4096)
-                if not chunk:
-                    break
-                response_data += chunk
-                if b"\n" in response_data:
-                    break
-            
-            response_str = response_data.decode('utf-8').strip()
-            response = json.loads(response_str)
-            
-            if "error" in response:
-                raise RuntimeError(f"Server error: {response['error'].get('message', 'Unknown error')}")
-            
-            return response.get("result", {})
-        except Exception as e:
-            self.socket = None  # Reset connection on error
-            raise
+        Returns:
+            NumPy structured array with one record per mesh and fields id,
+            name, position (3), rotation (4, x y z w), scale (3),
+            bounds_center (3), bounds_size (3), visible and selected; without
+            NumPy, a dict of the same columns as lists. None on failure.
+        """
+        result = self._client._send_request("spz.cmd.get_scene_snapshot", {})
+        if result.get("success", False):
+            return _snapshot_from_result(result)
+        return None
     
-    def close(self):
-        """Close the connection"""
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
-            self.socket = None
+    def get_selected_meshes_bounds(self):
+        """Get bounds of all selected meshes"""
+        result = self._client._send_request("spz.cmd.get_selected_meshes_bounds", {})
+        if result.get("success", False):
+            return {
+                "center": {
+                    "x": result.get("center_x", 0.0),
+                    "y": result.get("center_y", 0.0),
+                    "z": result.get("center_z", 0.0)
+                },
+                "size": {
+                    "x": result.get("size_x", 0.0),
+                    "y": result.get("size_y", 0.0),
+                    "z": result.get("size_z", 0.0)
+                }
+            }
+        return None
 
 
-# Global client instance
-_client = None
+# ============================================
+# Waiting for Long-Running Work
+# ============================================
 
+def _waits_for(check, what):
+    """Mark a facade method that polls check (a method of the same facade) until it is False
+    
+    A polling loop can't be replayed from one reply, so deferred facades
+    don't run it through their dispatch: async facades await
+    _async_wait_until_idle instead, and the others refuse it.
+    """
+    def mark(method):
+        method._waits_for = (check, what)
+        return method
+    return mark
 
-def _get_client():
-    """Get or create the global client instance"""
-    global _client
-    if _client is None:
-        _client = SPZClient()
-    return _client
+
+def _poll_delays(what, timeout, initial_delay, max_delay):
+    """Sleeps between polls: initial_delay doubling up to max_delay
+    
+    Raises SPZTimeoutError once timeout seconds (None: no limit) have passed.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        if deadline is None:
+            yield delay
+        else:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SPZTimeoutError(f"{what} still in progress after {timeout:.3g}s", timeout=timeout)
+            yield min(delay, remaining)
+        delay = min(delay * 2, max_delay)
+
+
+def _wait_until_idle(check, what, timeout=None, initial_delay=0.02, max_delay=1.0):
+    """Poll check() with adaptive backoff until it returns False; returns seconds waited"""
+    start = time.monotonic()
+    delays = _poll_delays(what, timeout, initial_delay, max_delay)
+    while check():
+        time.sleep(next(delays))
+    return time.monotonic() - start
+
+
+async def _async_wait_until_idle(check, what, timeout=None, initial_delay=0.02, max_delay=1.0):
+    """_wait_until_idle for an awaitable check()"""
+    start = time.monotonic()
+    delays = _poll_delays(what, timeout, initial_delay, max_delay)
+    while await check():
+        await asyncio.sleep(next(delays))
+    return time.monotonic() - start
 
 
 # ============================================
-# Camera API
+# Stable Diffusion API
 # ============================================
 
-class CameraAPI:
-    """API for camera operations"""
+class StableDiffusionAPI:
+    """API for Stable Diffusion operations"""
     
     def __init__(self, client):
         self._client = client
     
-    def set_pos(self, camera_index, x, y, z):
-        """Set camera position"""
-        result = self._client._send_request("spz.cmd.set_camera_pos", {
-            "camera_index": camera_index,
-            "x": float(x),
-            "y": float(y),
-            "z": float(z)
+    def get_positive_prompt(self):
+        """Get current positive prompt"""
+        result = self._client._send_request("spz.cmd.get_positive_prompt", {})
+        if result.get("success", False):
+            return result.get("prompt", "")
+        return None
+    
+    def set_positive_prompt(self, prompt):
+        """Set positive prompt"""
+        result = self._client._send_request("spz.cmd.set_positive_prompt", {
+            "prompt": str(prompt)
         })
         return result.get("success", False)
     
-    def set_rot(self, camera_index, x, y, z, w):
-        """Set camera rotation (quaternion)"""
-        result = self._client._send_request("spz.cmd.set_camera_rot", {
-            "camera_index": camera_index,
-            "x": float(x),
-            "y": float(y),
-            "z": float(z),
-            "w": float(w)
+    def get_negative_prompt(self):
+        """Get current negative prompt"""
+        result = self._client._send_request("spz.cmd.get_negative_prompt", {})
+        if result.get("success", False):
+            return result.get("prompt", "")
+        return None
+    
+    def set_negative_prompt(self, prompt):
+        """Set negative prompt"""
+        result = self._client._send_request("spz.cmd.set_negative_prompt", {
+            "prompt": str(prompt)
         })
         return result.get("success", False)
     
-    def set_fov(self, camera_index, fov):
-        """Set camera field of view"""
-        result = self._client._send_request("spz.cmd.set_camera_fov", {
-            "camera_index": camera_index,
-            "fov": float(fov)
+    def trigger_generation(self, is_background=False):
+        """Trigger texture generation"""
+        result = self._client._send_request("spz.cmd.trigger_texture_generation", {
+            "is_background": bool(is_background)
         })
         return result.get("success", False)
     
-    def get_pos(self, camera_index):
-        """Get camera position"""
-        result = self._client._send_request("spz.cmd.get_camera_pos", {
-            "camera_index": camera_index
-        })
-        if result.get("success", False):
-            return {
-                "x": result.get("x", 0.0),
-                "y": result.get("y", 0.0),
-                "z": result.get("z", 0.0)
-            }
-        return None
+    def stop_generation(self):
+        """Stop current generation"""
+        result = self._client._send_request("spz.cmd.stop_generation", {})
+        return result.get("success", False)
     
-    def get_all_positions(self):
-        """Get positions of all cameras"""
-        result = self._client._send_request("spz.cmd.get_all_camera_positions", {})
+    def is_generating(self):
+        """Check if generation is in progress"""
+        result = self._client._send_request("spz.cmd.is_generating", {})
         if result.get("success", False):
-            positions = result.get("positions", [])
-            return [{"x": p.get("x", 0.0), "y": p.get("y", 0.0), "z": p.get("z", 0.0)} 
-                    for p in positions]
-        return []
+            return result.get("generating", False)
+        return False
     
-    def get_all_rotations(self):
-        """Get rotations of all cameras"""
-        result = self._client._send_request("spz.cmd.get_all_camera_rotations", {})
-        if result.get("success", False):
-            rotations = result.get("rotations", [])
-            return [{"x": r.get("x", 0.0), "y": r.get("y", 0.0), 
-                     "z": r.get("z", 0.0), "w": r.get("w", 1.0)} 
-                    for r in rotations]
-        return []
+    @_waits_for("is_generating", "Generation")
+    def wait_until_done(self, timeout=None, initial_delay=0.02, max_delay=1.0):
+        """Block until no generation is in progress
+        
+        Polls is_generating() every initial_delay seconds at first, doubling
+        the interval up to max_delay: short generations are noticed within a
+        frame or two, long ones cost about one command per max_delay seconds.
+        (api.events pushes generation_finished without any polling.)
+        
+        Returns:
+            float: Seconds spent waiting
+        
+        Raises:
+            SPZTimeoutError: If generation is still running after timeout seconds
+        """
+        return _wait_until_idle(self.is_generating, "Generation", timeout, initial_delay, max_delay)
     
-    def get_all_fovs(self):
-        """Get FOVs of all cameras"""
-        result = self._client._send_request("spz.cmd.get_all_camera_fovs", {})
+    def is_connected(self):
+        """Check if Stable Diffusion service is connected"""
+        result = self._client._send_request("spz.cmd.is_sd_connected", {})
         if result.get("success", False):
-            return result.get("fovs", [])
-        return []
+            return result.get("connected", False)
+        return False
 
 
 # ============================================
-# Models API
+# 3D Generation API
 # ============================================
 
-class ModelsAPI:
-    """API for mesh/model operations"""
+class Gen3DAPI:
+    """API for 3D generation operations"""
     
     def __init__(self, client):
         self._client = client
     
-    def select(self, mesh_id):
-        """Select a mesh by ID"""
-        result = self._client._send_request("spz.cmd.select_mesh", {
-            "mesh_id": int(mesh_id)
-        })
-        return result.get("success", False)
-    
-    def deselect(self, mesh_id):
-        """Deselect a mesh by ID"""
-        result = self._client._send_request("spz.cmd.deselect_mesh", {
-            "mesh_id": int(mesh_id)
-        })
-        return result.get("success", False)
+    def is_ready(self):
+        """Check if 3D generation can start"""
+        result = self._client._send_request("spz.cmd.is_3d_generation_ready", {})
+        if result.get("success", False):
+            return result.get("ready", False)
+        return False
     
-    def get_selected(self):
-        """Get list of selected mesh IDs"""
-        result = self._client._send_request("spz.cmd.get_selected_meshes", {})
+    def is_in_progress(self):
+        """Check if 3D generation is in progress"""
+        result = self._client._send_request("spz.cmd.is_3d_generation_in_progress", {})
         if result.get("success", False):
-            return result.get("mesh_ids", [])
-        return []
+            return result.get("in_progress", False)
+        return False
     
-    def select_all(self):
-        """Select all meshes in scene"""
-        result = self._client._send_request("spz.cmd.select_all_meshes", {})
-        return result.get("success", False)
+    @_waits_for("is_in_progress", "3D generation")
+    def wait_until_done(self, timeout=None, initial_delay=0.02, max_delay=1.0):
+        """Block until no 3D generation is in progress
+        
+        Polls is_in_progress() with adaptive backoff (see
+        StableDiffusionAPI.wait_until_done).
+        
+        Returns:
+            float: Seconds spent waiting
+        
+        Raises:
+            SPZTimeoutError: If 3D generation is still running after timeout seconds
+        """
+        return _wait_until_idle(self.is_in_progress, "3D generation", timeout, initial_delay, max_delay)
     
-    def deselect_all(self):
-        """Deselect all meshes"""
-        result = self._client._send_request("spz.cmd.deselect_all_meshes", {})
+    def trigger(self):
+        """Trigger 3D generation"""
+        result = self._client._send_request("spz.cmd.trigger_3d_generation", {})
         return result.get("success", False)
+
+
+# ============================================
+# Export API
+# ============================================
+
+class ExportAPI:
+    """API for export operations"""
     
-    def set_pos(self, mesh_id, x, y, z):
-        """Set mesh position"""
-        result = self._client._send_request("spz.cmd.set_mesh_pos", {
-            "mesh_id": int(mesh_id),
-            "x": float(x),
-            "y": float(y),
-            "z": float(z)
-        })
-        return result.get("success", False)
+    def __init__(self, client):
+        self._client = client
     
-    def set_rot(self, mesh_id, x, y, z, w):
-        """Set mesh rotation (quaternion)"""
-        result = self._client._send_request("spz.cmd.set_mesh_rot", {
-            "mesh_id": int(mesh_id),
-            "x": float(x),
-            "y": float(y),
-            "z": float(z),
-            "w": float(w)
-        })
+    def export_3d_with_textures(self):
+        """Export 3D model with textures"""
+        result = self._client._send_request("spz.cmd.export_3d_with_textures", {})
         return result.get("success", False)
     
-    def set_scale(self, mesh_id, x, y, z):
-        """Set mesh scale"""
-        result = self._client._send_request("spz.cmd.set_mesh_scale", {
-            "mesh_id": int(mesh_id),
-            "x": float(x),
-            "y": float(y),
-            "z": float(z)
-        })
+    def export_projection_textures(self, is_dilate=True, path=None):
+        """Export projection textures
+        
+        Args:
+            is_dilate: Spread textures past their UV islands to hide seams
+            path: Absolute base path (e.g. "D:/out/statue.png") to save to
+                without asking; the ambient occlusion map and extra UDIM
+                tiles get suffixes. None shows the save dialog.
+        
+        The export finishes after this returns (see
+        project.wait_until_idle).
+        """
+        params = {"is_dilate": bool(is_dilate)}
+        if path is not None:
+            params["path"] = os.path.abspath(path)
+        result = self._client._send_request("spz.cmd.export_projection_textures", params)
         return result.get("success", False)
     
-    def set_positions(self, mesh_ids, positions):
-        """Batch set mesh positions (performance optimization)
+    def export_view_textures(self, path=None):
+        """Export view textures (what camera sees): content, depth, normals and vertex colors
         
         Args:
-            mesh_ids: List of mesh IDs
-            positions: List of (x, y, z) tuples or dicts with x, y, z
-            
-        Returns:
-            int: Number of successfully updated meshes
+            path: Absolute base path to save to without asking (each texture
+                gets a suffix such as "_Depth"); None shows the save dialog
         """
-        # Convert positions to list of dicts
-        pos_list = []
-        for pos in positions:
-            if isinstance(pos, dict):
-                pos_list.append({"x": float(pos["x"]), "y": float(pos["y"]), "z": float(pos["z"])})
-            else:
-                pos_list.append({"x": float(pos[0]), "y": float(pos[1]), "z": float(pos[2])})
-        
-        result = self._client._send_request("spz.cmd.set_mesh_positions", {
-            "mesh_ids": [int(id) for id in mesh_ids],
-            "positions": pos_list
-        })
+        params = {}
+        if path is not None:
+            params["path"] = os.path.abspath(path)
+        result = self._client._send_request("spz.cmd.export_view_textures", params)
+        return result.get("success", False)
+
+
+# ============================================
+# Workflow API
+# ============================================
+
+class WorkflowAPI:
+    """API for workflow mode operations"""
+    
+    def __init__(self, client):
+        self._client = client
+    
+    def get_mode(self):
+        """Get current workflow mode"""
+        result = self._client._send_request("spz.cmd.get_workflow_mode", {})
         if result.get("success", False):
-            return result.get("count", 0)
-        return 0
+            return result.get("mode", "ProjectionsMasking")
+        return None
     
-    def set_rotations(self, mesh_ids, rotations):
-        """Batch set mesh rotations (performance optimization)
+    def set_mode(self, mode):
+        """Set workflow mode
         
-        Args:
-            mesh_ids: List of mesh IDs
-            rotations: List of (x, y, z, w) tuples or dicts with x, y, z, w
-            
-        Returns:
-            int: Number of successfully updated meshes
+        Valid modes:
+        - "ProjectionsMasking"
+        - "Inpaint_Color"
+        - "Inpaint_NoColor"
+        - "TotalObject"
+        - "WhereEmpty"
+        - "AntiShade"
         """
-        # Convert rotations to list of dicts
-        rot_list = []
-        for rot in rotations:
-            if isinstance(rot, dict):
-                rot_list.append({"x": float(rot["x"]), "y": float(rot["y"]), "z": float(rot["z"]), "w": float(rot["w"])})
-            else:
-                rot_list.append({"x": float(rot[0]), "y": float(rot[1]), "z": float(rot[2]), "w": float(rot[3])})
-        
-        result = self._client._send_request("spz.cmd.set_mesh_rotations", {
-            "mesh_ids": [int(id) for id in mesh_ids],
-            "rotations": rot_list
+        result = self._client._send_request("spz.cmd.set_workflow_mode", {
+            "mode": str(mode)
         })
+        return result.get("success", False)
+
+
+# ============================================
+# ControlNet API
+# ============================================
+
+class ControlNetAPI:
+    """API for ControlNet operations"""
+    
+    def __init__(self, client):
+        self._client = client
+    
+    def get_unit_count(self):
+        """Get total number of ControlNet units"""
+        result = self._client._send_request("spz.cmd.get_controlnet_unit_count", {})
         if result.get("success", False):
             return result.get("count", 0)
         return 0
     
-    def set_scales(self, mesh_ids, scales):
-        """Batch set mesh scales (performance optimization)
-        
-        Args:
-            mesh_ids: List of mesh IDs
-            scales: List of (x, y, z) tuples or dicts with x, y, z
-            
-        Returns:
-            int: Number of successfully updated meshes
-        """
-        # Convert scales to list of dicts
-        scale_list = []
-        for scale in scales:
-            if isinstance(scale, dict):
-                scale_list.append({"x": float(scale["x"]), "y": float(scale["y"]), "z": float(scale["z"])})
-            else:
-                scale_list.append({"x": float(scale[0]), "y": float(scale[1]), "z": float(scale[2])})
-        
-        result = self._client._send_request("spz.cmd.set_mesh_scales", {
-            "mesh_ids": [int(id) for id in mesh_ids],
-            "scales": scale_list
-        })
+    def get_active_unit_count(self):
+        """Get number of active ControlNet units"""
+        result = self._client._send_request("spz.cmd.get_active_controlnet_unit_count", {})
         if result.get("success", False):
             return result.get("count", 0)
         return 0
     
-    def set_visibility(self, mesh_id, visible):
-        """Set mesh visibility"""
-        result = self._client._send_request("spz.cmd.set_mesh_visibility", {
-            "mesh_id": int(mesh_id),
-            "visible": bool(visible)
+    def set_unit_enabled(self, unit_index, enabled):
+        """Enable or disable a ControlNet unit
+        
+        Args:
+            unit_index: Index of the ControlNet unit (0-based)
+            enabled: True to enable, False to disable
+        """
+        result = self._client._send_request("spz.cmd.set_controlnet_unit_enabled", {
+            "unit_index": int(unit_index),
+            "enabled": bool(enabled)
         })
         return result.get("success", False)
     
-    def get_pos(self, mesh_id):
-        """Get mesh position"""
-        result = self._client._send_request("spz.cmd.get_mesh_pos", {
-            "mesh_id": int(mesh_id)
-        })
-        if result.get("success", False):
-            return {
-                "x": result.get("x", 0.0),
-                "y": result.get("y", 0.0),
-                "z": result.get("z", 0.0)
-            }
-        return None
-    
-    def get_rot(self, mesh_id):
-        """Get mesh rotation (quaternion)"""
-        result = self._client._send_request("spz.cmd.get_mesh_rot", {
-            "mesh_id": int(mesh_id)
-        })
-        if result.get("success", False):
-            return {
-                "x": result.get("x", 0.0),
-                "y": result.get("y", 0.0),
-                "z": result.get("z", 0.0),
-                "w": result.get("w", 1.0)
-            }
-        return None
-    
-    def get_scale(self, mesh_id):
-        """Get mesh scale"""
-        result = self._client._send_request("spz.cmd.get_mesh_scale", {
-            "mesh_id": int(mesh_id)
+    def get_unit_enabled(self, unit_index):
+        """Get enabled state of a ControlNet unit
+        
+        Args:
+            unit_index: Index of the ControlNet unit (0-based)
+        
+        Returns:
+            bool or None if unit doesn't exist
+        """
+        result = self._client._send_request("spz.cmd.get_controlnet_unit_enabled", {
+            "unit_index": int(unit_index)
         })
         if result.get("success", False):
-            return {
-                "x": result.get("x", 1.0),
-                "y": result.get("y", 1.0),
-                "z": result.get("z", 1.0)
-            }
+            return result.get("enabled", False)
         return None
     
-    def get_bounds(self, mesh_id):
-        """Get mesh bounds"""
-        result = self._client._send_request("spz.cmd.get_mesh_bounds", {
-            "mesh_id": int(mesh_id)
-        })
-        if result.get("success", False):
-            return {
-                "center": {
-                    "x": result.get("center_x", 0.0),
-                    "y": result.get("center_y", 0.0),
-                    "z": result.get("center_z", 0.0)
-                },
-                "size": {
-                    "x": result.get("size_x", 0.0),
-                    "y": result.get("size_y", 0.0),
-                    "z": result.get("size_z", 0.0)
-                }
-            }
-        return None
+    def set_unit_weight(self, unit_index, weight):
+        """Set ControlNet unit weight
+        
+        Args:
+            unit_index: Index of the ControlNet unit (0-based)
+            weight: Control weight (0.0-2.0)
+        """
+        result = self._client._send_request("spz.cmd.set_controlnet_unit_weight", {
+            "unit_index": int(unit_index),
+            "weight": float(weight)
+        })
+        return result.get("success", False)
     
-    def get_visibility(self, mesh_id):
-        """Get mesh visibility"""
-        result = self._client._send_request("spz.cmd.get_mesh_visibility", {
-            "mesh_id": int(mesh_id)
+    def get_unit_weight(self, unit_index):
+        """Get ControlNet unit weight
+        
+        Args:
+            unit_index: Index of the ControlNet unit (0-based)
+        
+        Returns:
+            float or None if unit doesn't exist
+        """
+        result = self._client._send_request("spz.cmd.get_controlnet_unit_weight", {
+            "unit_index": int(unit_index)
         })
         if result.get("success", False):
-            return result.get("visible", True)
+            return result.get("weight", 1.0)
         return None
     
-    def get_name(self, mesh_id):
-        """Get mesh name"""
-        result = self._client._send_request("spz.cmd.get_mesh_name", {
-            "mesh_id": int(mesh_id)
+    def get_unit_model(self, unit_index):
+        """Get ControlNet unit model name
+        
+        Args:
+            unit_index: Index of the ControlNet unit (0-based)
+        
+        Returns:
+            str or None if unit doesn't exist
+        """
+        result = self._client._send_request("spz.cmd.get_controlnet_unit_model", {
+            "unit_index": int(unit_index)
         })
         if result.get("success", False):
-            return result.get("name", "")
+            return result.get("model", "None")
         return None
 
 
 # ============================================
-# Scene API
+# Background API
 # ============================================
 
-class SceneAPI:
-    """API for scene information"""
+class BackgroundAPI:
+    """API for background/skybox operations"""
     
     def __init__(self, client):
         self._client = client
     
-    def get_total_mesh_count(self):
-        """Get total number of meshes in scene"""
-        result = self._client._send_request("spz.cmd.get_total_mesh_count", {})
-        if result.get("success", False):
-            return result.get("count", 0)
-        return 0
+    def set_skybox_color(self, is_top, r, g, b, a=1.0):
+        """Set skybox gradient color
+        
+        Args:
+            is_top: True for top color, False for bottom color
+            r, g, b, a: Color components (0.0-1.0)
+        """
+        result = self._client._send_request("spz.cmd.set_skybox_color", {
+            "is_top": bool(is_top),
+            "r": float(r),
+            "g": float(g),
+            "b": float(b),
+            "a": float(a)
+        })
+        return result.get("success", False)
     
-    def get_selected_mesh_count(self):
-        """Get number of selected meshes"""
-        result = self._client._send_request("spz.cmd.get_selected_mesh_count", {})
+    def is_gradient_clear(self):
+        """Check if skybox gradient is clear (no gradient colors)"""
+        result = self._client._send_request("spz.cmd.is_skybox_gradient_clear", {})
         if result.get("success", False):
-            return result.get("count", 0)
-        return 0
+            return result.get("is_clear", True)
+        return True
     
-    def get_all_mesh_ids(self):
-        """Get all mesh IDs in scene"""
-        result = self._client._send_request("spz.cmd.get_all_mesh_ids", {})
+    def get_skybox_top_color(self):
+        """Get skybox top gradient color
+        
+        Returns:
+            dict with r, g, b, a (0.0-1.0) or None if failed
+        """
+        result = self._client._send_request("spz.cmd.get_skybox_top_color", {})
         if result.get("success", False):
-            return result.get("mesh_ids", [])
-        return []
+            return {
+                "r": result.get("r", 0.0),
+                "g": result.get("g", 0.0),
+                "b": result.get("b", 0.0),
+                "a": result.get("a", 1.0)
+            }
+        return None
     
-    def get_selected_meshes_bounds(self):
-        """Get bounds of all selected meshes"""
-        result = self._client._send_request("spz.cmd.get_selected_meshes_bounds", {})
+    def get_skybox_bottom_color(self):
+        """Get skybox bottom gradient color
+        
+        Returns:
+            dict with r, g, b, a (0.0-1.0) or None if failed
+        """
+        result = self._client._send_request("spz.cmd.get_skybox_bottom_color", {})
         if result.get("success", False):
             return {
-                "center": {
-                    "x": result.get("center_x", 0.0),
-                    "y": result.get("center_y", 0.0),
-                    "z": result.get("center_z", 0.0)
-                },
-                "size": {
-                    "x": result.get("size_x", 0.0),
-                    "y": result.get("size_y", 0.0),
-                    "z": result.get("size_z", 0.0)
-                }
+                "r": result.get("r", 0.0),
+                "g": result.get("g", 0.0),
+                "b": result.get("b", 0.0),
+                "a": result.get("a", 1.0)
             }
         return None
 
 
 # ============================================
-# Stable Diffusion API
+# Project API
 # ============================================
 
-class StableDiffusionAPI:
-    """API for Stable Diffusion operations"""
+class ProjectAPI:
+    """API for project management operations"""
     
     def __init__(self, client):
         self._client = client
     
-    def get_positive_prompt(self):
-        """Get current positive prompt"""
-        result = self._client._send_request("spz.cmd.get_positive_prompt", {})
-        if result.get("success", False):
-            return result.get("prompt", "")
-        return None
-    
-    def set_positive_prompt(self, prompt):
-        """Set positive prompt"""
-        result = self._client._send_request("spz.cmd.set_positive_prompt", {
-            "prompt": str(prompt)
-        })
-        return result.get("success", False)
-    
-    def get_negative_prompt(self):
-        """Get current negative prompt"""
-        result = self._client._send_request("spz.cmd.get_negative_prompt", {})
-        if result.get("success", False):
-            return result.get("prompt", "")
-        return None
-    
-    def set_negative_prompt(self, prompt):
-        """Set negative prompt"""
-        result = self._client._send_request("spz.cmd.set_negative_prompt", {
-            "prompt": str(prompt)
-        })
-        return result.get("success", False)
-    
-    def trigger_generation(self, is_background=False):
-        """Trigger texture generation"""
-        result = self._client._send_request("spz.cmd.trigger_texture_generation", {
-            "is_background": bool(is_background)
-        })
+    def save(self):
+        """Save project (shows file dialog)
+        
+        Note: This is async - returns immediately, actual save happens in background.
+        Use is_operation_in_progress() to check if save is complete.
+        """
+        result = self._client._send_request("spz.cmd.save_project", {})
         return result.get("success", False)
     
-    def stop_generation(self):
-        """Stop current generation"""
-        result = self._client._send_request("spz.cmd.stop_generation", {})
+    def load(self):
+        """Load project (shows file dialog)
+        
+        Note: This is async - returns immediately, actual load happens in background.
+        Use is_operation_in_progress() to check if load is complete.
+        """
+        result = self._client._send_request("spz.cmd.load_project", {})
         return result.get("success", False)
     
-    def is_generating(self):
-        """Check if generation is in progress"""
-        result = self._client._send_request("spz.cmd.is_generating", {})
+    def get_path(self):
+        """Get current project filepath (if saved)
+        
+        Returns:
+            str or None if project hasn't been saved
+        """
+        result = self._client._send_request("spz.cmd.get_project_path", {})
         if result.get("success", False):
-            return result.get("generating", False)
-        return False
+            return result.get("path", None)
+        return None
     
-    def is_connected(self):
-        """Check if Stable Diffusion service is connected"""
-        result = self._client._send_request("spz.cmd.is_sd_connected", {})
+    def get_version(self):
+        """Get project version string
+        
+        Returns:
+            str or None if failed
+        """
+        result = self._client._send_request("spz.cmd.get_project_version", {})
         if result.get("success", False):
-            return result.get("connected", False)
-        return False
-
-
-# ============================================
-# 3D Generation API
-# ============================================
-
-class Gen3DAPI:
-    """API for 3D generation operations"""
-    
-    def __init__(self, client):
-        self._client = client
+            return result.get("version", None)
+        return None
     
-    def is_ready(self):
-        """Check if 3D generation can start"""
-        result = self._client._send_request("spz.cmd.is_3d_generation_ready", {})
+    def get_data_dir(self):
+        """Get project data directory path (if project is saved)
+        
+        Returns:
+            str or None if project hasn't been saved
+        """
+        result = self._client._send_request("spz.cmd.get_project_data_dir", {})
         if result.get("success", False):
-            return result.get("ready", False)
-        return False
+            return result.get("data_dir", None)
+        return None
     
-    def is_in_progress(self):
-        """Check if 3D generation is in progress"""
-        result = self._client._send_request("spz.cmd.is_3d_generation_in_progress", {})
+    def is_operation_in_progress(self):
+        """Check if save or load operation is in progress
+        
+        Returns:
+            bool: True if save or load is currently running
+        """
+        result = self._client._send_request("spz.cmd.is_project_operation_in_progress", {})
         if result.get("success", False):
             return result.get("in_progress", False)
         return False
     
-    def trigger(self):
-        """Trigger 3D generation"""
-        result = self._client._send_request("spz.cmd.trigger_3d_generation", {})
-        return result.get("success", False)
+    @_waits_for("is_operation_in_progress", "Project save/load")
+    def wait_until_idle(self, timeout=None, initial_delay=0.02, max_delay=1.0):
+        """Block until no save or load operation is in progress
+        
+        Polls is_operation_in_progress() with adaptive backoff (see
+        StableDiffusionAPI.wait_until_done).
+        
+        Returns:
+            float: Seconds spent waiting
+        
+        Raises:
+            SPZTimeoutError: If a save or load is still running after timeout seconds
+        """
+        return _wait_until_idle(self.is_operation_in_progress, "Project save/load", timeout,
+                                initial_delay, max_delay)
 
 
 # ============================================
-# Export API
+# Projection API
 # ============================================
 
-class ExportAPI:
-    """API for export operations"""
+class ProjectionAPI:
+    """API for projection camera operations"""
     
     def __init__(self, client):
         self._client = client
     
-    def export_3d_with_textures(self):
-        """Export 3D model with textures"""
-        result = self._client._send_request("spz.cmd.export_3d_with_textures", {})
-        return result.get("success", False)
+    def get_count(self):
+        """Get number of projection cameras"""
+        result = self._client._send_request("spz.cmd.get_projection_camera_count", {})
+        if result.get("success", False):
+            return result.get("count", 0)
+        return 0
+    
+    def get_pos(self, camera_index):
+        """Get projection camera position"""
+        result = self._client._send_request("spz.cmd.get_projection_camera_pos", {
+            "camera_index": int(camera_index)
+        })
+        if result.get("success", False):
+            return {
+                "x": result.get("x", 0.0),
+                "y": result.get("y", 0.0),
+                "z": result.get("z", 0.0)
+            }
+        return None
+    
+    def get_rot(self, camera_index):
+        """Get projection camera rotation (quaternion)"""
+        result = self._client._send_request("spz.cmd.get_projection_camera_rot", {
+            "camera_index": int(camera_index)
+        })
+        if result.get("success", False):
+            return {
+                "x": result.get("x", 0.0),
+                "y": result.get("y", 0.0),
+                "z": result.get("z", 0.0),
+                "w": result.get("w", 1.0)
+            }
+        return None
     
-    def export_projection_textures(self, is_dilate=True):
-        """Export projection textures"""
-        result = self._client._send_request("spz.cmd.export_projection_textures", {
-            "is_dilate": bool(is_dilate)
+    def set_pos(self, camera_index, x, y, z):
+        """Set projection camera position"""
+        result = self._client._send_request("spz.cmd.set_projection_camera_pos", {
+            "camera_index": int(camera_index),
+            "x": float(x),
+            "y": float(y),
+            "z": float(z)
         })
         return result.get("success", False)
     
-    def export_view_textures(self):
-        """Export view textures (what camera sees)"""
-        result = self._client._send_request("spz.cmd.export_view_textures", {})
+    def set_rot(self, camera_index, x, y, z, w):
+        """Set projection camera rotation (quaternion)"""
+        result = self._client._send_request("spz.cmd.set_projection_camera_rot", {
+            "camera_index": int(camera_index),
+            "x": float(x),
+            "y": float(y),
+            "z": float(z),
+            "w": float(w)
+        })
         return result.get("success", False)
 
 
 # ============================================
-# Workflow API
+# UI API
 # ============================================
 
-class WorkflowAPI:
-    """API for workflow mode operations"""
+class UIAPI:
+    """API for UI creation"""
     
     def __init__(self, client):
         self._client = client
+        self._panels = {}
     
-    def get_mode(self):
-        """Get current workflow mode"""
-        result = self._client._send_request("spz.cmd.get_workflow_mode", {})
+    def create_panel(self, addon_id, title):
+        """Create a UI panel for an add-on"""
+        result = self._client._send_request("spz.ui.create_panel", {
+            "addon_id": addon_id,
+            "title": title
+        })
         if result.get("success", False):
-            return result.get("mode", "ProjectionsMasking")
+            panel_id = result.get("panel_id")
+            self._panels[panel_id] = Panel(self._client, panel_id, addon_id)
+            return self._panels[panel_id]
         return None
     
-    def set_mode(self, mode):
-        """Set workflow mode
-        
-        Valid modes:
-        - "ProjectionsMasking"
-        - "Inpaint_Color"
-        - "Inpaint_NoColor"
-        - "TotalObject"
-        - "WhereEmpty"
-        - "AntiShade"
-        """
-        result = self._client._send_request("spz.cmd.set_workflow_mode", {
-            "mode": str(mode)
-        })
-        return result.get("success", False)
-
+    def get_panel(self, panel_id):
+        """Get a panel by ID"""
+        return self._panels.get(panel_id)
 
-# ============================================
-# ControlNet API
-# ============================================
 
-class ControlNetAPI:
-    """API for ControlNet operations"""
+class Panel:
+    """Represents a UI panel"""
     
-    def __init__(self, client):
+    def __init__(self, client, panel_id, addon_id):
         self._client = client
+        self._panel_id = panel_id
+        self._addon_id = addon_id
     
-    def get_unit_count(self):
-        """Get total number of ControlNet units"""
-        result = self._client._send_request("spz.cmd.get_controlnet_unit_count", {})
-        if result.get("success", False):
-            return result.get("count", 0)
-        return 0
-    
-    def get_active_unit_count(self):
-        """Get number of active ControlNet units"""
-        result = self._client._send_request("spz.cmd.get_active_controlnet_unit_count", {})
+    def add_button(self, label, callback):
+        """Add a button to this panel"""
+        result = self._client._send_request("spz.ui.add_button", {
+            "addon_id": self._addon_id,
+            "panel_id": self._panel_id,
+            "label": label,
+            "callback": callback
+        })
         if result.get("success", False):
-            return result.get("count", 0)
-        return 0
+            return result.get("button_id")
+        return None
     
-    def set_unit_enabled(self, unit_index, enabled):
-        """Enable or disable a ControlNet unit
+    def add_slider(self, label, min_val, max_val, default_val):
+        """Add a slider to this panel
         
         Args:
-            unit_index: Index of the ControlNet unit (0-based)
-            enabled: True to enable, False to disable
+            label: Slider label
+            min_val: Minimum value (float)
+            max_val: Maximum value (float)
+            default_val: Default value (float)
+        
+        Returns:
+            str: Element ID or None if failed
         """
-        result = self._client._send_request("spz.cmd.set_controlnet_unit_enabled", {
-            "unit_index": int(unit_index),
-            "enabled": bool(enabled)
+        result = self._client._send_request("spz.ui.add_slider", {
+            "addon_id": self._addon_id,
+            "panel_id": self._panel_id,
+            "label": str(label),
+            "min": float(min_val),
+            "max": float(max_val),
+            "default": float(default_val)
         })
-        return result.get("success", False)
+        if result.get("success", False):
+            return result.get("element_id", None)
+        return None
     
-    def get_unit_enabled(self, unit_index):
-        """Get enabled state of a ControlNet unit
+    def add_text_input(self, label, default_text=""):
+        """Add a text input field to this panel
         
         Args:
-            unit_index: Index of the ControlNet unit (0-based)
-            
+            label: Input field label
+            default_text: Default text value
+        
         Returns:
-            bool or None if unit doesn't exist
+            str: Element ID or None if failed
         """
-        result = self._client._send_request("spz.cmd.get_controlnet_unit_enabled", {
-            "unit_index": int(unit_index)
+        result = self._client._send_request("spz.ui.add_text_input", {
+            "addon_id": self._addon_id,
+            "panel_id": self._panel_id,
+            "label": str(label),
+            "default": str(default_text)
         })
         if result.get("success", False):
-            return result.get("enabled", False)
+            return result.get("element_id", None)
         return None
     
-    def set_unit_weight(self, unit_index, weight):
-        """Set ControlNet unit weight
+    def add_dropdown(self, label, options, default_index=0):
+        """Add a dropdown/combobox to this panel
         
         Args:
-            unit_index: Index of the ControlNet unit (0-based)
-            weight: Control weight (0.0-2.0)
+            label: Dropdown label
+            options: List of option strings
+            default_index: Default selected index (0-based)
+        
+        Returns:
+            str: Element ID or None if failed
         """
-        result = self._client._send_request("spz.cmd.set_controlnet_unit_weight", {
-            "unit_index": int(unit_index),
-            "weight": float(weight)
+        result = self._client._send_request("spz.ui.add_dropdown", {
+            "addon_id": self._addon_id,
+            "panel_id": self._panel_id,
+            "label": str(label),
+            "options": list(options),
+            "default": int(default_index)
         })
-        return result.get("success", False)
+        if result.get("success", False):
+            return result.get("element_id", None)
+        return None
     
-    def get_unit_weight(self, unit_index):
-        """Get ControlNet unit weight
+    def get_value(self, element_id):
+        """Get the value of a UI element
         
         Args:
-            unit_index: Index of the ControlNet unit (0-based)
-            
+            element_id: ID of the UI element
+        
         Returns:
-            float or None if unit doesn't exist
+            Value (float, int, or str depending on element type) or None if failed
         """
-        result = self._client._send_request("spz.cmd.get_controlnet_unit_weight", {
-            "unit_index": int(unit_index)
+        result = self._client._send_request("spz.ui.get_value", {
+            "element_id": str(element_id)
         })
         if result.get("success", False):
-            return result.get("weight", 1.0)
+            return result.get("value", None)
         return None
     
-    def get_unit_model(self, unit_index):
-        """Get ControlNet unit model name
+    def set_value(self, element_id, value):
+        """Set the value of a UI element
+        
+        Args:
+            element_id: ID of the UI element
+            value: Value to set (float, int, or str depending on element type)
+        
+        Returns:
+            bool: True if successful
+        """
+        result = self._client._send_request("spz.ui.set_value", {
+            "element_id": str(element_id),
+            "value": value
+        })
+        return result.get("success", False)
+
+
+# ============================================
+# Deferred Facade Calls
+# ============================================
+
+class _CapturedRequest(Exception):
+    """Raised by _CaptureClient to stop a facade method at its request"""
+    
+    def __init__(self, method, params):
+        super().__init__(method)
+        self.method = method
+        self.params = params
+
+
+class _CaptureClient:
+    """Stand-in client that records the request a facade method would send"""
+    
+    # Facade methods that would split a long id list send it in one request
+    _single_request = True
+    
+    def _send_request(self, method, params=None):
+        raise _CapturedRequest(method, params or {})
+
+
+class _ReplayClient:
+    """Stand-in client that hands a facade method an already received result"""
+    
+    _single_request = True
+    
+    def __init__(self, result):
+        self._result = result
+    
+    def _send_request(self, method, params=None):
+        return self._result
+
+
+def _split_facade_call(facade, name, args, kwargs):
+    """Split a facade method call into its request and its result parsing
+    
+    The facade method runs once against a capturing client to learn the
+    JSON-RPC method and params it sends, and once more against the reply to
+    build its return value. This lets the pipelined, batched and async paths
+    reuse the regular facade methods unchanged.
+    
+    Returns:
+        (method, params, parse) where parse(result) returns what the facade
+        method would have returned. method is None when the call never
+        reaches the server; parse then just returns the call's value.
+    """
+    probe = copy.copy(facade)
+    probe._client = _CaptureClient()
+    try:
+        value = getattr(probe, name)(*args, **kwargs)
+    except _CapturedRequest as captured:
+        def parse(result):
+            replay = copy.copy(facade)
+            replay._client = _ReplayClient(result)
+            return getattr(replay, name)(*args, **kwargs)
+        return captured.method, captured.params, parse
+    return None, None, lambda result: value
+
+
+class _FacadeProxy:
+    """Routes every method of a facade through a dispatch function
+    
+    dispatch(method, params, parse) decides how the request is sent and
+    what the caller gets back (a future, a batch slot, an awaitable...).
+    Polling waits (see _waits_for) go to wait(check, what, *args, **kwargs)
+    instead, and raise TypeError if there is none.
+    """
+    
+    def __init__(self, facade, dispatch, wait=None):
+        self._facade = facade
+        self._dispatch = dispatch
+        self._wait = wait
+    
+    def __getattr__(self, name):
+        attr = getattr(self._facade, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
         
-        Args:
-            unit_index: Index of the ControlNet unit (0-based)
+        waits_for = getattr(attr, "_waits_for", None)
+        if waits_for is not None:
+            check, what = waits_for
             
-        Returns:
-            str or None if unit doesn't exist
-        """
-        result = self._client._send_request("spz.cmd.get_controlnet_unit_model", {
-            "unit_index": int(unit_index)
-        })
-        if result.get("success", False):
-            return result.get("model", "None")
-        return None
+            def call(*args, **kwargs):
+                if self._wait is None:
+                    raise TypeError(f"{name}() polls until work is done and can't be deferred; "
+                                    f"call it on SPZAPI or AsyncSPZAPI")
+                return self._wait(getattr(self, check), what, *args, **kwargs)
+            
+            call.__name__ = name
+            call.__doc__ = attr.__doc__
+            return call
+        
+        def call(*args, **kwargs):
+            method, params, parse = _split_facade_call(self._facade, name, args, kwargs)
+            return self._dispatch(method, params, parse)
+        
+        call.__name__ = name
+        call.__doc__ = attr.__doc__
+        return call
 
 
-# ============================================
-# Background API
-# ============================================
+# Facades that can be proxied (UI calls create stateful panel objects and
+# always go through the regular blocking path)
+_PROXY_FACADES = ("cameras", "models", "scene", "sd", "gen3d", "export",
+                  "workflow", "controlnet", "background", "project", "projection")
 
-class BackgroundAPI:
-    """API for background/skybox operations"""
+
+class _FacadeNamespace:
+    """Mirror of SPZAPI whose facades dispatch through a shared function"""
     
-    def __init__(self, client):
-        self._client = client
+    def __init__(self, api, dispatch, wait=None):
+        for facade_name in _PROXY_FACADES:
+            setattr(self, facade_name, _FacadeProxy(getattr(api, facade_name), dispatch, wait))
+
+
+def _chain_future(future, parse, chained=None):
+    """Return a future resolving to parse(result of future)
     
-    def set_skybox_color(self, is_top, r, g, b, a=1.0):
-        """Set skybox gradient color
+    Cancelling either future cancels the other.
+    """
+    if chained is None:
+        chained = Future()
+    
+    def resolve(done):
+        if done.cancelled():
+            chained.cancel()
+            return
+        try:
+            chained.set_result(parse(done.result()))
+        except InvalidStateError:
+            pass
+        except BaseException as e:
+            _fail(chained, e)
+    
+    def cancel_source(done):
+        if done.cancelled():
+            future.cancel()
+    
+    future.add_done_callback(resolve)
+    chained.add_done_callback(cancel_source)
+    return chained
+
+
+class Batch(_FacadeNamespace):
+    """Records facade calls and sends them as JSON-RPC batch arrays
+    
+    Use through SPZAPI.batch():
         
-        Args:
-            is_top: True for top color, False for bottom color
-            r, g, b, a: Color components (0.0-1.0)
-        """
-        result = self._client._send_request("spz.cmd.set_skybox_color", {
-            "is_top": bool(is_top),
-            "r": float(r),
-            "g": float(g),
-            "b": float(b),
-            "a": float(a)
-        })
-        return result.get("success", False)
+        with api.batch() as b:
+            for mesh_id in mesh_ids:
+                b.models.set_visibility(mesh_id, False)
+            pos = b.cameras.get_pos(0)
+        print(pos.result())
     
-    def is_gradient_clear(self):
-        """Check if skybox gradient is clear (no gradient colors)"""
-        result = self._client._send_request("spz.cmd.is_skybox_gradient_clear", {})
-        if result.get("success", False):
-            return result.get("is_clear", True)
-        return True
+    Every recorded call returns a future that resolves once the batch has
+    been sent, which happens when the with-block exits. Unity runs each batch
+    of up to MAX_REQUESTS commands in a single frame.
+    """
     
-    def get_skybox_top_color(self):
-        """Get skybox top gradient color
+    # Requests per batch array (larger batches are split)
+    MAX_REQUESTS = 1000
+    
+    def __init__(self, api, timeout=None):
+        super().__init__(api, self._record)
+        self._client = api._client
+        self._timeout = timeout
+        self._calls = []  # (method, params, parse, future)
+    
+    def _record(self, method, params, parse):
+        """Queue a facade call; returns the future of its parsed result"""
+        future = Future()
+        if method is None:
+            future.set_result(parse(None))
+        else:
+            self._calls.append((method, params, parse, future))
+        return future
+    
+    def __len__(self):
+        return len(self._calls)
+    
+    def send(self):
+        """Send all recorded calls and wait for their results
         
         Returns:
-            dict with r, g, b, a (0.0-1.0) or None if failed
+            list: Parsed results in call order (an exception instance in
+            place of each call that failed)
         """
-        result = self._client._send_request("spz.cmd.get_skybox_top_color", {})
-        if result.get("success", False):
-            return {
-                "r": result.get("r", 0.0),
-                "g": result.get("g", 0.0),
-                "b": result.get("b", 0.0),
-                "a": result.get("a", 1.0)
-            }
+        calls, self._calls = self._calls, []
+        seconds, _ = _request_timeout("batch", self._timeout, getattr(self._client, "timeout", 5.0))
+        deadline = None if seconds is None else time.monotonic() + seconds
+        for start in range(0, len(calls), self.MAX_REQUESTS):
+            chunk = calls[start:start + self.MAX_REQUESTS]
+            try:
+                sent = self._client._submit_batch([(method, params) for method, params, _, _ in chunk],
+                                                  self._timeout)
+            except Exception as e:
+                for _, _, _, future in calls[start:]:
+                    future.set_exception(e)
+                break
+            for raw, (_, _, parse, future) in zip(sent, chunk):
+                _chain_future(raw, parse, future)
+        
+        results = []
+        for method, _, _, future in calls:
+            try:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                results.append(future.result(timeout=remaining))
+            except FutureTimeoutError as e:
+                if not isinstance(e, SPZTimeoutError):
+                    # Fail it (unless the reply has just arrived) rather than wait any longer
+                    _fail(future, _no_reply(method, seconds))
+                    e = future.exception()
+                results.append(e if e is not None else future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.send()
+        else:
+            # Nothing is sent if the block raised
+            calls, self._calls = self._calls, []
+            for _, _, _, future in calls:
+                future.cancel()
+        return False
+
+
+class Notifier(_FacadeNamespace):
+    """Sends setter calls as JSON-RPC notifications: no id, no reply, no waiting
+    
+    Use through SPZAPI.notify:
+        
+        for mesh_id, (x, y, z) in positions.items():
+            api.notify.models.set_pos(mesh_id, x, y, z)
+        failed = api.notify.sync()
+    
+    Every call returns None as soon as the request is written, so write-heavy
+    scripts stream at socket speed instead of waiting a frame per call.
+    Unity reports notifications that failed: they are counted in `failed` and
+    passed to on_error(method, error). sync() waits until everything sent so
+    far has run. Only setters (set_*, select_*, deselect_*) can be sent this
+    way; anything that returns data raises ValueError.
+    """
+    
+    # Method prefixes of commands whose only reply is {"success": ...}
+    PREFIXES = ("spz.cmd.set_", "spz.cmd.select_", "spz.cmd.deselect_")
+    
+    def __init__(self, api, on_error=None):
+        super().__init__(api, self._send)
+        self._client = api._client
+        self.on_error = on_error
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._client.add_message_handler(self._on_message)
+    
+    def _send(self, method, params, parse):
+        if method is None:
+            return None
+        if not method.startswith(self.PREFIXES):
+            raise ValueError(f"{method} returns data and can't be sent as a notification")
+        self._client._send_notification(method, params)
+        with self._lock:
+            self.sent += 1
         return None
     
-    def get_skybox_bottom_color(self):
-        """Get skybox bottom gradient color
+    def _on_message(self, message):
+        if message.get("method") != "spz.sys.notification_failed":
+            return
+        params = message.get("params") or {}
+        with self._lock:
+            self.failed += 1
+        if self.on_error is not None:
+            try:
+                self.on_error(params.get("method"), params.get("error"))
+            except Exception:
+                pass
+    
+    def sync(self, timeout=None):
+        """Wait until Unity has run every notification sent so far
         
         Returns:
-            dict with r, g, b, a (0.0-1.0) or None if failed
+            int: Number of failed notifications reported so far
         """
-        result = self._client._send_request("spz.cmd.get_skybox_bottom_color", {})
-        if result.get("success", False):
-            return {
-                "r": result.get("r", 0.0),
-                "g": result.get("g", 0.0),
-                "b": result.get("b", 0.0),
-                "a": result.get("a", 1.0)
-            }
-        return None
+        self._client._sync_notifications(timeout)
+        return self.failed
 
 
 # ============================================
-# Project API
+# Server Events
 # ============================================
 
-class ProjectAPI:
-    """API for project management operations"""
-    
-    def __init__(self, client):
-        self._client = client
+class Events:
+    """Callbacks for events StableProjectorz pushes, instead of polling for them
     
-    def save(self):
-        """Save project (shows file dialog)
+    Use through SPZAPI.events:
         
-        Note: This is async - returns immediately, actual save happens in background.
-        Use is_operation_in_progress() to check if save is complete.
-        """
-        result = self._client._send_request("spz.cmd.save_project", {})
-        return result.get("success", False)
-    
-    def load(self):
-        """Load project (shows file dialog)
+        @api.events.on("generation_finished")
+        def finished(event):
+            print("done at", event["time"])
         
-        Note: This is async - returns immediately, actual load happens in background.
-        Use is_operation_in_progress() to check if load is complete.
-        """
-        result = self._client._send_request("spz.cmd.load_project", {})
-        return result.get("success", False)
+        api.events.wait("gen3d_finished", timeout=600)
     
-    def get_path(self):
-        """Get current project filepath (if saved)
-        
-        Returns:
-            str or None if project hasn't been saved
-        """
-        result = self._client._send_request("spz.cmd.get_project_path", {})
-        if result.get("success", False):
-            return result.get("path", None)
-        return None
+    Events arrive as "spz.event" messages on a dedicated connection, so
+    waiting for work costs no slots in Unity's per-frame command queue.
+    Callbacks get the event's params ({"event": name, "time": seconds}) and
+    run on a pool of max_workers threads; exceptions they raise are ignored.
+    If StableProjectorz isn't reachable yet or the connection drops, the
+    subscription is made (or renewed) within reconnect_interval seconds of
+    it coming back. Hosts that can't push events are polled every
+    poll_interval seconds instead, with the same callbacks.
+    """
     
-    def get_version(self):
-        """Get project version string
+    # Event names, in started/finished pairs
+    EVENTS = ("generation_started", "generation_finished",
+              "gen3d_started", "gen3d_finished",
+              "project_operation_started", "project_operation_finished")
+    
+    # Hosts without events: status command, its result key and the events its changes fire
+    _POLLED = (
+        ("spz.cmd.is_generating", "generating", "generation_started", "generation_finished"),
+        ("spz.cmd.is_3d_generation_in_progress", "in_progress", "gen3d_started", "gen3d_finished"),
+        ("spz.cmd.is_project_operation_in_progress", "in_progress",
+         "project_operation_started", "project_operation_finished"),
+    )
+    
+    def __init__(self, client, max_workers=4, poll_interval=0.25, reconnect_interval=1.0):
+        self._host = client.host
+        self._port = client.port
+        self._timeout = client.timeout
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.reconnect_interval = reconnect_interval
+        self.received = 0
         
-        Returns:
-            str or None if failed
-        """
-        result = self._client._send_request("spz.cmd.get_project_version", {})
-        if result.get("success", False):
-            return result.get("version", None)
-        return None
+        self._lock = threading.Lock()
+        self._callbacks = {}  # event -> callbacks
+        self._waiters = {}    # event -> futures of wait() calls
+        self._subscribed = ()
+        self._polling = False
+        self._connection = None
+        self._executor = None
+        self._stop = None
     
-    def get_data_dir(self):
-        """Get project data directory path (if project is saved)
+    def on(self, event, callback=None):
+        """Call callback(params) every time event fires
         
-        Returns:
-            str or None if project hasn't been saved
+        Can be used as a decorator. Returns the callback.
         """
-        result = self._client._send_request("spz.cmd.get_project_data_dir", {})
-        if result.get("success", False):
-            return result.get("data_dir", None)
-        return None
+        self._check(event)
+        if callback is None:
+            return lambda callback: self.on(event, callback)
+        with self._lock:
+            self._callbacks.setdefault(event, []).append(callback)
+        self._update_subscription()
+        return callback
     
-    def is_operation_in_progress(self):
-        """Check if save or load operation is in progress
+    def off(self, event, callback=None):
+        """Stop calling callback (or every callback, if None) for event"""
+        self._check(event)
+        with self._lock:
+            callbacks = self._callbacks.get(event, [])
+            if callback is None:
+                callbacks.clear()
+            elif callback in callbacks:
+                callbacks.remove(callback)
+        self._update_subscription()
+    
+    def wait(self, event, timeout=None):
+        """Block until event next fires
         
         Returns:
-            bool: True if save or load is currently running
+            dict: The event's params
+        
+        Raises SPZTimeoutError if it doesn't fire within timeout seconds.
         """
-        result = self._client._send_request("spz.cmd.is_project_operation_in_progress", {})
-        if result.get("success", False):
-            return result.get("in_progress", False)
-        return False
+        self._check(event)
+        future = Future()
+        with self._lock:
+            self._waiters.setdefault(event, []).append(future)
+        try:
+            self._update_subscription()
+            return future.result(timeout)
+        except FutureTimeoutError:
+            raise SPZTimeoutError(f"No {event} event within {timeout:.3g}s", event, timeout)
+        finally:
+            with self._lock:
+                self._waiters[event].remove(future)
+            self._update_subscription()
+    
+    def close(self):
+        """Drop the subscription and its connection"""
+        with self._lock:
+            connection, self._connection = self._connection, None
+            executor, self._executor = self._executor, None
+            stop, self._stop = self._stop, None
+            self._subscribed = ()
+            self._polling = False
+        if stop is not None:
+            stop.set()
+        if connection is not None:
+            connection.close()
+        if executor is not None:
+            executor.shutdown(wait=False)
+    
+    def _check(self, event):
+        if event not in self.EVENTS:
+            raise ValueError(f"Unknown event {event!r}; expected one of {', '.join(self.EVENTS)}")
+    
+    def _update_subscription(self):
+        """Subscribe to exactly the events someone listens for"""
+        with self._lock:
+            events = tuple(sorted(name for name in self.EVENTS
+                                  if self._callbacks.get(name) or self._waiters.get(name)))
+            if events == self._subscribed:
+                return
+            self._subscribed = events
+            watcher = None
+            if self._connection is None:
+                self._connection = SPZClient(self._host, self._port, pipelined=True, timeout=self._timeout)
+                self._connection.add_message_handler(self._on_message)
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="spz-events")
+                self._stop = threading.Event()
+                watcher = threading.Thread(target=self._watch, args=(self._connection, self._stop),
+                                           name="spz-events", daemon=True)
+            connection = self._connection
+        if not self._polling:
+            try:
+                self._polling = not connection._subscribe(events)
+            except (ConnectionError, TimeoutError):
+                pass  # The watcher subscribes once StableProjectorz is reachable
+        # Started once it is known whether to poll
+        if watcher is not None:
+            watcher.start()
+    
+    def _on_message(self, message):
+        if message.get("method") == "spz.event":
+            self._emit(message.get("params") or {})
+    
+    def _emit(self, params):
+        """Resolve waiters and hand the event to the callbacks' thread pool"""
+        event = params.get("event")
+        with self._lock:
+            self.received += 1
+            waiters = list(self._waiters.get(event, ()))
+            callbacks = list(self._callbacks.get(event, ()))
+            executor = self._executor
+        for future in waiters:
+            try:
+                future.set_result(params)
+            except InvalidStateError:
+                pass
+        if executor is None:
+            return
+        for callback in callbacks:
+            try:
+                executor.submit(self._run_callback, callback, params)
+            except RuntimeError:
+                return  # Closed meanwhile
+    
+    @staticmethod
+    def _run_callback(callback, params):
+        try:
+            callback(params)
+        except Exception:
+            pass
+    
+    def _watch(self, connection, stop):
+        """Keep the subscription alive, or poll hosts that can't push events"""
+        states = None
+        while not stop.wait(self.poll_interval if self._polling else self.reconnect_interval):
+            if not self._subscribed:
+                states = None
+                continue
+            try:
+                if self._polling:
+                    states = self._poll(connection, states)
+                elif not connection.is_alive():
+                    self._polling = not connection._subscribe(self._subscribed)
+            except (ConnectionError, RuntimeError, TimeoutError):
+                pass  # StableProjectorz is away; try again next time
+    
+    def _poll(self, connection, states):
+        """Sample the status commands and fire events for the states that changed"""
+        current = []
+        for method, key, started, finished in self._POLLED:
+            result = connection._send_request(method, {})
+            current.append(bool(result.get(key, False)) if result.get("success", False) else False)
+        if states is not None:
+            for (_, _, started, finished), was, now in zip(self._POLLED, states, current):
+                if was != now:
+                    self._emit({"event": started if now else finished, "time": time.monotonic()})
+        return current
 
 
 # ============================================
-# Projection API
+# Setter Coalescing
 # ============================================
 
-class ProjectionAPI:
-    """API for projection camera operations"""
+# Setters whose latest value for a target supersedes any earlier one:
+# method -> param naming the target (None: one value for the whole app)
+_COALESCED_SETTERS = {
+    "spz.cmd.set_camera_pos": "camera_index",
+    "spz.cmd.set_camera_rot": "camera_index",
+    "spz.cmd.set_camera_fov": "camera_index",
+    "spz.cmd.set_camera_pose": "camera_index",
+    "spz.cmd.set_mesh_pos": "mesh_id",
+    "spz.cmd.set_mesh_rot": "mesh_id",
+    "spz.cmd.set_mesh_scale": "mesh_id",
+    "spz.cmd.set_mesh_visibility": "mesh_id",
+    "spz.cmd.set_projection_camera_pos": "camera_index",
+    "spz.cmd.set_projection_camera_rot": "camera_index",
+    "spz.cmd.set_skybox_color": "is_top",
+    "spz.cmd.set_controlnet_unit_enabled": "unit_index",
+    "spz.cmd.set_controlnet_unit_weight": "unit_index",
+    "spz.cmd.set_positive_prompt": None,
+    "spz.cmd.set_negative_prompt": None,
+    "spz.cmd.set_workflow_mode": None,
+}
+
+
+# FastPath_API accepts one camera write per frame, and a flushed batch runs in
+# one frame, so pending position / rotation / FOV writes to one camera are
+# held as a single spz.cmd.set_camera_pose: method -> {param: pose param}
+_CAMERA_POSE_PARAMS = {
+    "spz.cmd.set_camera_pos": {"x": "x", "y": "y", "z": "z"},
+    "spz.cmd.set_camera_rot": {"x": "qx", "y": "qy", "z": "qz", "w": "qw"},
+    "spz.cmd.set_camera_fov": {"fov": "fov"},
+    "spz.cmd.set_camera_pose": {key: key for key in ("x", "y", "z", "qx", "qy", "qz", "qw", "fov")},
+}
+
+
+def _camera_pose_call(params):
+    """The call that sends a held camera pose: its own setter if only one part of the pose is set"""
+    parts = [method for method in ("spz.cmd.set_camera_pos", "spz.cmd.set_camera_rot", "spz.cmd.set_camera_fov")
+             if any(key in params for key in _CAMERA_POSE_PARAMS[method].values())]
+    if len(parts) != 1:
+        return "spz.cmd.set_camera_pose", params
+    names = {pose_key: key for key, pose_key in _CAMERA_POSE_PARAMS[parts[0]].items()}
+    return parts[0], {names.get(key, key): value for key, value in params.items()}
+
+
+class _CoalescingClient:
+    """Client wrapper that holds back setter calls and sends only the latest per target
     
-    def __init__(self, client):
+    Held setters are flushed as one JSON-RPC batch (one Unity frame) at most
+    once per window seconds, and before any other request so that reads
+    always see earlier writes.
+    """
+    
+    def __init__(self, client, window, on_error=None):
         self._client = client
+        self.window = window
+        self.on_error = on_error
+        self._held = {}  # (method, target) -> params, in last-write order
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._closed = False
+        self._thread = None
+        self._counts = {"calls": 0, "sent": 0, "coalesced": 0, "flushes": 0, "errors": 0}
     
-    def get_count(self):
-        """Get number of projection cameras"""
-        result = self._client._send_request("spz.cmd.get_projection_camera_count", {})
-        if result.get("success", False):
-            return result.get("count", 0)
-        return 0
+    def __getattr__(self, name):
+        return getattr(self._client, name)
     
-    def get_pos(self, camera_index):
-        """Get projection camera position"""
-        result = self._client._send_request("spz.cmd.get_projection_camera_pos", {
-            "camera_index": int(camera_index)
-        })
-        if result.get("success", False):
-            return {
-                "x": result.get("x", 0.0),
-                "y": result.get("y", 0.0),
-                "z": result.get("z", 0.0)
-            }
-        return None
+    def _hold(self, method, params):
+        """Keep a setter call for the next flush; returns False if it isn't coalesced"""
+        if method not in _COALESCED_SETTERS or self._closed:
+            return False
+        target = _COALESCED_SETTERS[method]
+        key = (method, params.get(target) if target else None)
+        if method in _CAMERA_POSE_PARAMS:
+            names = _CAMERA_POSE_PARAMS[method]
+            key = ("spz.cmd.set_camera_pose", key[1])
+            params = {names.get(name, name): value for name, value in params.items()}
+        with self._cond:
+            self._counts["calls"] += 1
+            held = self._held.pop(key, None)
+            if held is not None:
+                self._counts["coalesced"] += 1
+                if key[0] == "spz.cmd.set_camera_pose":
+                    params = dict(held, **params)  # Pose parts this call doesn't set stay as held
+            # Re-inserted, so the latest write goes out last
+            self._held[key] = params
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._tick, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return True
     
-    def get_rot(self, camera_index):
-        """Get projection camera rotation (quaternion)"""
-        result = self._client._send_request("spz.cmd.get_projection_camera_rot", {
-            "camera_index": int(camera_index)
-        })
-        if result.get("success", False):
-            return {
-                "x": result.get("x", 0.0),
-                "y": result.get("y", 0.0),
-                "z": result.get("z", 0.0),
-                "w": result.get("w", 1.0)
-            }
-        return None
+    def _tick(self):
+        """Flush held setters once per window while there are any"""
+        while True:
+            with self._cond:
+                while not self._held and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                delay = self._last_flush + self.window - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            self.flush()
     
-    def set_pos(self, camera_index, x, y, z):
-        """Set projection camera position"""
-        result = self._client._send_request("spz.cmd.set_projection_camera_pos", {
-            "camera_index": int(camera_index),
-            "x": float(x),
-            "y": float(y),
-            "z": float(z)
-        })
-        return result.get("success", False)
+    def flush(self):
+        """Send the held setters now as one batch"""
+        with self._flush_lock:
+            with self._cond:
+                held, self._held = self._held, {}
+                self._last_flush = time.monotonic()
+            if not held:
+                return
+            calls = [_camera_pose_call(params) if method == "spz.cmd.set_camera_pose" else (method, params)
+                     for (method, _), params in held.items()]
+            try:
+                futures = self._client._submit_batch(calls)
+            except Exception as e:
+                for method, params in calls:
+                    self._report(method, params, e)
+                return
+            with self._cond:
+                self._counts["sent"] += len(calls)
+                self._counts["flushes"] += 1
+            for (method, params), future in zip(calls, futures):
+                future.add_done_callback(lambda done, method=method, params=params: self._check(method, params, done))
     
-    def set_rot(self, camera_index, x, y, z, w):
-        """Set projection camera rotation (quaternion)"""
-        result = self._client._send_request("spz.cmd.set_projection_camera_rot", {
-            "camera_index": int(camera_index),
-            "x": float(x),
-            "y": float(y),
-            "z": float(z),
-            "w": float(w)
-        })
-        return result.get("success", False)
+    def _check(self, method, params, done):
+        """Report a flushed setter that failed"""
+        if done.cancelled():
+            return
+        error = done.exception()
+        if error is None and not done.result().get("success", False):
+            error = RuntimeError(f"{method} failed: {done.result().get('error', 'no details')}")
+        if error is not None:
+            self._report(method, params, error)
+    
+    def _report(self, method, params, error):
+        with self._cond:
+            self._counts["errors"] += 1
+        if self.on_error is not None:
+            try:
+                self.on_error(method, params, error)
+            except Exception:
+                pass
+    
+    def stats(self):
+        with self._cond:
+            return dict(self._counts, held=len(self._held))
+    
+    def stop(self):
+        """Flush what is held and stop coalescing (later setters are sent directly)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
+    
+    def _send_request(self, method, params=None, timeout=None):
+        if self._hold(method, params or {}):
+            return {"success": True}
+        self.flush()
+        return self._client._send_request(method, params, timeout)
+    
+    def _submit_request(self, method, params=None, timeout=None):
+        if self._hold(method, params or {}):
+            future = Future()
+            future.set_result({"success": True})
+            return future
+        self.flush()
+        return self._client._submit_request(method, params, timeout)
+    
+    def _submit_batch(self, calls, timeout=None):
+        self.flush()
+        return self._client._submit_batch(calls, timeout)
+    
+    def _send_notification(self, method, params=None, timeout=None):
+        self.flush()
+        self._client._send_notification(method, params, timeout)
+    
+    def _sync_notifications(self, timeout=None):
+        self.flush()
+        self._client._sync_notifications(timeout)
 
 
 # ============================================
-# UI API
+# Scene Cache
 # ============================================
 
-class UIAPI:
-    """API for UI creation"""
+# Per-mesh getters the cache serves (keyed by (method, mesh_id))
+_CACHED_GETTERS = ("spz.cmd.get_mesh_pos", "spz.cmd.get_mesh_rot", "spz.cmd.get_mesh_scale",
+                   "spz.cmd.get_mesh_bounds", "spz.cmd.get_mesh_name", "spz.cmd.get_mesh_visibility")
+
+
+def _clamped(params, low, high):
+    """get_mesh_pos/get_mesh_scale reply after a setter clamped by FastPath_API"""
+    result = {key: min(max(float(params.get(key, 0.0)), low), high) for key in "xyz"}
+    result["success"] = True
+    return result
+
+
+def _normalized(params):
+    """get_mesh_rot reply after FastPath_API.SetMeshRotation normalized the quaternion"""
+    quat = [float(params.get(key, 0.0)) for key in "xyzw"]
+    length = math.sqrt(sum(v * v for v in quat))
+    result = {key: v / length for key, v in zip("xyzw", quat)}
+    result["success"] = True
+    return result
+
+
+# Setter -> (getter it writes through to, that getter's reply, getters it invalidates)
+_WRITE_THROUGH = {
+    "spz.cmd.set_mesh_pos": ("spz.cmd.get_mesh_pos", lambda p: _clamped(p, -1000.0, 1000.0),
+                             ("spz.cmd.get_mesh_bounds",)),
+    "spz.cmd.set_mesh_rot": ("spz.cmd.get_mesh_rot", _normalized, ("spz.cmd.get_mesh_bounds",)),
+    "spz.cmd.set_mesh_scale": ("spz.cmd.get_mesh_scale", lambda p: _clamped(p, 0.001, 100.0),
+                               ("spz.cmd.get_mesh_bounds",)),
+    "spz.cmd.set_mesh_visibility": ("spz.cmd.get_mesh_visibility",
+                                    lambda p: {"success": True, "visible": bool(p.get("visible", True))}, ()),
+}
+
+# Bulk setters -> getters they invalidate for every mesh they touch
+_BULK_INVALIDATES = {
+    "spz.cmd.set_mesh_positions": ("spz.cmd.get_mesh_pos", "spz.cmd.get_mesh_bounds"),
+    "spz.cmd.set_mesh_rotations": ("spz.cmd.get_mesh_rot", "spz.cmd.get_mesh_bounds"),
+    "spz.cmd.set_mesh_scales": ("spz.cmd.get_mesh_scale", "spz.cmd.get_mesh_bounds"),
+    "spz.cmd.set_mesh_visibilities": ("spz.cmd.get_mesh_visibility",),
+}
+
+# Commands that may change any mesh -> getters whose entries they drop
+_SCENE_INVALIDATES = {
+    "spz.cmd.set_visibility_by_selection": ("spz.cmd.get_mesh_visibility",),
+}
+
+
+class _SceneCache:
+    """Client wrapper caching per-mesh getter replies (see SPZAPI.enable_cache)
     
-    def __init__(self, client):
+    Replies are kept for ttl seconds in an LRU of at most max_entries. A
+    setter sent through the same wrapper updates the matching entry once
+    Unity accepts it (applying FastPath_API's clamping) and drops the mesh's
+    cached bounds; bulk setters and notifications only drop entries.
+    """
+    
+    def __init__(self, client, ttl, max_entries):
         self._client = client
-        self._panels = {}
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (method, mesh_id) -> (expires, result), least recently used first
+        self._lock = threading.Lock()
+        
+        # Bumped by every write; a reply only fills the cache if no write
+        # happened while it was in flight
+        self._generation = 0
+        self._counts = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0,
+                        "writes": 0, "invalidations": 0}
     
-    def create_panel(self, addon_id, title):
-        """Create a UI panel for an add-on"""
-        result = self._client._send_request("spz.ui.create_panel", {
-            "addon_id": addon_id,
-            "title": title
-        })
-        if result.get("success", False):
-            panel_id = result.get("panel_id")
-            self._panels[panel_id] = Panel(self._client, panel_id, addon_id)
-            return self._panels[panel_id]
-        return None
+    def __getattr__(self, name):
+        return getattr(self._client, name)
     
-    def get_panel(self, panel_id):
-        """Get a panel by ID"""
-        return self._panels.get(panel_id)
-
-
-class Panel:
-    """Represents a UI panel"""
+    # ============================================
+    # Entries
+    # ============================================
     
-    def __init__(self, client, panel_id, addon_id):
-        self._client = client
-        self._panel_id = panel_id
-        self._addon_id = addon_id
+    def _lookup(self, key):
+        """Cached result for key, or None (counting the hit or miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._counts["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._counts["expired"] += 1
+            self._counts["misses"] += 1
+            return None
     
-    def add_button(self, label, callback):
-        """Add a button to this panel"""
-        result = self._client._send_request("spz.ui.add_button", {
-            "addon_id": self._addon_id,
-            "panel_id": self._panel_id,
-            "label": label,
-            "callback": callback
-        })
-        if result.get("success", False):
-            return result.get("button_id")
-        return None
+    def _store(self, key, result, generation=None):
+        """Cache a result (only successful ones; not if a write raced a read)"""
+        if not isinstance(result, dict) or not result.get("success", False):
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
     
-    def add_slider(self, label, min_val, max_val, default_val):
-        """Add a slider to this panel
-        
-        Args:
-            label: Slider label
-            min_val: Minimum value (float)
-            max_val: Maximum value (float)
-            default_val: Default value (float)
-            
-        Returns:
-            str: Element ID or None if failed
-        """
-        result = self._client._send_request("spz.ui.add_slider", {
-            "addon_id": self._addon_id,
-            "panel_id": self._panel_id,
-            "label": str(label),
-            "min": float(min_val),
-            "max": float(max_val),
-            "default": float(default_val)
-        })
-        if result.get("success", False):
-            return result.get("element_id", None)
+    def _invalidate(self, methods, mesh_ids):
+        """Drop the entries of the given getters for the given meshes"""
+        with self._lock:
+            self._generation += 1
+            if len(mesh_ids) < len(self._entries):
+                stale = [(method, mesh_id) for mesh_id in mesh_ids for method in methods
+                         if (method, mesh_id) in self._entries]
+            else:
+                stale = [key for key in self._entries if key[1] in mesh_ids and key[0] in methods]
+            for key in stale:
+                del self._entries[key]
+            self._counts["invalidations"] += len(stale)
+    
+    def _invalidate_all(self, methods):
+        """Drop the entries of the given getters for every mesh"""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if key[0] in methods]
+            for key in stale:
+                del self._entries[key]
+            self._counts["invalidations"] += len(stale)
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+    
+    def stats(self):
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return dict(self._counts, entries=len(self._entries), max_entries=self.max_entries,
+                        ttl=self.ttl, hit_rate=self._counts["hits"] / lookups if lookups else 0.0)
+    
+    # ============================================
+    # Requests
+    # ============================================
+    
+    @staticmethod
+    def _key(method, params):
+        if method in _CACHED_GETTERS and params and "mesh_id" in params:
+            return method, int(params["mesh_id"])
         return None
     
-    def add_text_input(self, label, default_text=""):
-        """Add a text input field to this panel
-        
-        Args:
-            label: Input field label
-            default_text: Default text value
-            
-        Returns:
-            str: Element ID or None if failed
-        """
-        result = self._client._send_request("spz.ui.add_text_input", {
-            "addon_id": self._addon_id,
-            "panel_id": self._panel_id,
-            "label": str(label),
-            "default": str(default_text)
-        })
-        if result.get("success", False):
-            return result.get("element_id", None)
+    def _before_write(self, method, params):
+        """Drop what a setter is about to change; returns its write-through, if any"""
+        params = params or {}
+        if method in _WRITE_THROUGH and "mesh_id" in params:
+            getter, _, invalidates = _WRITE_THROUGH[method]
+            self._invalidate((getter,) + invalidates, {int(params["mesh_id"])})
+            return _WRITE_THROUGH[method]
+        if method in _BULK_INVALIDATES:
+            ids = params.get("mesh_ids", [])
+            if isinstance(ids, _Packed):
+                ids = ids.values
+            self._invalidate(_BULK_INVALIDATES[method], {int(mesh_id) for mesh_id in ids})
+        elif method in _SCENE_INVALIDATES:
+            self._invalidate_all(_SCENE_INVALIDATES[method])
         return None
     
-    def add_dropdown(self, label, options, default_index=0):
-        """Add a dropdown/combobox to this panel
+    def _after_write(self, write_through, params, result):
+        """Write a setter's value into the cache once Unity accepted it"""
+        if write_through is None or not isinstance(result, dict) or not result.get("success", False):
+            return
+        getter, reply, _ = write_through
+        try:
+            value = reply(params)
+        except (TypeError, ValueError, ZeroDivisionError):
+            return
+        with self._lock:
+            self._counts["writes"] += 1
+        self._store((getter, int(params["mesh_id"])), value)
+    
+    def _send_request(self, method, params=None, timeout=None):
+        key = self._key(method, params)
+        if key is None:
+            write_through = self._before_write(method, params)
+            result = self._client._send_request(method, params, timeout)
+            self._after_write(write_through, params, result)
+            return result
         
-        Args:
-            label: Dropdown label
-            options: List of option strings
-            default_index: Default selected index (0-based)
-            
-        Returns:
-            str: Element ID or None if failed
-        """
-        result = self._client._send_request("spz.ui.add_dropdown", {
-            "addon_id": self._addon_id,
-            "panel_id": self._panel_id,
-            "label": str(label),
-            "options": list(options),
-            "default": int(default_index)
-        })
-        if result.get("success", False):
-            return result.get("element_id", None)
-        return None
+        result = self._lookup(key)
+        if result is None:
+            generation = self._generation
+            result = self._client._send_request(method, params, timeout)
+            self._store(key, result, generation)
+        return result
     
-    def get_value(self, element_id):
-        """Get the value of a UI element
+    def _submit_request(self, method, params=None, timeout=None):
+        key = self._key(method, params)
+        if key is None:
+            write_through = self._before_write(method, params)
+            future = self._client._submit_request(method, params, timeout)
+            if write_through is not None:
+                future.add_done_callback(
+                    lambda done: done.cancelled() or done.exception() is not None
+                    or self._after_write(write_through, params, done.result()))
+            return future
         
-        Args:
-            element_id: ID of the UI element
-            
-        Returns:
-            Value (float, int, or str depending on element type) or None if failed
-        """
-        result = self._client._send_request("spz.ui.get_value", {
-            "element_id": str(element_id)
-        })
-        if result.get("success", False):
-            return result.get("value", None)
-        return None
+        result = self._lookup(key)
+        if result is not None:
+            future = Future()
+            future.set_result(result)
+            return future
+        generation = self._generation
+        future = self._client._submit_request(method, params, timeout)
+        future.add_done_callback(
+            lambda done: done.cancelled() or done.exception() is not None
+            or self._store(key, done.result(), generation))
+        return future
     
-    def set_value(self, element_id, value):
-        """Set the value of a UI element
+    def _submit_batch(self, calls, timeout=None):
+        for method, params in calls:
+            self._before_write(method, params)
+        return self._client._submit_batch(calls, timeout)
+    
+    def _send_notification(self, method, params=None, timeout=None):
+        self._before_write(method, params)
+        self._client._send_notification(method, params, timeout)
+    
+    async def _send_request_async(self, client, method, params=None, timeout=None):
+        """_send_request, awaiting the reply on an AsyncSPZClient (http_server's)"""
+        key = self._key(method, params)
+        if key is None:
+            write_through = self._before_write(method, params)
+            result = await client._send_request(method, params, timeout)
+            self._after_write(write_through, params, result)
+            return result
         
-        Args:
-            element_id: ID of the UI element
-            value: Value to set (float, int, or str depending on element type)
-            
-        Returns:
-            bool: True if successful
-        """
-        result = self._client._send_request("spz.ui.set_value", {
-            "element_id": str(element_id),
-            "value": value
-        })
-        return result.get("success", False)
+        result = self._lookup(key)
+        if result is None:
+            generation = self._generation
+            result = await client._send_request(method, params, timeout)
+            self._store(key, result, generation)
+        return result
 
 
 # ============================================
@@ -1078,8 +4292,8 @@ class Panel:
 class SPZAPI:
     """Main API interface"""
     
-    def __init__(self):
-        self._client = _get_client()
+    def __init__(self, client=None):
+        self._client = client if client is not None else _get_client()
         self.cameras = CameraAPI(self._client)
         self.models = ModelsAPI(self._client)
         self.scene = SceneAPI(self._client)
@@ -1092,12 +4306,319 @@ class SPZAPI:
         self.project = ProjectAPI(self._client)
         self.projection = ProjectionAPI(self._client)
         self.ui = UIAPI(self._client)
+        self._pipeline = None
+        self._notify = None
+        self._events = None
+    
+    @property
+    def pipeline(self):
+        """Facades whose methods return futures instead of blocking
+        
+        Example:
+            futures = [api.pipeline.models.get_pos(i) for i in mesh_ids]
+            positions = [f.result() for f in futures]
+        
+        With a pipelined client (SPZClient(pipelined=True)) all requests are
+        in flight at once; otherwise each one completes before the next.
+        """
+        if self._pipeline is None:
+            self._pipeline = _FacadeNamespace(self, self._dispatch_future)
+        return self._pipeline
+    
+    @property
+    def notify(self):
+        """Facades whose setters are sent as fire-and-forget notifications
+        
+        Example:
+            api.notify.on_error = lambda method, error: print(method, error)
+            for mesh_id in mesh_ids:
+                api.notify.models.set_visibility(mesh_id, False)
+            api.notify.sync()
+        
+        Returns:
+            Notifier: counts sent and failed notifications
+        """
+        if self._notify is None:
+            self._notify = Notifier(self)
+        return self._notify
+    
+    @property
+    def events(self):
+        """Callbacks for events StableProjectorz pushes (generation finished, ...)
+        
+        Example:
+            api.events.on("generation_finished", lambda event: print("done"))
+            api.sd.trigger_generation()
+        
+        Returns:
+            Events: subscribes on a dedicated connection of its own
+        """
+        if self._events is None:
+            self._events = Events(self._client)
+        return self._events
+    
+    def batch(self, timeout=None):
+        """Record facade calls and send them as one JSON-RPC batch
+        
+        Example:
+            with api.batch() as b:
+                for mesh_id in mesh_ids:
+                    b.models.set_visibility(mesh_id, True)
+        
+        Returns:
+            Batch: context manager mirroring the API facades
+        """
+        return Batch(self, timeout=timeout)
+    
+    def coalesce(self, window=1 / 60, on_error=None):
+        """API whose setters send only the latest value per target, once per frame tick
+        
+        Camera, mesh, projection-camera, skybox, ControlNet and prompt setters
+        return True right away; within each window only the last value per
+        (setter, target) is kept, and what is left is flushed as one batch
+        that Unity applies in a single frame. Intermediate values never cross
+        the socket. Any other request flushes first, so reads see every
+        earlier write. A camera's position, rotation and FOV writes are held
+        together and sent as one set_camera_pose, since Unity takes only one
+        camera write per frame.
+        
+        Example:
+            with api.coalesce() as live:
+                for t in range(1000):
+                    live.cameras.set_pos(0, math.sin(t), 1.0, -5.0)
+        
+        Args:
+            window: Seconds between flushes (default one 60 Hz frame; Unity
+                drops camera moves less than 16 ms apart anyway)
+            on_error: Called as on_error(method, params, error) for every
+                flushed setter that failed; failures are counted either way
+        
+        Returns:
+            CoalescingAPI: flushes and stops when closed or when its with-block exits
+        """
+        return CoalescingAPI(_CoalescingClient(self._client, window, on_error))
+    
+    def with_timeout(self, seconds):
+        """API whose requests time out after `seconds`
+        
+        Per call, for a latency-sensitive request or a slow one:
+            api.with_timeout(0.05).cameras.set_pos(0, x, y, z)
+            api.with_timeout(30.0).project.save()
+        
+        Per context: every spz request made inside the block, through any API
+        object on this thread (or asyncio task), shares one deadline, and
+        pipelined futures still pending when the block exits are cancelled:
+            with api.with_timeout(0.2) as fast:
+                fast.cameras.set_pos(0, x, y, z)
+                pos = fast.models.get_pos(mesh_id)
+        
+        Requests that run out of time raise SPZTimeoutError (a TimeoutError).
+        """
+        return _TimedSPZAPI(_TimeoutClient(self._client, seconds))
+    
+    def enable_cache(self, ttl=1.0, max_entries=10000):
+        """Serve repeated per-mesh reads from a local cache
+        
+        models.get_pos/get_rot/get_scale/get_bounds/get_name/get_visibility
+        replies are kept for ttl seconds, at most max_entries of them (least
+        recently used are dropped first). Setters called through this API
+        update the cached value once Unity accepts them; changes made any
+        other way (Unity's UI, another client) show up when entries expire.
+        
+        Example:
+            api.enable_cache(ttl=0.5)
+            pos = api.models.get_pos(mesh_id)   # asks Unity
+            pos = api.models.get_pos(mesh_id)   # served locally
+            print(api.cache_stats()["hit_rate"])
+        """
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if isinstance(self._client, _SceneCache):
+            self._client.ttl = ttl
+            self._client.max_entries = max_entries
+            return
+        self._use_client(_SceneCache(self._client, ttl, max_entries))
+    
+    def disable_cache(self):
+        """Stop caching and drop every cached reply"""
+        if isinstance(self._client, _SceneCache):
+            self._client.clear()
+            self._use_client(self._client._client)
+    
+    def clear_cache(self):
+        """Drop every cached reply (e.g. after loading a project)"""
+        if isinstance(self._client, _SceneCache):
+            self._client.clear()
+    
+    def cache_stats(self):
+        """Get cache counters
+        
+        Returns:
+            dict with hits, misses, hit_rate, entries, max_entries, ttl,
+            expired, evictions (LRU), writes (write-through updates) and
+            invalidations; None if the cache is off
+        """
+        if isinstance(self._client, _SceneCache):
+            return self._client.stats()
+        return None
+    
+    def _use_client(self, client):
+        """Route every facade (and the pipeline and notifier) through client"""
+        self._client = client
+        for name in _PROXY_FACADES + ("ui",):
+            getattr(self, name)._client = client
+        self._pipeline = None
+        if self._notify is not None:
+            self._notify._client = client
+    
+    def _dispatch_future(self, method, params, parse):
+        """Send a request without blocking and return a future of its parsed result"""
+        if method is None:
+            future = Future()
+            future.set_result(parse(None))
+            return future
+        return _chain_future(self._client._submit_request(method, params), parse)
+    
+    def ping(self):
+        """Cheap liveness check
+        
+        Answered by the socket server's connection thread without waiting for
+        a Unity frame. Hosts that predate "spz.sys.ping" are reported ready
+        as soon as they answer at all.
+        
+        Returns:
+            bool: Whether StableProjectorz is up and its API is initialized
+        """
+        try:
+            result = self._client._send_request("spz.sys.ping")
+        except RuntimeError:
+            return True  # Method not found: an older host, reachable and serving
+        return bool(result.get("ready", False))
+    
+    def wait_until_ready(self, timeout=30.0, initial_delay=0.005, max_delay=0.25):
+        """Block until StableProjectorz answers pings and reports ready
+        
+        Retries with exponential backoff (initial_delay doubling up to
+        max_delay), so a host that has just come up is noticed within a few
+        milliseconds rather than on the next fixed-interval poll.
+        
+        Returns:
+            float: Seconds spent waiting
+        
+        Raises:
+            TimeoutError: If it isn't ready within timeout seconds
+        """
+        start = time.monotonic()
+        delay = initial_delay
+        last_error = None
+        while True:
+            try:
+                if self.ping():
+                    return time.monotonic() - start
+                last_error = None
+            except (ConnectionError, OSError) as e:
+                last_error = e
+            
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                reason = f": {last_error}" if last_error else " (API not initialized)"
+                raise TimeoutError(f"StableProjectorz not ready after {timeout}s{reason}")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
     
     def close(self):
         """Close the connection"""
         self._client.close()
 
 
+class AsyncSPZAPI(_FacadeNamespace):
+    """Awaitable API interface
+    
+    Mirrors SPZAPI, but every facade method is a coroutine:
+        
+        api = spz.AsyncSPZAPI()
+        pos, rot = await asyncio.gather(api.cameras.get_pos(0),
+                                        api.models.get_rot(mesh_id))
+        await api.sd.wait_until_done(timeout=300)
+    
+    UI panels are not available here; add-ons create them through SPZAPI.
+    """
+    
+    def __init__(self, client=None):
+        self._client = client if client is not None else AsyncSPZClient()
+        super().__init__(SPZAPI(self._client), self._dispatch, _async_wait_until_idle)
+    
+    def with_timeout(self, seconds):
+        """Awaitable API whose requests time out after `seconds` (see SPZAPI.with_timeout)"""
+        return _TimedAsyncSPZAPI(_TimeoutClient(self._client, seconds))
+    
+    async def _dispatch(self, method, params, parse):
+        """Send a request and return the facade method's parsed result"""
+        if method is None:
+            return parse(None)
+        return parse(await self._client._send_request(method, params))
+    
+    async def close(self):
+        """Close the connection"""
+        await self._client.close()
+
+
+class CoalescingAPI(SPZAPI):
+    """SPZAPI returned by SPZAPI.coalesce()"""
+    
+    def flush(self):
+        """Send held setters now instead of at the next frame tick"""
+        self._client.flush()
+    
+    def stats(self):
+        """Get coalescing counters
+        
+        Returns:
+            dict with calls (setter calls made), coalesced (superseded before
+            being sent), sent, flushes, errors and held (waiting to be sent)
+        """
+        return self._client.stats()
+    
+    def close(self):
+        """Flush held setters and stop coalescing; the connection stays open"""
+        self._client.stop()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class _TimeoutScope:
+    """with-block support for the API objects returned by with_timeout()"""
+    
+    def __enter__(self):
+        scope = _DeadlineScope(time.monotonic() + self._client.timeout)
+        parent = _deadline_scope.get()
+        if parent is not None:
+            scope.deadline = min(scope.deadline, parent.deadline)
+        self.__dict__.setdefault("_scopes", []).append((scope, _deadline_scope.set(scope)))
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        scope, token = self._scopes.pop()
+        _deadline_scope.reset(token)
+        scope.cancel_pending()
+        return False
+
+
+class _TimedSPZAPI(_TimeoutScope, SPZAPI):
+    """SPZAPI returned by SPZAPI.with_timeout()"""
+
+
+class _TimedAsyncSPZAPI(_TimeoutScope, AsyncSPZAPI):
+    """AsyncSPZAPI returned by AsyncSPZAPI.with_timeout()"""
+
+
 # Global API instance
 _api = None
 
@@ -1169,3 +4690,20 @@ def projection():
 def ui():
     """Get UI API"""
     return get_api().ui
+
+
+# Submodules loaded on first use: spz.<name> -> module
+_SUBMODULES = {
+    "transforms": "spz_transforms",  # NumPy transform math
+    "jobs": "spz_jobs",              # Batch texture generation scheduler
+    "cache": "spz_cache",            # Content-addressed generation result cache
+    "export_pipeline": "spz_export_pipeline",  # Parallel post-processing of exported textures
+}
+
+
+def __getattr__(name):
+    """Lazy submodules (see _SUBMODULES)"""
+    if name in _SUBMODULES:
+        import importlib
+        return importlib.import_module(_SUBMODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
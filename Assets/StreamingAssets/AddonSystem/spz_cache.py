@@ -0,0 +1,367 @@
+"""
+StableProjectorz Generation Cache (spz.cache)
+
+Content-addressed cache of exported textures: generating again with the
+same prompts, ControlNet settings, projection camera poses and model is
+served from disk in milliseconds instead of minutes of diffusion.
+
+Example:
+    cache = spz.cache.GenerationCache("D:/spz_cache", max_bytes=10 << 30,
+                                      fingerprint="sdxl_base_1.0 / statue_v3.fbx")
+    result = cache.generate("D:/out/statue.png")
+    print("cached" if result["hit"] else "generated", result["files"])
+
+The key is a SHA-256 of the inputs read from StableProjectorz (in two
+batches) plus a fingerprint for what the API can't read, such as the
+Stable Diffusion checkpoint or the meshes in the scene. Each entry is a
+directory named by its key; index.json lists the entries from least to
+most recently used, and the least recently used ones are deleted when the
+total size goes over max_bytes. One process should use a cache directory
+at a time.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+import spz
+from spz_jobs import _Completion, _export_files, _write_json
+
+
+# Name of the exported files inside an entry: an export to "<stem><ext>"
+# also writes "<stem>_AO<ext>" and UDIM tiles, so entries keep the suffixes
+_EXPORT_STEM = "export"
+
+
+class GenerationCache:
+    """Exported textures stored on disk by a hash of the inputs that made them
+    
+    generate() reads the inputs and copies the cached export to the given
+    path on a hit. On a miss it generates and exports the texture, stores
+    the export and copies it to the path. A hit only writes files: the
+    texture isn't loaded back into StableProjectorz.
+    
+    Args:
+        directory: Where entries and index.json are kept (created if missing)
+        max_bytes: Total size of the cached files above which the least
+            recently used entries are deleted; an export bigger than this
+            isn't kept at all
+        api: SPZAPI to read inputs and generate through (default: spz.get_api())
+        fingerprint: Anything JSON-compatible that should also change the key
+            (e.g. the checkpoint name and a hash of the scene)
+        job_timeout: Seconds one generation may take (None: no limit)
+        export_timeout: Seconds one export may take (None: no limit)
+        check_interval: Seconds between status checks while waiting
+    """
+    
+    def __init__(self, directory, max_bytes=2 << 30, api=None, fingerprint=None,
+                 job_timeout=None, export_timeout=None, check_interval=5.0):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.api = api if api is not None else spz.get_api()
+        self.fingerprint = fingerprint
+        self.job_timeout = job_timeout
+        self.export_timeout = export_timeout
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> {"files": {name: bytes}, "bytes", "created", "used", "inputs"}, least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._load()
+    
+    # ============================================
+    # Keys
+    # ============================================
+    
+    def inputs(self, views=None):
+        """Read what a generation depends on from StableProjectorz
+        
+        Args:
+            views: Projection camera indices whose poses count (default: all)
+        
+        Returns:
+            dict: positive, negative, workflow_mode, controlnet (per unit:
+            enabled, and weight and model if enabled), projections (index,
+            position, rotation) and fingerprint
+        """
+        with self.api.batch() as batch:
+            positive = batch.sd.get_positive_prompt()
+            negative = batch.sd.get_negative_prompt()
+            workflow_mode = batch.workflow.get_mode()
+            unit_count = batch.controlnet.get_unit_count()
+            view_count = batch.projection.get_count() if views is None else None
+        views = range(view_count.result() or 0) if views is None else [int(view) for view in views]
+        
+        with self.api.batch() as batch:
+            units = [(batch.controlnet.get_unit_enabled(unit), batch.controlnet.get_unit_weight(unit),
+                      batch.controlnet.get_unit_model(unit)) for unit in range(unit_count.result() or 0)]
+            poses = [(view, batch.projection.get_pos(view), batch.projection.get_rot(view)) for view in views]
+        
+        controlnet = []
+        for enabled, weight, model in units:
+            # A disabled unit's weight and model don't change the result
+            if enabled.result():
+                controlnet.append({"enabled": True, "weight": round(weight.result() or 0.0, 4),
+                                   "model": model.result()})
+            else:
+                controlnet.append({"enabled": False})
+        projections = []
+        for view, position, rotation in poses:
+            position, rotation = position.result(), rotation.result()
+            if position is None or rotation is None:
+                raise ValueError(f"No projection camera {view}")
+            projections.append({
+                "index": view,
+                "position": [round(position[key], 5) for key in "xyz"],
+                "rotation": [round(rotation[key], 5) for key in "xyzw"],
+            })
+        return {
+            "positive": positive.result(),
+            "negative": negative.result(),
+            "workflow_mode": workflow_mode.result(),
+            "controlnet": controlnet,
+            "projections": projections,
+            "fingerprint": self.fingerprint,
+        }
+    
+    @staticmethod
+    def key(inputs):
+        """Content key of a set of inputs (hex SHA-256 of their canonical JSON)"""
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    # ============================================
+    # Generating
+    # ============================================
+    
+    def generate(self, path, views=None, is_dilate=True, force=False):
+        """Write the projection textures for the current inputs to path, generating them only on a miss
+        
+        Args:
+            path: Base path of the export (e.g. "D:/out/statue.png"); the
+                ambient occlusion map and extra UDIM tiles get suffixes
+            views: Projection cameras whose poses are part of the key (default: all)
+            is_dilate: Passed to export_projection_textures
+            force: Generate even if the inputs are cached (the new export replaces the entry)
+        
+        Returns:
+            dict with hit, key, files (paths written) and seconds
+        
+        Raises:
+            RuntimeError: If generation or export couldn't be started, or the export wrote nothing
+            spz.SPZTimeoutError: If generation or export took longer than allowed
+        """
+        started = time.monotonic()
+        extension = os.path.splitext(path)[1] or ".png"
+        inputs = dict(self.inputs(views), format=extension.lower(), is_dilate=bool(is_dilate))
+        key = self.key(inputs)
+        if not force:
+            files = self.get(key, path)
+            if files is not None:
+                return {"hit": True, "key": key, "files": files, "seconds": time.monotonic() - started}
+        else:
+            with self._lock:
+                self.misses += 1
+        
+        staging = tempfile.mkdtemp(prefix="staging-", dir=self.directory)
+        try:
+            self._generate(os.path.join(staging, _EXPORT_STEM + extension), is_dilate)
+            if not os.listdir(staging):
+                raise RuntimeError("The export wrote no files")
+            # Copied out first: an export bigger than max_bytes isn't kept
+            files = self._copy_out(staging, sorted(os.listdir(staging)), path)
+            with self._lock:
+                self._add(key, staging, inputs)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return {"hit": False, "key": key, "files": files, "seconds": time.monotonic() - started}
+    
+    def _generate(self, export_path, is_dilate):
+        """Generate a texture and export it to export_path, waiting for both"""
+        api = self.api
+        with _Completion(api, "generation_finished", api.sd.is_generating, self.check_interval) as generation, \
+                _Completion(api, "project_operation_finished", api.project.is_operation_in_progress,
+                            self.check_interval) as export:
+            generation.start()
+            if not api.sd.trigger_generation():
+                raise RuntimeError("trigger_generation failed")
+            if not generation.wait(self.job_timeout):
+                api.sd.stop_generation()
+                raise spz.SPZTimeoutError(f"Generation still running after {self.job_timeout:.3g}s; stopped",
+                                          "spz.cmd.trigger_texture_generation", self.job_timeout)
+            export.start()
+            if not api.export.export_projection_textures(is_dilate, export_path):
+                raise RuntimeError("export_projection_textures failed")
+            if not export.wait(self.export_timeout):
+                raise spz.SPZTimeoutError(f"Export still running after {self.export_timeout:.3g}s",
+                                          "spz.cmd.export_projection_textures", self.export_timeout)
+    
+    # ============================================
+    # Entries
+    # ============================================
+    
+    def get(self, key, path):
+        """Copy a cached export to base path path
+        
+        Returns:
+            list of the paths written, or None if key isn't cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not all(os.path.isfile(os.path.join(self._entry_dir(key), name))
+                                             for name in entry["files"]):
+                self._remove(key)  # Deleted from outside
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["used"] = time.time()
+            self._entries.move_to_end(key)
+            self._save()
+            return self._copy_out(self._entry_dir(key), entry["files"], path)
+    
+    def put(self, key, path, inputs=None):
+        """Store the files an export to base path path wrote under key
+        
+        Those are path itself and its siblings named <stem>_*<ext>.
+        
+        Returns:
+            bool: False if there were no such files, or they are bigger than max_bytes
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        stem = os.path.splitext(name)[0]
+        names = _export_files(path)
+        if not names:
+            return False
+        staging = tempfile.mkdtemp(prefix="staging-", dir=self.directory)
+        try:
+            for other in names:
+                shutil.copyfile(os.path.join(directory, other),
+                                os.path.join(staging, _EXPORT_STEM + other[len(stem):]))
+            with self._lock:
+                return self._add(key, staging, inputs)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+    
+    def clear(self):
+        """Delete every entry"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._save()
+    
+    def stats(self):
+        """Get cache counters
+        
+        Returns:
+            dict with entries, bytes, max_bytes, hits, misses, hit_rate and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+    
+    # ============================================
+    # Storage (called with _lock held)
+    # ============================================
+    
+    def _entry_dir(self, key):
+        return os.path.join(self.directory, "entries", key)
+    
+    def _add(self, key, staging, inputs):
+        """Move a staging directory of export files in as key's entry, then evict down to max_bytes
+        
+        Returns:
+            bool: False if the files alone are bigger than max_bytes (nothing is stored)
+        """
+        files = {name: os.path.getsize(os.path.join(staging, name)) for name in sorted(os.listdir(staging))}
+        if key in self._entries:
+            self._remove(key)
+        if sum(files.values()) > self.max_bytes:
+            self._save()
+            return False
+        target = self._entry_dir(key)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        now = time.time()
+        self._entries[key] = {"files": files, "bytes": sum(files.values()), "created": now, "used": now,
+                              "inputs": inputs}
+        self._bytes += self._entries[key]["bytes"]
+        # The new entry is the most recently used and fits on its own, so it is never evicted here
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        self._save()
+        return True
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["bytes"]
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+    
+    @staticmethod
+    def _copy_out(directory, names, path):
+        """Copy export files named export*<ext> in directory to base path path; returns the paths written"""
+        stem, extension = os.path.splitext(os.path.abspath(path))
+        os.makedirs(os.path.dirname(stem), exist_ok=True)
+        written = []
+        for name in names:
+            cached_stem, cached_extension = os.path.splitext(name)
+            target = stem + cached_stem[len(_EXPORT_STEM):] + (extension or cached_extension)
+            shutil.copyfile(os.path.join(directory, name), target)
+            written.append(target)
+        return written
+    
+    def _save(self):
+        entries = [dict(entry, key=key) for key, entry in self._entries.items()]
+        _write_json(os.path.join(self.directory, "index.json"), {"version": 1, "entries": entries})
+    
+    def _load(self):
+        """Read index.json, dropping entries whose files are gone and files no entry owns"""
+        os.makedirs(os.path.join(self.directory, "entries"), exist_ok=True)
+        index = os.path.join(self.directory, "index.json")
+        entries = []
+        if os.path.exists(index):
+            with open(index, encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+        for entry in entries:
+            key = entry.pop("key")
+            if all(os.path.isfile(os.path.join(self._entry_dir(key), name)) for name in entry["files"]):
+                self._entries[key] = entry
+                self._bytes += entry["bytes"]
+        
+        # Left over from a crash between moving files in and saving the index
+        for name in os.listdir(os.path.join(self.directory, "entries")):
+            if name not in self._entries:
+                shutil.rmtree(self._entry_dir(name), ignore_errors=True)
+        for name in os.listdir(self.directory):
+            if name.startswith("staging-"):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+        
+        while self._bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        self._save()
@@ -0,0 +1,498 @@
+"""
+StableProjectorz Export Post-Processing Pipeline (spz.export_pipeline)
+
+Watches the directory exports are written to and streams every new texture
+through a chain of stages (resize, format conversion, mipmaps, previews,
+...) on a pool of worker processes. Post-processing then uses every core
+and runs while the next texture is generating, instead of in a
+single-threaded script afterwards.
+
+Example:
+    from spz_export_pipeline import ExportPipeline, Stage, resize, convert, mipmaps, preview
+    
+    def main():
+        api = spz.get_api()
+        pipeline = ExportPipeline(api, stages=[
+            Stage("half", resize, scale=0.5),
+            Stage("webp", convert, format="WEBP", quality=90),
+            Stage("mips", mipmaps, input="half"),
+            Stage("preview", preview, input="export", size=256),
+        ])
+        with pipeline:
+            jobs.run()          # generations and exports, post-processed as they land
+            pipeline.wait()
+        print(pipeline.stats())
+    
+    if __name__ == "__main__":  # worker processes import this script
+        main()
+
+A stage is a function fn(path, out_dir, **options) returning the paths it
+wrote (one or a list). It runs on the outputs of the stage named by input
+(default: the stage before it; "export" is the exported file itself) and
+writes into <output>/<stage name>/. Stage functions must be defined at
+module level so worker processes can import them. Results are cached by
+the input's content hash: a file exported again with the same contents, or
+seen again after a restart, isn't processed again as long as the outputs
+are still there.
+
+The built-in stages (resize, convert, mipmaps, preview) need Pillow.
+"""
+
+import os
+import json
+import time
+import fnmatch
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import spz
+from spz_jobs import _write_json
+
+
+# Files picked up by default (what StableProjectorz exports)
+DEFAULT_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.tga", "*.exr")
+
+# Name of the pseudo-stage whose output is the exported file itself
+EXPORT = "export"
+
+
+def _file_hash(path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file's contents (hashlib releases the GIL on large chunks)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _signature(path):
+    """(size, mtime_ns) of a file, or None if it is gone"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _run_stage(fn, path, out_dir, options):
+    """Worker process: run one stage on one file; returns (output paths, seconds)"""
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = fn(path, out_dir, **options)
+    if outputs is None:
+        outputs = []
+    elif isinstance(outputs, (str, os.PathLike)):
+        outputs = [outputs]
+    return [os.path.abspath(output) for output in outputs], time.perf_counter() - started
+
+
+# ============================================
+# Stages
+# ============================================
+
+class Stage:
+    """One post-processing step: fn(path, out_dir, **options) -> path or list of paths
+    
+    Args:
+        name: Stage name; its outputs go to <output>/<name>/
+        fn: Module-level function (worker processes import it by name)
+        input: Stage whose outputs this one processes (default: the stage
+            before it, or the exported file for the first stage); EXPORT
+            for the exported file itself
+        version: Change it when fn changes, so earlier cached results are redone
+        **options: Keyword arguments for fn (part of the cache key)
+    """
+    
+    def __init__(self, name, fn, input=None, version=1, **options):
+        if name == EXPORT:
+            raise ValueError(f"{EXPORT!r} names the exported file and can't be a stage name")
+        self.name = name
+        self.fn = fn
+        self.input = input
+        self.version = version
+        self.options = options
+    
+    def key(self, content_hash, filename):
+        """Cache key of running this stage on a file with this content and name"""
+        identity = {
+            "stage": self.name,
+            "fn": f"{getattr(self.fn, '__module__', '')}.{getattr(self.fn, '__qualname__', repr(self.fn))}",
+            "version": self.version,
+            "options": self.options,
+            "input": [content_hash, filename],
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+    
+    def __repr__(self):
+        return f"Stage({self.name!r}, {getattr(self.fn, '__name__', self.fn)!r}, input={self.input!r})"
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("The built-in export pipeline stages need Pillow (pip install Pillow)") from None
+    return Image
+
+
+def _output_path(path, out_dir, suffix="", extension=None):
+    stem, original = os.path.splitext(os.path.basename(path))
+    return os.path.join(out_dir, stem + suffix + (extension or original))
+
+
+def resize(path, out_dir, scale=0.5, size=None):
+    """Resize by scale, or to size (width, height)"""
+    Image = _pillow()
+    output = _output_path(path, out_dir)
+    with Image.open(path) as image:
+        if size is None:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image.resize(tuple(size), Image.LANCZOS).save(output)
+    return output
+
+
+def convert(path, out_dir, format="WEBP", **save_options):
+    """Convert to another image format (e.g. "WEBP", "JPEG"); save_options go to Image.save"""
+    Image = _pillow()
+    extension = {"JPEG": ".jpg", "TIFF": ".tif"}.get(format.upper(), "." + format.lower())
+    output = _output_path(path, out_dir, extension=extension)
+    with Image.open(path) as image:
+        if format.upper() == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(output, format=format, **save_options)
+    return output
+
+
+def mipmaps(path, out_dir, min_size=1):
+    """Halve the image down to min_size: <stem>_mip1, <stem>_mip2, ..."""
+    Image = _pillow()
+    outputs = []
+    with Image.open(path) as image:
+        level = image
+        while min(level.width, level.height) // 2 >= min_size:
+            level = level.resize((level.width // 2, level.height // 2), Image.BOX)
+            outputs.append(_output_path(path, out_dir, f"_mip{len(outputs) + 1}"))
+            level.save(outputs[-1])
+    return outputs
+
+
+def preview(path, out_dir, size=256, quality=85):
+    """JPEG thumbnail at most size pixels wide and high: <stem>_preview.jpg"""
+    Image = _pillow()
+    output = _output_path(path, out_dir, "_preview", ".jpg")
+    with Image.open(path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((size, size))
+        image.save(output, quality=quality)
+    return output
+
+
+# ============================================
+# Pipeline
+# ============================================
+
+class ExportPipeline:
+    """Streams exported textures through stages on a process pool
+    
+    Use as a context manager (start() / stop()), or call process() for
+    files without watching. The watched directory is scanned every
+    poll_interval seconds. A new or changed file is picked up once its
+    size and modification time stay the same between two scans. With an
+    api, the end of every export (a project_operation_finished event)
+    triggers a scan right away and takes files as they are. Stages of one
+    file run in order; files, and the outputs of one stage, run in parallel.
+    
+    Args:
+        api: SPZAPI whose exports to follow (default: spz.get_api() if
+            watch isn't given); None to only watch the directory
+        stages: List of Stage
+        watch: Directory to watch (default: api.project.get_data_dir())
+        output: Where stage outputs go (default: <watch>/processed)
+        patterns: File name patterns to pick up
+        workers: Worker processes (default: one per core)
+        poll_interval: Seconds between directory scans
+        process_existing: Also process files already there at start() (cached ones cost nothing)
+        on_file: Called as on_file(path, results) when a file has been through every stage
+        on_error: Called as on_error(path, stage name, exception) when a stage fails
+    """
+    
+    def __init__(self, api=None, stages=(), watch=None, output=None, patterns=DEFAULT_PATTERNS,
+                 workers=None, poll_interval=1.0, process_existing=True, on_file=None, on_error=None):
+        if api is None and watch is None:
+            api = spz.get_api()
+        if watch is None:
+            watch = api.project.get_data_dir()
+            if watch is None:
+                raise ValueError("The project hasn't been saved, so it has no data directory; pass watch=")
+        self.api = api
+        self.stages = list(stages)
+        self.watch = os.path.abspath(watch)
+        self.output = os.path.abspath(output if output is not None else os.path.join(self.watch, "processed"))
+        self.patterns = tuple(pattern.lower() for pattern in patterns)
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.process_existing = process_existing
+        self.on_file = on_file
+        self.on_error = on_error
+        
+        names = set()
+        for index, stage in enumerate(self.stages):
+            if stage.name in names:
+                raise ValueError(f"Duplicate stage name {stage.name!r}")
+            if stage.input is None:
+                stage.input = self.stages[index - 1].name if index else EXPORT
+            if stage.input != EXPORT and stage.input not in names:
+                raise ValueError(f"Stage {stage.name!r} reads from {stage.input!r}, which doesn't come before it")
+            names.add(stage.name)
+        
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._seen = {}        # path -> signature at the last scan
+        self._submitted = {}   # path -> signature it was processed with
+        self._results = {}     # path -> {stage name: [output paths]}
+        self._cache_file = os.path.join(self.output, ".stage_cache.json")
+        self._cache = {}       # stage key -> {"outputs": [[path, size, mtime_ns]], "seconds"}
+        self._counters = {stage.name: {"files": 0, "cached": 0, "failed": 0, "outputs": 0,
+                                       "bytes_in": 0, "busy_seconds": 0.0} for stage in self.stages}
+        self._processes = None
+        self._threads = None
+        self._watcher = None
+        self._stopping = threading.Event()
+        self._scan_now = threading.Event()
+        self._started = None
+        self._load_cache()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+    
+    def start(self):
+        """Start the worker pools and watching the directory"""
+        self._ensure_pools()
+        if self._watcher is None:
+            if not self.process_existing:
+                for path in self._candidates():
+                    self._submitted[path] = self._seen[path] = _signature(path)
+            self._stopping.clear()
+            if self.api is not None:
+                self.api.events.on("project_operation_finished", self._on_export_finished)
+            self._watcher = threading.Thread(target=self._watch, daemon=True, name="spz-export-pipeline")
+            self._watcher.start()
+        return self
+    
+    def stop(self, wait=True):
+        """Stop watching; with wait, finish the files already picked up first"""
+        if self._watcher is not None:
+            self._stopping.set()
+            self._scan_now.set()
+            self._watcher.join()
+            self._watcher = None
+            if self.api is not None:
+                self.api.events.off("project_operation_finished", self._on_export_finished)
+        if wait:
+            self.wait()
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait)
+            self._processes.shutdown(wait=wait)
+            self._threads = self._processes = None
+    
+    def wait(self, timeout=None):
+        """Block until every file picked up so far has been through the stages
+        
+        Returns:
+            bool: False if files were still being processed after timeout seconds
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+    
+    def process(self, path):
+        """Put one file through the stages now, watched or not
+        
+        Returns:
+            Future: resolves to {stage name: [output paths]} (stages that failed are missing)
+        """
+        self._ensure_pools()
+        path = os.path.abspath(path)
+        with self._lock:
+            self._pending += 1
+            self._submitted[path] = _signature(path)
+        return self._threads.submit(self._process, path)
+    
+    def scan(self, settled=False):
+        """Look at the watched directory once and pick up new or changed files
+        
+        Args:
+            settled: Take files as they are instead of waiting for them to
+                stay unchanged between two scans (e.g. right after an export)
+        
+        Returns:
+            int: Number of files picked up
+        """
+        picked = []
+        for path in self._candidates():
+            signature = _signature(path)
+            with self._lock:
+                previous, self._seen[path] = self._seen.get(path), signature
+                if signature is None or signature == self._submitted.get(path):
+                    continue
+                if settled or signature == previous:
+                    picked.append(path)
+        for path in picked:
+            self.process(path)
+        return len(picked)
+    
+    def results(self):
+        """{exported file: {stage name: [output paths]}} for every file processed so far"""
+        with self._lock:
+            return {path: dict(stages) for path, stages in self._results.items()}
+    
+    def stats(self):
+        """Per-stage throughput
+        
+        Returns:
+            dict with stages ({name: files, cached, failed, outputs,
+            files_per_second, mb_per_second, mean_seconds, busy_seconds}),
+            pending (files in progress), workers and elapsed seconds. Rates
+            are over the elapsed time since the pipeline started; cached
+            results count in files but not in busy_seconds.
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+            stages = {}
+            for name, counters in self._counters.items():
+                run = counters["files"] - counters["cached"]
+                stages[name] = dict(
+                    counters,
+                    busy_seconds=round(counters["busy_seconds"], 3),
+                    files_per_second=counters["files"] / elapsed if elapsed else 0.0,
+                    mb_per_second=counters["bytes_in"] / elapsed / 1e6 if elapsed else 0.0,
+                    mean_seconds=counters["busy_seconds"] / run if run else 0.0,
+                )
+            return {"stages": stages, "pending": self._pending, "workers": self.workers,
+                    "elapsed": round(elapsed, 3)}
+    
+    # ============================================
+    # Internals
+    # ============================================
+    
+    def _ensure_pools(self):
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self.workers)
+            # Each file waits on its stages in a thread of its own; enough threads to keep every process busy
+            self._threads = ThreadPoolExecutor(max_workers=self.workers * 2,
+                                               thread_name_prefix="spz-export-pipeline")
+            if self._started is None:
+                self._started = time.monotonic()
+    
+    def _candidates(self):
+        try:
+            entries = list(os.scandir(self.watch))
+        except FileNotFoundError:
+            return []
+        return [entry.path for entry in entries
+                if entry.is_file() and any(fnmatch.fnmatch(entry.name.lower(), p) for p in self.patterns)]
+    
+    def _watch(self):
+        while not self._stopping.is_set():
+            settled = self._scan_now.is_set()
+            self._scan_now.clear()
+            try:
+                self.scan(settled)
+            except Exception:
+                pass  # e.g. the directory is being replaced; try again next time
+            self._scan_now.wait(self.poll_interval)
+    
+    def _on_export_finished(self, event):
+        self._scan_now.set()
+    
+    def _process(self, path):
+        """Run every stage for one exported file; called on the thread pool"""
+        results = {EXPORT: [path]}
+        try:
+            for stage in self.stages:
+                inputs = results.get(stage.input)
+                if inputs is None:
+                    continue  # Its input stage failed
+                try:
+                    results[stage.name] = self._run(stage, inputs)
+                except Exception as e:
+                    with self._lock:
+                        self._counters[stage.name]["failed"] += 1
+                    if self.on_error is not None:
+                        self.on_error(path, stage.name, e)
+            results.pop(EXPORT)
+            with self._lock:
+                self._results[path] = results
+                self._save_cache()
+            if self.on_file is not None:
+                self.on_file(path, results)
+            return results
+        finally:
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+    
+    def _run(self, stage, inputs):
+        """Run one stage on every input in parallel, reusing cached results"""
+        out_dir = os.path.join(self.output, stage.name)
+        runs = []
+        outputs = []
+        for path in inputs:
+            key = stage.key(_file_hash(path), os.path.basename(path))
+            size = os.path.getsize(path)
+            cached = self._cached(key)
+            with self._lock:
+                counters = self._counters[stage.name]
+                counters["bytes_in"] += size
+                if cached is not None:
+                    counters["files"] += 1
+                    counters["cached"] += 1
+            if cached is not None:
+                outputs.extend(cached)
+            else:
+                runs.append((key, self._processes.submit(_run_stage, stage.fn, path, out_dir, stage.options)))
+        
+        error = None
+        for key, future in runs:
+            try:
+                paths, seconds = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            outputs.extend(paths)
+            with self._lock:
+                counters = self._counters[stage.name]
+                counters["files"] += 1
+                counters["busy_seconds"] += seconds
+                counters["outputs"] += len(paths)
+                self._cache[key] = {"outputs": [[p] + list(_signature(p) or (0, 0)) for p in paths],
+                                    "seconds": round(seconds, 3)}
+        if error is not None:
+            raise error
+        return outputs
+    
+    def _cached(self, key):
+        """Output paths of a cached result, if every output is still there unchanged"""
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None:
+            return None
+        for path, size, mtime_ns in entry["outputs"]:
+            if _signature(path) != (size, mtime_ns):
+                return None
+        return [path for path, _, _ in entry["outputs"]]
+    
+    def _load_cache(self):
+        if os.path.exists(self._cache_file):
+            with open(self._cache_file, encoding="utf-8") as f:
+                self._cache = json.load(f).get("entries", {})
+    
+    def _save_cache(self):
+        # Called with _lock held
+        os.makedirs(self.output, exist_ok=True)
+        _write_json(self._cache_file, {"version": 1, "entries": self._cache})
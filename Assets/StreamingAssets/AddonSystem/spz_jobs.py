@@ -0,0 +1,653 @@
+"""
+StableProjectorz Batch Texturing Jobs (spz.jobs)
+
+Runs a queue of texture generations back to back, each with its own
+prompts, camera or projection pose, ControlNet settings and workflow mode,
+so night batches keep Unity generating instead of waiting on a script.
+
+Example:
+    jobs = spz.jobs.Scheduler(api, state_file="night_batch.json")
+    for prompt in prompts:
+        jobs.add(prompt, negative="blurry, low quality",
+                 projection={"index": 0, "position": (0.0, 1.0, -4.0), "rotation": (0.0, 0.0, 0.0, 1.0)},
+                 controlnet={0: {"enabled": True, "weight": 0.8}},
+                 workflow_mode="TotalObject")
+    stats = jobs.run()
+    print(f"{stats['done']} done, {stats['jobs_per_hour']:.1f} jobs/hour")
+
+Progress is saved to state_file after every job. If the script or
+StableProjectorz dies midway, running the same script again (or a
+Scheduler on the same state_file) picks up where it stopped.
+
+ProjectionSweep generates and exports a texture from every projection
+camera into a directory, skipping views whose inputs haven't changed and
+whose files are still there since the last sweep.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+import spz
+
+
+# Pose keys a camera or projection pose may have
+_POSE_KEYS = ("index", "position", "rotation", "fov")
+
+# ControlNet unit settings a job may change
+_CONTROLNET_KEYS = ("enabled", "weight")
+
+
+def _record_setup(api, calls):
+    """Record (facade, method, args) calls into a batch, ready to send"""
+    batch = api.batch()
+    for facade, method, args in calls:
+        getattr(getattr(batch, facade), method)(*args)
+    return calls, batch
+
+
+def _send_setup(calls, batch):
+    """Send a recorded setup batch; returns an error message, or None if every call succeeded"""
+    try:
+        results = batch.send()
+    except (ConnectionError, TimeoutError) as e:
+        return f"setup failed: {e}"
+    for (facade, method, args), result in zip(calls, results):
+        if isinstance(result, Exception) or result is False:
+            detail = f": {result}" if isinstance(result, Exception) else ""
+            return f"{facade}.{method}{tuple(args)} failed{detail}"
+    return None
+
+
+def _export_files(path):
+    """Names of the files an export to base path path wrote
+    
+    Those are path itself and its siblings named <stem>_*<ext> (the ambient
+    occlusion map and extra UDIM tiles).
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    stem, extension = os.path.splitext(name)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(other for other in os.listdir(directory)
+                  if other == name or (other.startswith(stem + "_") and other.endswith(extension)))
+
+
+def _write_json(path, data):
+    """Replace a JSON file atomically, so a crash never leaves half of one"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(temporary, path)
+
+
+class _Completion:
+    """Waits for work in Unity to finish
+    
+    The end is pushed as a "*_finished" event; busy() (a status getter) is
+    also checked every check_interval seconds in case an event is missed.
+    Use as a context manager around the runs, and call start() right
+    before starting each piece of work.
+    """
+    
+    def __init__(self, api, event, busy, check_interval):
+        self._api = api
+        self._event = event
+        self._busy = busy
+        self._check_interval = check_interval
+        self._finished = threading.Event()
+    
+    def __enter__(self):
+        self._api.events.on(self._event, self._on_finished)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._api.events.off(self._event, self._on_finished)
+        return False
+    
+    def _on_finished(self, event):
+        self._finished.set()
+    
+    def start(self):
+        """Forget earlier events; call before starting the work"""
+        self._finished.clear()
+    
+    def wait(self, timeout=None):
+        """Block until the work is done; returns False if it is still running after timeout seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._check_interval
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0.0))
+            if self._finished.wait(wait) or not self._busy():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+
+class Job:
+    """One texture generation and the scene setup it runs with
+    
+    Args:
+        prompt: Positive prompt
+        negative: Negative prompt (None keeps the current one)
+        camera: View camera pose {"index", "position", "rotation", "fov"};
+            every key is optional (index defaults to 0)
+        projection: Projection camera pose {"index", "position", "rotation"}
+        controlnet: {unit_index: {"enabled": bool, "weight": float}}
+        workflow_mode: See WorkflowAPI.set_mode (None keeps the current one)
+        background: Passed to trigger_generation(is_background=...)
+        job_id: Name the job is resumed by (default: its place in the queue)
+    """
+    
+    def __init__(self, prompt, negative=None, camera=None, projection=None, controlnet=None,
+                 workflow_mode=None, background=False, job_id=None):
+        self.prompt = str(prompt)
+        self.negative = None if negative is None else str(negative)
+        self.camera = self._pose(camera, "camera")
+        self.projection = self._pose(projection, "projection")
+        self.controlnet = {}
+        for unit, settings in (controlnet or {}).items():
+            unknown = set(settings) - set(_CONTROLNET_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown ControlNet setting {sorted(unknown)[0]!r} for unit {unit}")
+            self.controlnet[int(unit)] = dict(settings)
+        self.workflow_mode = workflow_mode
+        self.background = bool(background)
+        self.job_id = job_id
+    
+    @staticmethod
+    def _pose(pose, name):
+        if pose is None:
+            return None
+        unknown = set(pose) - set(_POSE_KEYS)
+        if unknown or (name == "projection" and "fov" in pose):
+            key = sorted(unknown)[0] if unknown else "fov"
+            raise ValueError(f"Unknown {name} pose key {key!r}")
+        pose = dict(pose, index=int(pose.get("index", 0)))
+        for key, width in (("position", 3), ("rotation", 4)):
+            if key in pose:
+                pose[key] = [float(v) for v in pose[key]]
+                if len(pose[key]) != width:
+                    raise ValueError(f"{name} {key} needs {width} values, got {len(pose[key])}")
+        return pose
+    
+    def setup_calls(self):
+        """Facade calls that prepare the scene for this job
+        
+        Returns:
+            list of (facade, method, args) tuples, e.g. ("sd", "set_positive_prompt", ("...",))
+        """
+        calls = [("sd", "set_positive_prompt", (self.prompt,))]
+        if self.negative is not None:
+            calls.append(("sd", "set_negative_prompt", (self.negative,)))
+        if self.workflow_mode is not None:
+            calls.append(("workflow", "set_mode", (self.workflow_mode,)))
+        for facade, pose in (("cameras", self.camera), ("projection", self.projection)):
+            if pose is None:
+                continue
+            if "position" in pose:
+                calls.append((facade, "set_pos", (pose["index"], *pose["position"])))
+            if "rotation" in pose:
+                calls.append((facade, "set_rot", (pose["index"], *pose["rotation"])))
+            if "fov" in pose:
+                calls.append((facade, "set_fov", (pose["index"], pose["fov"])))
+        for unit, settings in sorted(self.controlnet.items()):
+            if "enabled" in settings:
+                calls.append(("controlnet", "set_unit_enabled", (unit, settings["enabled"])))
+            if "weight" in settings:
+                calls.append(("controlnet", "set_unit_weight", (unit, settings["weight"])))
+        return calls
+    
+    def to_dict(self):
+        """JSON-compatible form, as saved in the state file"""
+        return {
+            "job_id": self.job_id,
+            "prompt": self.prompt,
+            "negative": self.negative,
+            "camera": self.camera,
+            "projection": self.projection,
+            "controlnet": {str(unit): settings for unit, settings in self.controlnet.items()},
+            "workflow_mode": self.workflow_mode,
+            "background": self.background,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Job from to_dict() output"""
+        return cls(**data)
+    
+    def __repr__(self):
+        return f"Job({self.job_id!r}, {self.prompt[:40]!r})"
+
+
+class Scheduler:
+    """Runs texture generation jobs back to back
+    
+    Each job's setup calls go to Unity as one JSON-RPC batch (one frame),
+    followed by trigger_generation. They are recorded while the previous
+    generation is still running, so the batch is sent the moment it
+    finishes. It is not sent earlier: the running generation may still
+    depend on the prompts and poses. Completion arrives through api.events,
+    so waiting costs no command slots. is_generating() is checked every
+    check_interval seconds in case an event is missed.
+    
+    A job fails if a setup call or the trigger fails, or if the generation
+    is still running after job_timeout seconds (it is stopped then). Failed
+    jobs are not retried unless run(retry_failed=True).
+    
+    Args:
+        api: SPZAPI to run jobs through (default: spz.get_api())
+        state_file: JSON file that progress is saved to and resumed from
+        job_timeout: Seconds one generation may take (None: no limit)
+        check_interval: Seconds between is_generating() checks while waiting
+    """
+    
+    # Job states, as saved in the state file
+    PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+    
+    def __init__(self, api=None, state_file=None, job_timeout=None, check_interval=5.0):
+        self.api = api if api is not None else spz.get_api()
+        self.state_file = state_file
+        self.job_timeout = job_timeout
+        self.check_interval = check_interval
+        
+        self._jobs = {}     # job_id -> Job, in queue order
+        self._results = {}  # job_id -> {"status", "seconds", "finished", "error"}
+        self._added = 0     # add() calls, for default job ids
+        self._stop = threading.Event()
+        
+        # Throughput of the current (or last) run()
+        self._run_started = None
+        self._run_finished = None
+        self._run_jobs = 0
+        self._job_seconds = 0.0
+        self._idle_seconds = 0.0
+        
+        if state_file is not None and os.path.exists(state_file):
+            self._load()
+    
+    # ============================================
+    # Queue
+    # ============================================
+    
+    def add(self, job, **settings):
+        """Queue a job
+        
+        Args:
+            job: Job, or a positive prompt to build one from settings
+                (the keyword arguments of Job)
+        
+        A job whose job_id is already known (e.g. loaded from the state file)
+        replaces its definition but keeps its progress, so a script that
+        re-adds its jobs in the same order resumes instead of starting over.
+        
+        Returns:
+            Job: The queued job
+        """
+        if not isinstance(job, Job):
+            job = Job(job, **settings)
+        elif settings:
+            raise TypeError("Settings can only be given with a prompt, not with a Job")
+        self._added += 1
+        if job.job_id is None:
+            job.job_id = f"job-{self._added:04d}"
+        self._jobs[job.job_id] = job
+        self._results.setdefault(job.job_id, {"status": self.PENDING})
+        self._save()
+        return job
+    
+    @property
+    def jobs(self):
+        """Queued jobs, in order"""
+        return list(self._jobs.values())
+    
+    def status(self, job_id):
+        """Progress of one job: {"status", "seconds", "finished", "error"}"""
+        return dict(self._results[job_id])
+    
+    def stop(self):
+        """Make run() return once the current job is finished (callable from any thread)"""
+        self._stop.set()
+    
+    # ============================================
+    # Running
+    # ============================================
+    
+    def run(self, on_job=None, retry_failed=False):
+        """Run every pending job
+        
+        Args:
+            on_job: Called as on_job(job, status) after each job
+            retry_failed: Also run jobs that failed in an earlier run
+        
+        Returns:
+            dict: stats() after the run
+        """
+        wanted = (self.PENDING, self.RUNNING, self.FAILED) if retry_failed else (self.PENDING, self.RUNNING)
+        queue = [job for job_id, job in self._jobs.items() if self._results[job_id]["status"] in wanted]
+        
+        self._stop.clear()
+        self._run_started = time.monotonic()
+        self._run_finished = None
+        self._run_jobs = 0
+        self._job_seconds = 0.0
+        self._idle_seconds = 0.0
+        
+        try:
+            with _Completion(self.api, "generation_finished", self.api.sd.is_generating,
+                             self.check_interval) as generation:
+                setup = self._record(queue[0]) if queue else None
+                idle_since = None
+                for position, job in enumerate(queue):
+                    if self._stop.is_set():
+                        break
+                    started = time.monotonic()
+                    self._set_status(job, self.RUNNING)
+                    
+                    error = _send_setup(*setup)
+                    if error is None:
+                        generation.start()
+                        if not self.api.sd.trigger_generation(job.background):
+                            error = "trigger_generation failed"
+                    if idle_since is not None and error is None:
+                        self._idle_seconds += time.monotonic() - idle_since
+                    
+                    # While Unity generates, record the next job's setup
+                    following = queue[position + 1] if position + 1 < len(queue) else None
+                    setup = self._record(following) if following is not None else None
+                    if error is None and not generation.wait(self.job_timeout):
+                        self.api.sd.stop_generation()
+                        error = f"generation still running after {self.job_timeout:.3g}s; stopped"
+                    idle_since = time.monotonic()
+                    
+                    seconds = idle_since - started
+                    self._run_jobs += 1
+                    self._job_seconds += seconds
+                    self._set_status(job, self.FAILED if error else self.DONE, seconds=round(seconds, 3),
+                                     finished=time.time(), error=error)
+                    if on_job is not None:
+                        on_job(job, self.status(job.job_id))
+        finally:
+            self._run_finished = time.monotonic()
+        return self.stats()
+    
+    def _record(self, job):
+        """Record a job's setup calls into a batch: (calls, batch)"""
+        return _record_setup(self.api, job.setup_calls())
+    
+    # ============================================
+    # Progress
+    # ============================================
+    
+    def stats(self):
+        """Progress and throughput
+        
+        Returns:
+            dict with total, done, failed, pending (jobs in each state),
+            elapsed (seconds of the current or last run), jobs_per_hour
+            (jobs that run finished per hour), mean_job_seconds (setup,
+            generation and detecting its end) and idle_seconds (time Unity
+            sat between one generation finishing and the next being
+            triggered)
+        """
+        counts = {self.DONE: 0, self.FAILED: 0}
+        for result in self._results.values():
+            if result["status"] in counts:
+                counts[result["status"]] += 1
+        
+        elapsed = 0.0
+        if self._run_started is not None:
+            elapsed = (self._run_finished or time.monotonic()) - self._run_started
+        return {
+            "total": len(self._jobs),
+            "done": counts[self.DONE],
+            "failed": counts[self.FAILED],
+            "pending": len(self._jobs) - counts[self.DONE] - counts[self.FAILED],
+            "elapsed": elapsed,
+            "jobs_per_hour": self._run_jobs * 3600.0 / elapsed if elapsed > 0 else 0.0,
+            "mean_job_seconds": self._job_seconds / self._run_jobs if self._run_jobs else 0.0,
+            "idle_seconds": self._idle_seconds,
+        }
+    
+    def _set_status(self, job, status, **details):
+        self._results[job.job_id] = dict(details, status=status)
+        self._save()
+    
+    def _save(self):
+        """Write the queue and its progress to state_file (atomically)"""
+        if self.state_file is None:
+            return
+        _write_json(self.state_file, {
+            "version": 1,
+            "jobs": [job.to_dict() for job in self._jobs.values()],
+            "results": self._results,
+        })
+    
+    def _load(self):
+        with open(self.state_file, encoding="utf-8") as f:
+            state = json.load(f)
+        for data in state.get("jobs", []):
+            job = Job.from_dict(data)
+            self._jobs[job.job_id] = job
+        for job_id, result in state.get("results", {}).items():
+            if job_id not in self._jobs:
+                continue
+            # A job that was running when the last run died is started again
+            if result.get("status") == self.RUNNING:
+                result = {"status": self.PENDING}
+            self._results[job_id] = result
+        for job_id in self._jobs:
+            self._results.setdefault(job_id, {"status": self.PENDING})
+
+
+class ProjectionSweep:
+    """Generates and exports a texture from every projection camera
+    
+    For each view (projection camera index) the sweep moves the camera,
+    generates a texture and exports the projection textures to
+    <output_dir>/view_<index><extension>, then records the view's inputs,
+    timings and written files in a JSON manifest:
+        
+        sweep = spz.jobs.ProjectionSweep(api, "sweep.json", output_dir="D:/out/sweep",
+                                         prompt="weathered bronze statue",
+                                         poses={0: {"position": (0, 1, -4), "rotation": (0, 0, 0, 1)}})
+        manifest = sweep.run()
+    
+    The current camera poses are read in one batch. Each view's setup goes out
+    as one batch too. A view's setup is sent while the previous view's
+    export is still being written, so Unity starts generating the moment
+    the export finishes. A view whose inputs match those of its last
+    successful run, and whose files from that run still exist, is skipped
+    unless run(force=True). Its inputs are the prompts, settings, camera
+    pose and fingerprint.
+    
+    Args:
+        api: SPZAPI to run the sweep through (default: spz.get_api())
+        manifest: JSON file the manifest is written to (and read back from for skipping)
+        output_dir: Directory the views are exported to (created if missing)
+        extension: Extension of the exported files
+        prompt, negative, controlnet, workflow_mode: As for Job, shared by every view
+        poses: {view index: {"position", "rotation"}} to place cameras at;
+            cameras without one are used where they are
+        fingerprint: Anything JSON-compatible that should also invalidate
+            earlier results when it changes (e.g. a hash of the scene)
+        is_dilate: Passed to export_projection_textures
+        job_timeout: Seconds one generation may take (None: no limit)
+        export_timeout: Seconds one export may take (None: no limit)
+        check_interval: Seconds between status checks while waiting
+    """
+    
+    def __init__(self, api=None, manifest="projection_sweep.json", output_dir="projection_sweep",
+                 extension=".png", prompt="", negative=None, controlnet=None, workflow_mode=None,
+                 poses=None, fingerprint=None, is_dilate=True, job_timeout=None, export_timeout=None,
+                 check_interval=5.0):
+        self.api = api if api is not None else spz.get_api()
+        self.manifest = manifest
+        self.output_dir = os.path.abspath(output_dir)
+        self.extension = extension
+        self.settings = Job(prompt, negative=negative, controlnet=controlnet, workflow_mode=workflow_mode)
+        self.poses = {int(view): Job._pose(dict(pose, index=int(view)), "projection")
+                      for view, pose in (poses or {}).items()}
+        self.fingerprint = fingerprint
+        self.is_dilate = is_dilate
+        self.job_timeout = job_timeout
+        self.export_timeout = export_timeout
+        self.check_interval = check_interval
+    
+    def run(self, views=None, force=False, on_view=None):
+        """Sweep the views
+        
+        Args:
+            views: Projection camera indices (default: every camera)
+            force: Regenerate views whose inputs haven't changed
+            on_view: Called as on_view(view, entry) after each view
+        
+        Returns:
+            dict: The manifest: {"views": {index: entry}, "summary": {...}}
+            Each entry holds the view's inputs and their hash, its status
+            ("done", "skipped" or "failed"), error, exported, path (the
+            export's base path), files (every file it wrote), finished and
+            timings (setup, generation and export seconds); the summary
+            counts views per status and has the total elapsed seconds.
+        """
+        started = time.monotonic()
+        previous = {}
+        if os.path.exists(self.manifest):
+            with open(self.manifest, encoding="utf-8") as f:
+                previous = json.load(f).get("views", {})
+        if views is None:
+            views = range(self.api.projection.get_count())
+        views = [int(view) for view in views]
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        entries = {}
+        plan = []
+        for view, pose in zip(views, self._poses(views)):
+            inputs = {"settings": self.settings.to_dict(), "pose": pose, "fingerprint": self.fingerprint}
+            inputs_hash = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+            last = previous.get(str(view), {})
+            if (not force and last.get("status") in ("done", "skipped") and last.get("inputs_hash") == inputs_hash
+                    and last.get("path") == self._path(view) and last.get("files")
+                    and all(os.path.isfile(file) for file in last["files"])):
+                entries[view] = dict(last, status="skipped")
+            else:
+                plan.append((view, pose, inputs, inputs_hash))
+        
+        def save():
+            _write_json(self.manifest, self._manifest(entries, previous, started))
+        
+        # Shared settings go out with the first view; later views only move their camera
+        setup_error = None
+        if plan:
+            setup_error, setup_seconds = self._send_setup(plan[0][1], self.settings.setup_calls())
+        
+        with _Completion(self.api, "generation_finished", self.api.sd.is_generating,
+                         self.check_interval) as generation, \
+                _Completion(self.api, "project_operation_finished", self.api.project.is_operation_in_progress,
+                            self.check_interval) as export:
+            for position, (view, pose, inputs, inputs_hash) in enumerate(plan):
+                timings = {"setup": round(setup_seconds, 3)}
+                error = setup_error
+                exported = False
+                path = self._path(view)
+                files = []
+                
+                if error is None:
+                    mark = time.monotonic()
+                    generation.start()
+                    if not self.api.sd.trigger_generation():
+                        error = "trigger_generation failed"
+                    elif not generation.wait(self.job_timeout):
+                        self.api.sd.stop_generation()
+                        error = f"generation still running after {self.job_timeout:.3g}s; stopped"
+                    timings["generation"] = round(time.monotonic() - mark, 3)
+                
+                export_started = None
+                if error is None:
+                    # Files of an earlier export of this view would otherwise be listed as this one's
+                    for name in _export_files(path):
+                        os.remove(os.path.join(self.output_dir, name))
+                    export_started = time.monotonic()
+                    export.start()
+                    exported = self.api.export.export_projection_textures(self.is_dilate, path)
+                    if not exported:
+                        error = "export_projection_textures failed"
+                
+                # The next view's camera moves while this view's export is written
+                if position + 1 < len(plan):
+                    setup_error, setup_seconds = self._send_setup(plan[position + 1][1], [])
+                
+                if exported:
+                    if not export.wait(self.export_timeout):
+                        error = f"export still running after {self.export_timeout:.3g}s"
+                    timings["export"] = round(time.monotonic() - export_started, 3)
+                    files = [os.path.join(self.output_dir, name) for name in _export_files(path)]
+                    if error is None and not files:
+                        error = f"export wrote no files to {path}"
+                
+                entries[view] = {
+                    "status": "failed" if error else "done",
+                    "error": error,
+                    "inputs": inputs,
+                    "inputs_hash": inputs_hash,
+                    "exported": exported,
+                    "path": path,
+                    "files": files,
+                    "finished": time.time(),
+                    "timings": timings,
+                }
+                save()
+                if on_view is not None:
+                    on_view(view, entries[view])
+        
+        save()
+        return self._manifest(entries, previous, started)
+    
+    def _poses(self, views):
+        """Pose of every view: the given one, or the camera's current pose (read in one batch)"""
+        with self.api.batch() as batch:
+            current = {view: (batch.projection.get_pos(view), batch.projection.get_rot(view))
+                       for view in views if view not in self.poses}
+        poses = []
+        for view in views:
+            if view in self.poses:
+                poses.append(self.poses[view])
+                continue
+            position, rotation = (future.result() for future in current[view])
+            if position is None or rotation is None:
+                raise ValueError(f"No projection camera {view}")
+            poses.append({
+                "index": view,
+                "position": [round(position[key], 5) for key in "xyz"],
+                "rotation": [round(rotation[key], 5) for key in "xyzw"],
+            })
+        return poses
+    
+    def _path(self, view):
+        """Base path a view is exported to"""
+        return os.path.join(self.output_dir, f"view_{view}{self.extension}")
+    
+    def _send_setup(self, pose, calls):
+        """Send calls plus the camera move to pose as one batch; returns (error, seconds)"""
+        started = time.monotonic()
+        camera = Job("", projection=pose).setup_calls()
+        calls = list(calls) + [call for call in camera if call[0] == "projection"]
+        error = _send_setup(*_record_setup(self.api, calls))
+        return error, time.monotonic() - started
+    
+    def _manifest(self, entries, previous, started):
+        views = {str(view): entry for view, entry in sorted(entries.items())}
+        # Views this run didn't touch keep their last entry
+        for view, entry in previous.items():
+            views.setdefault(view, entry)
+        counts = {"done": 0, "skipped": 0, "failed": 0}
+        for view in entries.values():
+            counts[view["status"]] += 1
+        return {
+            "version": 1,
+            "views": views,
+            "summary": dict(counts, elapsed=round(time.monotonic() - started, 3)),
+        }
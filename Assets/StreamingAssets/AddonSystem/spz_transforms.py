@@ -0,0 +1,333 @@
+"""
+StableProjectorz Transform Math (spz.transforms)
+
+NumPy-batched transform operations for add-ons. Everything works on whole
+arrays in the layouts the bulk getters return and the batch setters take:
+
+    positions   (n, 3) x, y, z                  models.get_positions
+    rotations   (n, 4) x, y, z, w quaternions   models.get_rotations
+    scales      (n, 3)                          models.get_scales
+    bounds      (n, 6) center xyz, size xyz     models.get_bounds_many
+
+Conventions follow Unity: quaternions are (x, y, z, w), angles are in
+degrees, and Euler angles apply Z, then X, then Y (Quaternion.Euler).
+
+Example:
+    from spz import transforms as tf
+    
+    ids = api.models.get_selected()
+    positions = api.models.get_positions(ids)
+    rotations = api.models.get_rotations(ids)
+    
+    spin = tf.euler_to_quat([0.0, 90.0, 0.0])
+    positions, rotations = tf.rotate_about_pivot(positions, rotations, positions.mean(axis=0), spin)
+    api.models.set_positions(ids, tf.snap(positions, 0.25))
+    api.models.set_rotations(ids, rotations)
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("spz.transforms requires NumPy (pip install numpy)")
+
+
+_AXES = {"x": 0, "y": 1, "z": 2}
+
+
+def _vectors(values, width):
+    """values as a float array whose last axis has width components"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1:] != (width,):
+        raise ValueError(f"Expected {width}-component vectors, got shape {values.shape}")
+    return values
+
+
+def _axis_index(axis):
+    if isinstance(axis, str):
+        return _AXES[axis.lower()]
+    return int(axis)
+
+
+def _result(values, like):
+    """Return float32 when the input was float32 (the bulk getters' dtype)"""
+    if getattr(like, "dtype", None) == np.float32:
+        return values.astype(np.float32)
+    return values
+
+
+# ============================================
+# Quaternions
+# ============================================
+
+def quat_identity(count=None):
+    """Identity rotation, or an (count, 4) array of them"""
+    identity = np.array([0.0, 0.0, 0.0, 1.0])
+    return identity if count is None else np.tile(identity, (count, 1))
+
+
+def quat_normalize(q):
+    """Unit-length quaternions (zero quaternions become the identity)"""
+    values = _vectors(q, 4)
+    length = np.linalg.norm(values, axis=-1, keepdims=True)
+    result = np.divide(values, length, out=np.broadcast_to(quat_identity(), values.shape).copy(),
+                       where=length > 1e-12)
+    return _result(result, q)
+
+
+def quat_conjugate(q):
+    """Inverse rotation of unit quaternions"""
+    return _result(_vectors(q, 4) * np.array([-1.0, -1.0, -1.0, 1.0]), q)
+
+
+def quat_multiply(a, b):
+    """Hamilton product a * b: the rotation b followed by a (broadcasts)"""
+    ax, ay, az, aw = np.moveaxis(_vectors(a, 4), -1, 0)
+    bx, by, bz, bw = np.moveaxis(_vectors(b, 4), -1, 0)
+    return _result(np.stack([
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ], axis=-1), b)
+
+
+def quat_rotate(q, v):
+    """Rotate vectors v by quaternions q (broadcasts)"""
+    rotation = _vectors(q, 4)
+    vectors = _vectors(v, 3)
+    u = rotation[..., :3]
+    w = rotation[..., 3:]
+    t = 2.0 * np.cross(u, vectors)
+    return _result(vectors + w * t + np.cross(u, t), v)
+
+
+def slerp(a, b, t):
+    """Spherical interpolation from a to b along the shortest arc
+    
+    Args:
+        a, b: Quaternions, (4,) or (n, 4)
+        t: Interpolation factor, a scalar or one per quaternion
+    """
+    a = quat_normalize(a).astype(np.float64)
+    b = quat_normalize(b).astype(np.float64)
+    t = np.asarray(t, dtype=np.float64)[..., None]
+    
+    dot = np.sum(a * b, axis=-1, keepdims=True)
+    b = np.where(dot < 0.0, -b, b)
+    dot = np.abs(dot)
+    
+    # Nearly parallel: fall back to a normalized lerp to avoid dividing by ~0
+    close = dot > 0.9995
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.where(close, 1.0, np.sin(theta))
+    weight_a = np.where(close, 1.0 - t, np.sin((1.0 - t) * theta) / sin_theta)
+    weight_b = np.where(close, t, np.sin(t * theta) / sin_theta)
+    return quat_normalize(weight_a * a + weight_b * b)
+
+
+def axis_angle_to_quat(axis, degrees):
+    """Rotation of `degrees` about `axis` (broadcasts)"""
+    axis = _vectors(axis, 3)
+    axis = axis / np.linalg.norm(axis, axis=-1, keepdims=True)
+    half = np.radians(np.asarray(degrees, dtype=np.float64))[..., None] / 2.0
+    return np.concatenate([axis * np.sin(half), np.cos(half)], axis=-1)
+
+
+def euler_to_quat(euler):
+    """Quaternions from Unity Euler angles in degrees (Z, then X, then Y)"""
+    half = np.radians(_vectors(euler, 3)) / 2.0
+    cx, cy, cz = np.moveaxis(np.cos(half), -1, 0)
+    sx, sy, sz = np.moveaxis(np.sin(half), -1, 0)
+    # q = qy * qx * qz
+    return _result(np.stack([
+        cy * sx * cz + sy * cx * sz,
+        sy * cx * cz - cy * sx * sz,
+        cy * cx * sz - sy * sx * cz,
+        cy * cx * cz + sy * sx * sz,
+    ], axis=-1), euler)
+
+
+def quat_to_euler(q):
+    """Unity Euler angles in degrees, each in [0, 360) like Transform.eulerAngles"""
+    x, y, z, w = np.moveaxis(quat_normalize(q).astype(np.float64), -1, 0)
+    
+    # Rotation matrix entries needed for R = Ry * Rx * Rz
+    r02 = 2.0 * (x * z + y * w)
+    r22 = 1.0 - 2.0 * (x * x + y * y)
+    r10 = 2.0 * (x * y + z * w)
+    r11 = 1.0 - 2.0 * (x * x + z * z)
+    r12 = 2.0 * (y * z - x * w)
+    r00 = 1.0 - 2.0 * (y * y + z * z)
+    r20 = 2.0 * (x * z - y * w)
+    
+    angle_x = np.arcsin(np.clip(-r12, -1.0, 1.0))
+    locked = np.abs(r12) > 0.999999  # gimbal lock: fold Z into Y
+    angle_y = np.where(locked, np.arctan2(-r20, r00), np.arctan2(r02, r22))
+    angle_z = np.where(locked, 0.0, np.arctan2(r10, r11))
+    return _result(np.mod(np.degrees(np.stack([angle_x, angle_y, angle_z], axis=-1)), 360.0), q)
+
+
+def look_rotation(forward, up=(0.0, 1.0, 0.0)):
+    """Quaternions that point +Z along forward with +Y towards up (Quaternion.LookRotation)"""
+    forward = _vectors(forward, 3)
+    forward = forward / np.linalg.norm(forward, axis=-1, keepdims=True)
+    right = np.cross(_vectors(up, 3), forward)
+    right = right / np.linalg.norm(right, axis=-1, keepdims=True)
+    up = np.cross(forward, right)
+    
+    # Columns of the rotation matrix are right, up, forward
+    m00, m10, m20 = np.moveaxis(right, -1, 0)
+    m01, m11, m21 = np.moveaxis(up, -1, 0)
+    m02, m12, m22 = np.moveaxis(forward, -1, 0)
+    trace = m00 + m11 + m22
+    w = np.sqrt(np.maximum(0.0, 1.0 + trace)) / 2.0
+    x = np.sqrt(np.maximum(0.0, 1.0 + m00 - m11 - m22)) / 2.0
+    y = np.sqrt(np.maximum(0.0, 1.0 - m00 + m11 - m22)) / 2.0
+    z = np.sqrt(np.maximum(0.0, 1.0 - m00 - m11 + m22)) / 2.0
+    x = np.copysign(x, m21 - m12)
+    y = np.copysign(y, m02 - m20)
+    z = np.copysign(z, m10 - m01)
+    return quat_normalize(np.stack([x, y, z, w], axis=-1))
+
+
+# ============================================
+# Layout
+# ============================================
+
+def union_bounds(bounds):
+    """Center and size of the box enclosing every (center, size) row of bounds"""
+    bounds = _vectors(bounds, 6).reshape(-1, 6)
+    bounds = bounds[~np.isnan(bounds).any(axis=1)]
+    if not len(bounds):
+        raise ValueError("No bounds to enclose")
+    low = (bounds[:, :3] - bounds[:, 3:] / 2.0).min(axis=0)
+    high = (bounds[:, :3] + bounds[:, 3:] / 2.0).max(axis=0)
+    return (low + high) / 2.0, high - low
+
+
+def translate(positions, offset):
+    """Move every position by offset"""
+    return _result(_vectors(positions, 3) + _vectors(offset, 3), positions)
+
+
+def rotate_about_pivot(positions, rotations, pivot, rotation):
+    """Rotate meshes as a group about a pivot point
+    
+    Args:
+        positions: (n, 3) positions
+        rotations: (n, 4) rotations
+        pivot: Point to rotate about
+        rotation: Quaternion to apply (or one per mesh)
+    
+    Returns:
+        (positions, rotations) after the rotation
+    """
+    pivot = _vectors(pivot, 3)
+    rotation = quat_normalize(rotation)
+    moved = pivot + quat_rotate(rotation, _vectors(positions, 3) - pivot)
+    turned = quat_normalize(quat_multiply(rotation, _vectors(rotations, 4)))
+    return _result(moved, positions), _result(turned, rotations)
+
+
+def scale_about_pivot(positions, scales, pivot, factor):
+    """Scale meshes as a group about a pivot point (factor: scalar or per axis)"""
+    pivot = _vectors(pivot, 3)
+    factor = np.asarray(factor, dtype=np.float64)
+    moved = pivot + (_vectors(positions, 3) - pivot) * factor
+    return _result(moved, positions), _result(_vectors(scales, 3) * factor, scales)
+
+
+def center(positions, at=(0.0, 0.0, 0.0), bounds=None):
+    """Move meshes as a group so their center lands on `at`
+    
+    The center is that of the enclosing box of bounds when given (as
+    models.get_bounds_many returns them), otherwise the centroid of the
+    positions.
+    """
+    values = _vectors(positions, 3)
+    current = union_bounds(bounds)[0] if bounds is not None else np.nanmean(values, axis=0)
+    return _result(values + (_vectors(at, 3) - current), positions)
+
+
+def align(positions, axis, mode="center", bounds=None, to=None):
+    """Line meshes up along one axis
+    
+    Args:
+        positions: (n, 3) positions
+        axis: "x", "y", "z" or 0-2
+        mode: "min", "center" or "max" - which side of each mesh to align.
+            With bounds, sides are those of each mesh's box; otherwise the
+            positions themselves are aligned.
+        bounds: Optional (n, 6) bounds of the same meshes
+        to: Coordinate to align to (default: the group's min, mean or max)
+    
+    Returns:
+        (n, 3) positions
+    """
+    index = _axis_index(axis)
+    values = _vectors(positions, 3)
+    if bounds is not None:
+        bounds = _vectors(bounds, 6).reshape(-1, 6)
+        centers = bounds[:, index]
+        half = bounds[:, 3 + index] / 2.0
+    else:
+        centers = values[:, index]
+        half = np.zeros(len(values))
+    
+    sides = {"min": centers - half, "center": centers, "max": centers + half}[mode]
+    if to is None:
+        to = {"min": np.nanmin, "center": np.nanmean, "max": np.nanmax}[mode](sides)
+    result = values.copy()
+    result[:, index] += to - sides
+    return _result(result, positions)
+
+
+def distribute(positions, axis, start=None, end=None, spacing=None):
+    """Space meshes evenly along one axis, keeping their current order
+    
+    Args:
+        positions: (n, 3) positions
+        axis: "x", "y", "z" or 0-2
+        start, end: First and last coordinate (default: current extremes)
+        spacing: Fixed distance between neighbours instead of end
+    
+    Returns:
+        (n, 3) positions
+    """
+    index = _axis_index(axis)
+    result = _vectors(positions, 3).copy()
+    coordinates = result[:, index].copy()
+    start = np.nanmin(coordinates) if start is None else start
+    if spacing is not None:
+        targets = start + spacing * np.arange(len(result))
+    else:
+        end = np.nanmax(coordinates) if end is None else end
+        targets = np.linspace(start, end, len(result))
+    
+    result[np.argsort(coordinates, kind="stable"), index] = targets
+    return _result(result, positions)
+
+
+def grid(count, columns, spacing, origin=(0.0, 0.0, 0.0), plane="xz"):
+    """(count, 3) positions laid out in rows of `columns` on a plane ("xz", "xy" or "yz")"""
+    spacing = np.broadcast_to(np.asarray(spacing, dtype=np.float64), (2,))
+    indices = np.arange(count)
+    result = np.tile(_vectors(origin, 3), (count, 1))
+    first, second = (_axis_index(axis) for axis in plane)
+    result[:, first] += (indices % columns) * spacing[0]
+    result[:, second] += (indices // columns) * spacing[1]
+    return result
+
+
+def snap(values, step, origin=0.0):
+    """Round values to the nearest multiple of step from origin (scalar or per component)"""
+    values = np.asarray(values)
+    step = np.asarray(step, dtype=np.float64)
+    origin = np.asarray(origin, dtype=np.float64)
+    return _result(origin + np.round((values - origin) / step) * step, values)
+
+
+def snap_rotations(rotations, degrees):
+    """Round rotations to the nearest multiple of `degrees` on each Euler axis"""
+    euler = quat_to_euler(rotations)
+    return _result(euler_to_quat(snap(euler, degrees)), rotations)
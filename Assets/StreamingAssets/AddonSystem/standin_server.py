@@ -0,0 +1,1020 @@
+#!/usr/bin/env python3
+"""
+Stand-in StableProjectorz host for developing and testing add-ons without Unity
+
+Speaks the same JSON-RPC protocol as Addon_SocketServer.cs (NDJSON or
+negotiated binary frames, JSON-RPC batches, shared-memory bulk arrays)
+against an in-memory scene of meshes and cameras, so spz clients can be
+exercised on Linux and macOS where StableProjectorz itself doesn't run.
+Only the scene, view and projection camera, workflow mode and ControlNet
+unit commands, generation and export status (with simulated generations
+and exports lasting work_time seconds; exports given a path write small
+PNGs there) and server-pushed events are simulated; other spz.cmd.* methods answer {"success": false} like an
+unknown command.
+
+Usage:
+    python standin_server.py [--port 5555] [--meshes 100] [--cameras 4] [--projections 6]
+
+From Python:
+    with StandInServer(port=0, mesh_count=1000) as server:
+        api = spz.SPZAPI(spz.SPZClient(port=server.port, shared_memory=16 << 20))
+"""
+
+import os
+import sys
+import math
+import mmap
+import time
+import zlib
+import struct
+import hashlib
+import socket
+import argparse
+import threading
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import spz
+
+
+# Same limits as FastPath_API.cs
+MAX_BATCH_SIZE = 1000
+MAX_REASONABLE_VALUE = 1e6
+MAX_SHARED_MEMORY = 1 << 30
+
+# Same as Addon_SocketServer.cs: how long a command may wait for the main
+# thread unless the request carries its own "timeout_ms"
+COMMAND_TIMEOUT_MS = 1000
+MAX_COMMAND_TIMEOUT_MS = 60000
+
+# Events clients can subscribe to, by the state attribute whose change fires them
+EVENT_SOURCES = {
+    "generating": ("generation_started", "generation_finished"),
+    "gen3d_in_progress": ("gen3d_started", "gen3d_finished"),
+    "project_operation_in_progress": ("project_operation_started", "project_operation_finished"),
+}
+EVENTS = tuple(name for names in EVENT_SOURCES.values() for name in names)
+
+# How often states are sampled for events, like once per Unity frame
+FRAME_TIME = 1.0 / 60.0
+
+# Workflow modes set_workflow_mode accepts (WorkflowRibbon_CurrMode)
+WORKFLOW_MODES = ("ProjectionsMasking", "Inpaint_Color", "Inpaint_NoColor", "TotalObject", "WhereEmpty", "AntiShade")
+
+
+def _is_valid_float(value):
+    """FastPath_API.IsValidFloat: finite and not absurdly large"""
+    return math.isfinite(value) and abs(value) <= MAX_REASONABLE_VALUE
+
+
+def _clamp(value, low, high):
+    return min(max(value, low), high)
+
+
+def _error(code, message, request_id):
+    return {"jsonrpc": "2.0", "error": {"code": code, "message": message},
+            "id": str(request_id) if request_id is not None else None}
+
+
+def _write_png(path, size, seed):
+    """Write a size x size RGB gradient whose colors depend on seed (a stand-in texture)"""
+    r, g, b = hashlib.sha256(seed.encode("utf-8")).digest()[:3]
+    rows = b"".join(
+        b"\x00" + bytes(channel for x in range(size)
+                        for channel in (r ^ x * 255 // size, g ^ y * 255 // size, b))
+        for y in range(size))
+    
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def _vectors(values, keys, default):
+    """Vectors from a packed float array or a JSON list of {"x", ...} dicts"""
+    if isinstance(values, array):
+        width = len(keys)
+        return [list(values[i:i + width]) for i in range(0, len(values) - width + 1, width)]
+    return [[float(item.get(key, default)) for key in keys] for item in values if isinstance(item, dict)]
+
+
+class _Mesh:
+    """Transform and state of one simulated mesh"""
+    
+    def __init__(self, mesh_id):
+        self.name = f"Mesh_{mesh_id}"
+        self.position = [0.0, 0.0, 0.0]
+        self.rotation = [0.0, 0.0, 0.0, 1.0]
+        self.scale = [1.0, 1.0, 1.0]
+        self.visible = True
+        self.selected = False
+
+
+class _Camera:
+    """Transform of one simulated view or projection camera"""
+    
+    def __init__(self, index):
+        self.position = [0.0, 1.0, -5.0 - index]
+        self.rotation = [0.0, 0.0, 0.0, 1.0]
+        self.fov = 60.0
+
+
+class _ControlNetUnit:
+    """Settings of one simulated ControlNet unit"""
+    
+    def __init__(self):
+        self.enabled = False
+        self.weight = 1.0
+        self.model = "None"
+
+
+class _AttachedMemory:
+    """A client's shared-memory file, mapped with "spz.sys.shm_attach"
+    
+    read() has the signature spz._unpack_payload expects, so "$shm"
+    parameters resolve the same way they do on the client.
+    """
+    
+    def __init__(self, path, size):
+        with open(path, "r+b") as f:
+            self._mmap = mmap.mmap(f.fileno(), size)
+        self.size = size
+    
+    def _check(self, offset, nbytes):
+        if offset < 0 or offset + nbytes > self.size:
+            raise ValueError("Packed array out of bounds")
+    
+    def read(self, offset, count, typecode):
+        values = array(typecode)
+        self._check(offset, count * values.itemsize)
+        values.frombytes(self._mmap[offset:offset + count * values.itemsize])
+        return values
+    
+    def write(self, offset, values):
+        data = values.tobytes()
+        self._check(offset, len(data))
+        self._mmap[offset:offset + len(data)] = data
+    
+    def close(self):
+        self._mmap.close()
+
+
+class _Connection:
+    """Per-client state: wire format, shared memory, subscribed events and a write lock"""
+    
+    def __init__(self, sock):
+        self.sock = sock
+        self.binary = False
+        self.shared = None
+        self.events = frozenset()
+        self.write_lock = threading.Lock()
+
+
+class _Message:
+    """Packed data travelling with one message (see PackedArrays in Addon_SocketServer.cs)"""
+    
+    def __init__(self, payload, shared, binary):
+        self.payload = payload
+        self.shared = shared
+        self.output = bytearray() if binary else None
+
+
+class StandInServer:
+    """In-process stand-in for the StableProjectorz socket server
+    
+    Every connection is served on its own thread; commands run one at a time
+    under a lock, like Unity running them on its main thread.
+    """
+    
+    def __init__(self, host="127.0.0.1", port=5555, mesh_count=100, camera_count=4, projection_count=6,
+                 controlnet_units=3):
+        self.host = host
+        self.port = port
+        self.meshes = {mesh_id: _Mesh(mesh_id) for mesh_id in range(1, mesh_count + 1)}
+        self.cameras = [_Camera(index) for index in range(camera_count)]
+        self.projection_cameras = [_Camera(index) for index in range(projection_count)]
+        self.controlnet_units = [_ControlNetUnit() for _ in range(controlnet_units)]
+        self.workflow_mode = "ProjectionsMasking"
+        self.positive_prompt = ""
+        self.negative_prompt = ""
+        
+        # What "spz.sys.ping" reports (set False to simulate Unity still starting up)
+        self.ready = True
+        
+        # Seconds every command takes, to simulate a busy main thread
+        self.command_latency = 0.0
+        
+        # Work in progress; events fire when these change (set them to simulate work)
+        self.generating = False
+        self.gen3d_in_progress = False
+        self.project_operation_in_progress = False
+        
+        # Seconds a triggered texture or 3D generation (or an export) runs
+        self.work_time = 0.5
+        
+        # Finished texture generations, and the size of the PNGs exports write
+        self.generations = 0
+        self.texture_size = 64
+        self._texture_seed = ""
+        
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._event_states = {name: False for name in EVENT_SOURCES}
+        self._work = {}
+        self._listener = None
+        self._running = False
+        self._commands = {
+            name[len("cmd_"):]: getattr(self, name) for name in dir(self) if name.startswith("cmd_")
+        }
+    
+    # ============================================
+    # Lifecycle
+    # ============================================
+    
+    def start(self):
+        """Start listening on a background thread; port 0 picks a free port"""
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((self.host, self.port))
+        self._listener.listen(16)
+        self.port = self._listener.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        threading.Thread(target=self._event_loop, daemon=True).start()
+        return self
+    
+    def stop(self):
+        """Stop accepting connections"""
+        self._running = False
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def _accept_loop(self):
+        while self._running:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                break
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+    
+    def _event_loop(self):
+        """Sample the event states every frame and push the ones that changed"""
+        while self._running:
+            time.sleep(FRAME_TIME)
+            for name, (started, finished) in EVENT_SOURCES.items():
+                state = bool(getattr(self, name))
+                if state == self._event_states[name]:
+                    continue
+                self._event_states[name] = state
+                self.publish(started if state else finished)
+    
+    def publish(self, event):
+        """Push an event to every connection subscribed to it"""
+        message = {"jsonrpc": "2.0", "method": "spz.event",
+                   "params": {"event": event, "time": time.monotonic()}}
+        with self._lock:
+            subscribers = [c for c in self._subscribers if event in c.events]
+        for connection in subscribers:
+            try:
+                self._send(connection, message)
+            except OSError:
+                pass
+    
+    # ============================================
+    # Wire Protocol
+    # ============================================
+    
+    def _serve(self, sock):
+        """Read messages from one client until it disconnects"""
+        connection = _Connection(sock)
+        reader = spz._MessageReader(sock)
+        try:
+            while True:
+                if connection.binary:
+                    frame = reader.read_frame()
+                    if frame is None:
+                        break
+                    header, payload = frame
+                else:
+                    header = reader.read_message()
+                    if header is None:
+                        break
+                    if not header.strip():
+                        continue
+                    payload = b""
+                
+                try:
+                    message = spz._json_loads(header)
+                except ValueError:
+                    self._send(connection, _error(-32700, "Parse error", None))
+                    continue
+                
+                method = message.get("method") if isinstance(message, dict) else None
+                if method == "spz.sys.handshake":
+                    self._handshake(connection, message)
+                    continue
+                if method == "spz.sys.shm_attach":
+                    self._attach_shared_memory(connection, message)
+                    continue
+                if method == "spz.sys.subscribe":
+                    self._subscribe(connection, message)
+                    continue
+                if method == "spz.sys.ping":
+                    self._send(connection, {"jsonrpc": "2.0", "result": {"success": True, "ready": self.ready},
+                                            "id": str(message.get("id"))})
+                    continue
+                
+                packed = _Message(payload, connection.shared, connection.binary)
+                received = time.monotonic()
+                if isinstance(message, list):
+                    if not message:
+                        response = _error(-32600, "Invalid Request", None)
+                    else:
+                        response = [r for r in (self._execute(item, packed, received) for item in message)
+                                    if r is not None]
+                else:
+                    response = self._execute(message, packed, received)
+                if response is not None and response != []:
+                    self._send(connection, response, packed.output)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._subscribers.discard(connection)
+            sock.close()
+            if connection.shared is not None:
+                connection.shared.close()
+    
+    def _send(self, connection, response, output=None):
+        """Write one response in the connection's wire format"""
+        header = spz._json_dumps(response)
+        if connection.binary:
+            output = output or b""
+            data = spz._FRAME_PREFIX.pack(len(header), len(output)) + header + output
+        else:
+            data = header + b"\n"
+        with connection.write_lock:
+            connection.sock.sendall(data)
+    
+    def _handshake(self, connection, request):
+        protocols = (request.get("params") or {}).get("protocols") or []
+        binary = "binary" in protocols
+        self._send(connection, {"jsonrpc": "2.0",
+                                "result": {"success": True, "protocol": "binary" if binary else "ndjson",
+                                           "features": ["notifications", "events"]},
+                                "id": str(request.get("id"))})
+        connection.binary = binary
+    
+    def _subscribe(self, connection, request):
+        events = (request.get("params") or {}).get("events") or []
+        unknown = [name for name in events if name not in EVENTS]
+        if unknown:
+            self._send(connection, _error(-32602, f"Unknown event: {unknown[0]}", request.get("id")))
+            return
+        with self._lock:
+            connection.events = frozenset(events)
+            if events:
+                self._subscribers.add(connection)
+            else:
+                self._subscribers.discard(connection)
+        self._send(connection, {"jsonrpc": "2.0", "result": {"success": True, "events": sorted(connection.events)},
+                                "id": str(request.get("id"))})
+    
+    def _attach_shared_memory(self, connection, request):
+        params = request.get("params") or {}
+        path, size = params.get("path"), int(params.get("size") or 0)
+        if connection.shared is not None:
+            self._send(connection, _error(-32602, "Shared memory already attached", request.get("id")))
+            return
+        if not path or size <= 0 or size > MAX_SHARED_MEMORY:
+            self._send(connection, _error(-32602, "Invalid params", request.get("id")))
+            return
+        try:
+            connection.shared = _AttachedMemory(path, size)
+        except (OSError, ValueError) as e:
+            self._send(connection, _error(-32603, f"Could not map shared memory: {e}", request.get("id")))
+            return
+        self._send(connection, {"jsonrpc": "2.0", "result": {"success": True, "size": size},
+                                "id": str(request.get("id"))})
+    
+    def _execute(self, request, packed, received):
+        """Run one request; returns its response
+        
+        Notifications (no id) get no response, except for a
+        "spz.sys.notification_failed" message if they failed.
+        
+        Like Unity, a command that couldn't start within its timeout
+        (counted from when the message was received) is not run at all.
+        """
+        if not isinstance(request, dict) or not request.get("method"):
+            return _error(-32600, "Invalid Request", request.get("id") if isinstance(request, dict) else None)
+        method = request["method"]
+        request_id = request.get("id")
+        
+        try:
+            params = dict(request.get("params") or {})
+            out = params.pop("out", None)
+            params = spz._unpack_payload(params, packed.payload, packed.shared)
+            params["out"] = out
+            
+            if method == "spz.sys.sync":
+                # Commands run in arrival order, so everything sent earlier has run
+                response = {"jsonrpc": "2.0", "result": {"success": True}, "id": str(request_id)}
+            elif not method.startswith("spz.cmd."):
+                response = _error(-32601, f"Method not found: {method}", request_id)
+            else:
+                handler = self._commands.get(method[len("spz.cmd."):])
+                timeout_ms = request.get("timeout_ms")
+                if not isinstance(timeout_ms, (int, float)):
+                    timeout_ms = COMMAND_TIMEOUT_MS
+                timeout = _clamp(timeout_ms, 1, MAX_COMMAND_TIMEOUT_MS) / 1000.0
+                with self._lock:
+                    if self.command_latency:
+                        time.sleep(self.command_latency)
+                    if time.monotonic() - received > timeout:
+                        response = _error(-32001, "Command execution timeout", request_id)
+                    else:
+                        if handler is None:
+                            result = {"success": False, "error": f"Unknown command: {method}"}
+                        else:
+                            result = handler(params, packed)
+                        response = {"jsonrpc": "2.0", "result": result, "id": str(request_id)}
+        except Exception as e:
+            response = _error(-32603, f"Internal error: {e}", request_id)
+        
+        if "id" in request:
+            return response
+        return self._notification_failure(method, response)
+    
+    @staticmethod
+    def _notification_failure(method, response):
+        """Addon_SocketServer.NotificationFailure: the message sent for a failed notification"""
+        error = response.get("error", {}).get("message")
+        result = response.get("result")
+        if error is None and isinstance(result, dict) and result.get("success") is False:
+            error = result.get("error", "Command failed")
+        if error is None:
+            return None
+        return {"jsonrpc": "2.0", "method": "spz.sys.notification_failed",
+                "params": {"method": method, "error": error}}
+    
+    def _write_packed(self, values, typecode, out, packed):
+        """Store a bulk result in shared memory or the reply payload (None: send as JSON)"""
+        values = array(typecode, values)
+        dtype = spz._DTYPES[typecode]
+        if isinstance(out, dict) and "$shm" in out and packed.shared is not None:
+            offset, count, out_dtype = out["$shm"]
+            if out_dtype != dtype or count < len(values):
+                raise ValueError(f"Expected a shared {dtype} array of at least {len(values)} elements")
+            packed.shared.write(offset, values)
+            return {"$shm": [offset, len(values), dtype]}
+        if packed.output is not None:
+            reference = {"$" + dtype: [len(packed.output), len(values)]}
+            packed.output += values.tobytes()
+            return reference
+        return None
+    
+    # ============================================
+    # Commands (spz.cmd.*)
+    # ============================================
+    
+    def _camera(self, params):
+        index = int(params.get("camera_index", 0))
+        return self.cameras[index] if 0 <= index < len(self.cameras) else None
+    
+    def cmd_set_camera_pos(self, params, packed):
+        camera = self._camera(params)
+        xyz = [float(params.get(key, 0.0)) for key in "xyz"]
+        if camera is None or not all(map(_is_valid_float, xyz)):
+            return {"success": False}
+        camera.position = [_clamp(v, -1000.0, 1000.0) for v in xyz]
+        return {"success": True}
+    
+    def cmd_set_camera_rot(self, params, packed):
+        camera = self._camera(params)
+        xyzw = [float(params.get(key, 1.0 if key == "w" else 0.0)) for key in "xyzw"]
+        if camera is None or not all(map(_is_valid_float, xyzw)):
+            return {"success": False}
+        camera.rotation = xyzw
+        return {"success": True}
+    
+    def cmd_set_camera_pose(self, params, packed):
+        # Position, rotation and fov are each optional; missing ones are left as they are
+        camera = self._camera(params)
+        xyz = [float(params.get(key, 0.0)) for key in "xyz"] if any(k in params for k in "xyz") else None
+        quaternion = ("qx", "qy", "qz", "qw")
+        xyzw = ([float(params.get(key, 1.0 if key == "qw" else 0.0)) for key in quaternion]
+                if any(k in params for k in quaternion) else None)
+        fov = params.get("fov")
+        if camera is None or not all(map(_is_valid_float, (xyz or []) + (xyzw or []))):
+            return {"success": False}
+        if fov is not None and (not _is_valid_float(float(fov)) or not 1.0 <= float(fov) <= 179.0):
+            return {"success": False}
+        if xyz is not None:
+            camera.position = [_clamp(v, -1000.0, 1000.0) for v in xyz]
+        if xyzw is not None:
+            camera.rotation = xyzw
+        if fov is not None:
+            camera.fov = float(fov)
+        return {"success": True}
+    
+    def cmd_set_camera_fov(self, params, packed):
+        camera = self._camera(params)
+        fov = float(params.get("fov", 60.0))
+        if camera is None or not _is_valid_float(fov) or not 1.0 <= fov <= 179.0:
+            return {"success": False}
+        camera.fov = fov
+        return {"success": True}
+    
+    def cmd_get_camera_pos(self, params, packed):
+        camera = self._camera(params)
+        if camera is None:
+            return {"success": False}
+        return dict(zip("xyz", camera.position), success=True)
+    
+    def cmd_get_all_camera_positions(self, params, packed):
+        return {"success": True, "positions": [dict(zip("xyz", c.position)) for c in self.cameras]}
+    
+    def cmd_get_all_camera_rotations(self, params, packed):
+        return {"success": True, "rotations": [dict(zip("xyzw", c.rotation)) for c in self.cameras]}
+    
+    def cmd_get_all_camera_fovs(self, params, packed):
+        return {"success": True, "fovs": [c.fov for c in self.cameras]}
+    
+    def _projection_camera(self, params):
+        index = int(params.get("camera_index", 0))
+        return self.projection_cameras[index] if 0 <= index < len(self.projection_cameras) else None
+    
+    def cmd_get_projection_camera_count(self, params, packed):
+        return {"success": True, "count": len(self.projection_cameras)}
+    
+    def cmd_get_projection_camera_pos(self, params, packed):
+        camera = self._projection_camera(params)
+        if camera is None:
+            return {"success": False}
+        return dict(zip("xyz", camera.position), success=True)
+    
+    def cmd_get_projection_camera_rot(self, params, packed):
+        camera = self._projection_camera(params)
+        if camera is None:
+            return {"success": False}
+        return dict(zip("xyzw", camera.rotation), success=True)
+    
+    def cmd_set_projection_camera_pos(self, params, packed):
+        camera = self._projection_camera(params)
+        xyz = [float(params.get(key, 0.0)) for key in "xyz"]
+        if camera is None or not all(map(_is_valid_float, xyz)):
+            return {"success": False}
+        camera.position = [_clamp(v, -1000.0, 1000.0) for v in xyz]
+        return {"success": True}
+    
+    def cmd_set_projection_camera_rot(self, params, packed):
+        camera = self._projection_camera(params)
+        xyzw = [float(params.get(key, 1.0 if key == "w" else 0.0)) for key in "xyzw"]
+        if camera is None or not all(map(_is_valid_float, xyzw)):
+            return {"success": False}
+        camera.rotation = xyzw
+        return {"success": True}
+    
+    def cmd_get_workflow_mode(self, params, packed):
+        return {"success": True, "mode": self.workflow_mode}
+    
+    def cmd_set_workflow_mode(self, params, packed):
+        mode = str(params.get("mode", ""))
+        if mode not in WORKFLOW_MODES:
+            return {"success": False}
+        self.workflow_mode = mode
+        return {"success": True}
+    
+    def _controlnet_unit(self, params):
+        index = int(params.get("unit_index", 0))
+        return self.controlnet_units[index] if 0 <= index < len(self.controlnet_units) else None
+    
+    def cmd_get_controlnet_unit_count(self, params, packed):
+        return {"success": True, "count": len(self.controlnet_units)}
+    
+    def cmd_get_active_controlnet_unit_count(self, params, packed):
+        return {"success": True, "count": sum(unit.enabled for unit in self.controlnet_units)}
+    
+    def cmd_set_controlnet_unit_enabled(self, params, packed):
+        unit = self._controlnet_unit(params)
+        if unit is None:
+            return {"success": False}
+        unit.enabled = bool(params.get("enabled", False))
+        return {"success": True}
+    
+    def cmd_get_controlnet_unit_enabled(self, params, packed):
+        unit = self._controlnet_unit(params)
+        if unit is None:
+            return {"success": False}
+        return {"success": True, "enabled": unit.enabled}
+    
+    def cmd_set_controlnet_unit_weight(self, params, packed):
+        unit = self._controlnet_unit(params)
+        weight = float(params.get("weight", 1.0))
+        if unit is None or not _is_valid_float(weight):
+            return {"success": False}
+        unit.weight = _clamp(weight, 0.0, 2.0)
+        return {"success": True}
+    
+    def cmd_get_controlnet_unit_weight(self, params, packed):
+        unit = self._controlnet_unit(params)
+        if unit is None:
+            return {"success": False}
+        return {"success": True, "weight": unit.weight}
+    
+    def cmd_get_controlnet_unit_model(self, params, packed):
+        unit = self._controlnet_unit(params)
+        if unit is None:
+            return {"success": False}
+        return {"success": True, "model": unit.model}
+    
+    def _mesh(self, params):
+        return self.meshes.get(int(params.get("mesh_id", 0)))
+    
+    def cmd_select_mesh(self, params, packed):
+        mesh = self._mesh(params)
+        if mesh is None:
+            return {"success": False}
+        mesh.selected = True
+        return {"success": True}
+    
+    def cmd_deselect_mesh(self, params, packed):
+        mesh = self._mesh(params)
+        if mesh is None:
+            return {"success": False}
+        mesh.selected = False
+        return {"success": True}
+    
+    def cmd_select_all_meshes(self, params, packed):
+        for mesh in self.meshes.values():
+            mesh.selected = True
+        return {"success": True}
+    
+    def cmd_deselect_all_meshes(self, params, packed):
+        for mesh in self.meshes.values():
+            mesh.selected = False
+        return {"success": True}
+    
+    def _set_selected(self, params, selected):
+        mesh_ids = params.get("mesh_ids")
+        if mesh_ids is None:
+            return {"success": False}
+        meshes = [self.meshes.get(int(mesh_id)) for mesh_id in mesh_ids]
+        for mesh in meshes:
+            if mesh is not None:
+                mesh.selected = selected
+        return {"success": True, "count": sum(mesh is not None for mesh in meshes)}
+    
+    def cmd_select_meshes(self, params, packed):
+        return self._set_selected(params, True)
+    
+    def cmd_deselect_meshes(self, params, packed):
+        return self._set_selected(params, False)
+    
+    def cmd_get_selected_meshes(self, params, packed):
+        return {"success": True, "mesh_ids": [i for i, mesh in self.meshes.items() if mesh.selected]}
+    
+    def cmd_get_total_mesh_count(self, params, packed):
+        return {"success": True, "count": len(self.meshes)}
+    
+    def cmd_get_selected_mesh_count(self, params, packed):
+        return {"success": True, "count": sum(mesh.selected for mesh in self.meshes.values())}
+    
+    def cmd_get_all_mesh_ids(self, params, packed):
+        return {"success": True, "mesh_ids": list(self.meshes)}
+    
+    def _set_transform(self, params, attribute, keys, default, fix):
+        mesh = self._mesh(params)
+        values = [float(params.get(key, default)) for key in keys]
+        if mesh is None or not all(map(_is_valid_float, values)):
+            return {"success": False}
+        values = fix(values)
+        if values is None:
+            return {"success": False}
+        setattr(mesh, attribute, values)
+        return {"success": True}
+    
+    def cmd_set_mesh_pos(self, params, packed):
+        return self._set_transform(params, "position", "xyz", 0.0, self._fix_position)
+    
+    def cmd_set_mesh_rot(self, params, packed):
+        mesh = self._mesh(params)
+        values = [float(params.get(key, 1.0 if key == "w" else 0.0)) for key in "xyzw"]
+        if mesh is None or not all(map(_is_valid_float, values)):
+            return {"success": False}
+        rotation = self._fix_rotation(values)
+        if rotation is None:
+            return {"success": False}
+        mesh.rotation = rotation
+        return {"success": True}
+    
+    def cmd_set_mesh_scale(self, params, packed):
+        return self._set_transform(params, "scale", "xyz", 1.0, self._fix_scale)
+    
+    def cmd_set_mesh_visibility(self, params, packed):
+        mesh = self._mesh(params)
+        if mesh is None:
+            return {"success": False}
+        mesh.visible = bool(params.get("visible", True))
+        return {"success": True}
+    
+    def cmd_set_mesh_visibilities(self, params, packed):
+        mesh_ids = params.get("mesh_ids")
+        visible = params.get("visible")
+        if mesh_ids is None or visible is None:
+            return {"success": False}
+        flags = [bool(visible)] if isinstance(visible, bool) else [bool(flag) for flag in visible]
+        if not flags or len(flags) not in (1, len(mesh_ids)):
+            return {"success": True, "count": 0}
+        count = 0
+        for i, mesh_id in enumerate(mesh_ids):
+            mesh = self.meshes.get(int(mesh_id))
+            if mesh is not None:
+                mesh.visible = flags[0] if len(flags) == 1 else flags[i]
+                count += 1
+        return {"success": True, "count": count}
+    
+    def cmd_set_visibility_by_selection(self, params, packed):
+        flags = {True: params.get("selected"), False: params.get("unselected")}
+        count = 0
+        for mesh in self.meshes.values():
+            visible = flags[mesh.selected]
+            if isinstance(visible, bool):
+                mesh.visible = visible
+                count += 1
+        return {"success": True, "count": count}
+    
+    def _get_transform(self, params, attribute, keys):
+        mesh = self._mesh(params)
+        if mesh is None:
+            return {"success": False}
+        return dict(zip(keys, getattr(mesh, attribute)), success=True)
+    
+    def cmd_get_mesh_pos(self, params, packed):
+        return self._get_transform(params, "position", "xyz")
+    
+    def cmd_get_mesh_rot(self, params, packed):
+        return self._get_transform(params, "rotation", "xyzw")
+    
+    def cmd_get_mesh_scale(self, params, packed):
+        return self._get_transform(params, "scale", "xyz")
+    
+    def cmd_get_mesh_bounds(self, params, packed):
+        mesh = self._mesh(params)
+        if mesh is None:
+            return {"success": False}
+        center, size = mesh.position, mesh.scale
+        return {"success": True,
+                "center_x": center[0], "center_y": center[1], "center_z": center[2],
+                "size_x": size[0], "size_y": size[1], "size_z": size[2]}
+    
+    def cmd_get_selected_meshes_bounds(self, params, packed):
+        boxes = [(mesh.position, mesh.scale) for mesh in self.meshes.values() if mesh.selected]
+        if not boxes:
+            return {"success": False}
+        low = [min(center[i] - size[i] / 2 for center, size in boxes) for i in range(3)]
+        high = [max(center[i] + size[i] / 2 for center, size in boxes) for i in range(3)]
+        return {"success": True,
+                "center_x": (low[0] + high[0]) / 2, "center_y": (low[1] + high[1]) / 2,
+                "center_z": (low[2] + high[2]) / 2,
+                "size_x": high[0] - low[0], "size_y": high[1] - low[1], "size_z": high[2] - low[2]}
+    
+    def cmd_get_mesh_visibility(self, params, packed):
+        mesh = self._mesh(params)
+        return {"success": True, "visible": mesh.visible} if mesh else {"success": False}
+    
+    def cmd_get_mesh_name(self, params, packed):
+        mesh = self._mesh(params)
+        return {"success": True, "name": mesh.name} if mesh else {"success": False}
+    
+    @staticmethod
+    def _fix_position(values):
+        return [_clamp(v, -1000.0, 1000.0) for v in values]
+    
+    @staticmethod
+    def _fix_rotation(values):
+        if all(abs(v) < 0.01 for v in values):
+            return None
+        length = math.sqrt(sum(v * v for v in values))
+        return [v / length for v in values]
+    
+    @staticmethod
+    def _fix_scale(values):
+        return [_clamp(v, 0.001, 100.0) for v in values]
+    
+    def _set_many(self, params, name, attribute, keys, default, fix):
+        """Batch setter shared by set_mesh_positions/rotations/scales"""
+        mesh_ids = params.get("mesh_ids")
+        values = params.get(name)
+        if mesh_ids is None or values is None:
+            return {"success": False}
+        vectors = _vectors(values, keys, default)
+        if len(mesh_ids) != len(vectors) or not mesh_ids:
+            return {"success": True, "count": 0}
+        
+        count = 0
+        for mesh_id, vector in zip(list(mesh_ids)[:MAX_BATCH_SIZE], vectors[:MAX_BATCH_SIZE]):
+            mesh = self.meshes.get(int(mesh_id))
+            if mesh is None or not all(map(_is_valid_float, vector)):
+                continue
+            vector = fix(vector)
+            if vector is None:
+                continue
+            setattr(mesh, attribute, vector)
+            count += 1
+        return {"success": True, "count": count}
+    
+    def cmd_set_mesh_positions(self, params, packed):
+        return self._set_many(params, "positions", "position", "xyz", 0.0, self._fix_position)
+    
+    def cmd_set_mesh_rotations(self, params, packed):
+        return self._set_many(params, "rotations", "rotation", "xyzw", 0.0, self._fix_rotation)
+    
+    def cmd_set_mesh_scales(self, params, packed):
+        return self._set_many(params, "scales", "scale", "xyz", 1.0, self._fix_scale)
+    
+    def _get_many(self, params, packed, name, keys, values_of):
+        """Batch getter shared by get_mesh_positions/rotations/scales/bounds_many"""
+        mesh_ids = params.get("mesh_ids")
+        if mesh_ids is None:
+            return {"success": False}
+        missing = [float("nan")] * len(keys)
+        values = []
+        for mesh_id in mesh_ids:
+            mesh = self.meshes.get(int(mesh_id))
+            values.extend(values_of(mesh) if mesh is not None else missing)
+        
+        vectors = self._write_packed(values, "f", params.get("out"), packed)
+        if vectors is None:
+            width = len(keys)
+            vectors = [None if values[i] != values[i] else dict(zip(keys, values[i:i + width]))
+                       for i in range(0, len(values), width)]
+        return {"success": True, name: vectors}
+    
+    def cmd_get_mesh_positions(self, params, packed):
+        return self._get_many(params, packed, "positions", "xyz", lambda mesh: mesh.position)
+    
+    def cmd_get_mesh_rotations(self, params, packed):
+        return self._get_many(params, packed, "rotations", "xyzw", lambda mesh: mesh.rotation)
+    
+    def cmd_get_mesh_scales(self, params, packed):
+        return self._get_many(params, packed, "scales", "xyz", lambda mesh: mesh.scale)
+    
+    def cmd_get_mesh_bounds_many(self, params, packed):
+        keys = ("center_x", "center_y", "center_z", "size_x", "size_y", "size_z")
+        return self._get_many(params, packed, "bounds", keys, lambda mesh: mesh.position + mesh.scale)
+    
+    def cmd_get_mesh_visibilities(self, params, packed):
+        mesh_ids = params.get("mesh_ids")
+        if mesh_ids is None:
+            return {"success": False}
+        meshes = [self.meshes.get(int(mesh_id)) for mesh_id in mesh_ids]
+        flags = [255 if mesh is None else int(mesh.visible) for mesh in meshes]
+        visible = self._write_packed(flags, "B", None, packed)
+        if visible is None:
+            visible = [None if mesh is None else mesh.visible for mesh in meshes]
+        return {"success": True, "visible": visible}
+    
+    def cmd_get_mesh_names(self, params, packed):
+        mesh_ids = params.get("mesh_ids")
+        if mesh_ids is None:
+            return {"success": False}
+        meshes = [self.meshes.get(int(mesh_id)) for mesh_id in mesh_ids]
+        return {"success": True, "names": [None if mesh is None else mesh.name for mesh in meshes]}
+    
+    def cmd_get_scene_snapshot(self, params, packed):
+        meshes = list(self.meshes.items())
+        columns = {
+            "mesh_ids": ("H", [mesh_id for mesh_id, _ in meshes]),
+            "positions": ("f", [v for _, mesh in meshes for v in mesh.position]),
+            "rotations": ("f", [v for _, mesh in meshes for v in mesh.rotation]),
+            "scales": ("f", [v for _, mesh in meshes for v in mesh.scale]),
+            # Same stand-in bounds as get_mesh_bounds: centered on the mesh, scale-sized
+            "bounds": ("f", [v for _, mesh in meshes for v in mesh.position + mesh.scale]),
+            "visible": ("B", [int(mesh.visible) for _, mesh in meshes]),
+            "selected": ("B", [int(mesh.selected) for _, mesh in meshes]),
+        }
+        result = {"success": True, "count": len(meshes), "names": [mesh.name for _, mesh in meshes]}
+        for name, (typecode, values) in columns.items():
+            reference = self._write_packed(values, typecode, None, packed)
+            result[name] = values if reference is None else reference
+        return result
+    
+    def cmd_get_positive_prompt(self, params, packed):
+        return {"success": True, "prompt": self.positive_prompt}
+    
+    def cmd_set_positive_prompt(self, params, packed):
+        self.positive_prompt = str(params.get("prompt", ""))
+        return {"success": True}
+    
+    def cmd_get_negative_prompt(self, params, packed):
+        return {"success": True, "prompt": self.negative_prompt}
+    
+    def cmd_set_negative_prompt(self, params, packed):
+        self.negative_prompt = str(params.get("prompt", ""))
+        return {"success": True}
+    
+    def _start_work(self, name, then=None):
+        """Simulate work that keeps state `name` set for work_time seconds, then calls then()"""
+        if getattr(self, name):
+            return {"success": False, "error": "Already in progress"}
+        setattr(self, name, True)
+        token = self._work[name] = object()
+        timer = threading.Timer(self.work_time, self._finish_work, (name, token, then))
+        timer.daemon = True
+        timer.start()
+        return {"success": True}
+    
+    def _finish_work(self, name, token, then):
+        # Work that was stopped (and maybe restarted) since is left alone
+        with self._lock:
+            if self._work.get(name) is token:
+                if then is not None:
+                    then()
+                setattr(self, name, False)
+    
+    def _generated(self):
+        # The "texture" depends on the prompts, settings and poses it was generated with
+        self.generations += 1
+        self._texture_seed = repr((self.positive_prompt, self.negative_prompt, self.workflow_mode,
+                                   [vars(unit) for unit in self.controlnet_units],
+                                   [(c.position, c.rotation) for c in self.projection_cameras], self.generations))
+    
+    def _export(self, params, suffixes):
+        """Simulate an export; with a "path" the textures are written there when it finishes"""
+        path = params.get("path")
+        if not path:
+            return self._start_work("project_operation_in_progress")
+        if not os.path.isabs(path) or not os.path.isdir(os.path.dirname(path)):
+            return {"success": False}
+        stem, extension = os.path.splitext(path)
+        def write():
+            for suffix in suffixes:
+                _write_png(stem + suffix + extension, self.texture_size, self._texture_seed + suffix)
+        return self._start_work("project_operation_in_progress", then=write)
+    
+    def cmd_trigger_texture_generation(self, params, packed):
+        return self._start_work("generating", then=self._generated)
+    
+    def cmd_stop_generation(self, params, packed):
+        self._work.pop("generating", None)
+        self.generating = False
+        return {"success": True}
+    
+    def cmd_is_generating(self, params, packed):
+        return {"success": True, "generating": self.generating}
+    
+    def cmd_trigger_3d_generation(self, params, packed):
+        return self._start_work("gen3d_in_progress")
+    
+    def cmd_is_3d_generation_in_progress(self, params, packed):
+        return {"success": True, "in_progress": self.gen3d_in_progress}
+    
+    def cmd_is_project_operation_in_progress(self, params, packed):
+        return {"success": True, "in_progress": self.project_operation_in_progress}
+    
+    def cmd_export_projection_textures(self, params, packed):
+        # Exports run as a project operation, like Save_MGR.SaveProjectionTextures
+        return self._export(params, ("", "_AO"))
+    
+    def cmd_export_view_textures(self, params, packed):
+        return self._export(params, ("_Content", "_Depth", "_Normals", "_VertCols"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in StableProjectorz host for testing add-ons")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=5555, help="Port to listen on")
+    parser.add_argument("--meshes", type=int, default=100, help="Number of simulated meshes")
+    parser.add_argument("--cameras", type=int, default=4, help="Number of simulated view cameras")
+    parser.add_argument("--projections", type=int, default=6, help="Number of simulated projection cameras")
+    args = parser.parse_args()
+    
+    server = StandInServer(args.host, args.port, mesh_count=args.meshes, camera_count=args.cameras,
+                           projection_count=args.projections).start()
+    print(f"Stand-in StableProjectorz listening on {args.host}:{server.port} "
+          f"({args.meshes} meshes, {args.cameras} cameras); Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
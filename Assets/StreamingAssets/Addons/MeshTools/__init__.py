@@ -33,14 +33,14 @@ def center_selected_meshes():
     bounds = api.scene.get_selected_meshes_bounds()
     if bounds:
         center = bounds["center"]
-        # Move each mesh by the negative of the center
-        for mesh_id in selected:
-            pos = api.models.get_pos(mesh_id)
-            if pos:
-                api.models.set_pos(mesh_id, 
-                                 pos["x"] - center["x"],
-                                 pos["y"] - center["y"],
-                                 pos["z"] - center["z"])
+        # Read every position in one request and write them back in one
+        positions = api.models.get_positions(selected)
+        moved = []
+        for mesh_id, pos in zip(selected, _as_tuples(positions)):
+            if pos is not None:
+                moved.append((mesh_id, (pos[0] - center["x"], pos[1] - center["y"], pos[2] - center["z"])))
+        if moved:
+            api.models.set_positions([mesh_id for mesh_id, _ in moved], [pos for _, pos in moved])
         print(f"Centered {len(selected)} meshes")
     else:
         print("Could not get bounds")
@@ -56,44 +56,42 @@ def randomize_selected_positions():
         print("No meshes selected")
         return
     
-    for mesh_id in selected:
-        pos = api.models.get_pos(mesh_id)
-        if pos:
+    positions = api.models.get_positions(selected)
+    moved = []
+    for mesh_id, pos in zip(selected, _as_tuples(positions)):
+        if pos is not None:
             offset_x = random.uniform(-2, 2)
             offset_y = random.uniform(-2, 2)
             offset_z = random.uniform(-2, 2)
-            api.models.set_pos(mesh_id,
-                             pos["x"] + offset_x,
-                             pos["y"] + offset_y,
-                             pos["z"] + offset_z)
+            moved.append((mesh_id, (pos[0] + offset_x, pos[1] + offset_y, pos[2] + offset_z)))
+    if moved:
+        api.models.set_positions([mesh_id for mesh_id, _ in moved], [pos for _, pos in moved])
     print(f"Randomized positions of {len(selected)} meshes")
 
 
+def _as_tuples(positions):
+    """(x, y, z) tuples, None for missing meshes, from get_positions' result"""
+    if positions is None:
+        return []
+    if hasattr(positions, "tolist"):  # NumPy array: NaN rows are missing meshes
+        return [None if pos[0] != pos[0] else tuple(pos) for pos in positions.tolist()]
+    return positions
+
+
 def hide_unselected():
     """Hide all unselected meshes"""
     api = spz.get_api()
-    all_ids = api.scene.get_all_mesh_ids()
-    selected = api.models.get_selected()
-    selected_set = set(selected)
-    
-    hidden_count = 0
-    for mesh_id in all_ids:
-        if mesh_id not in selected_set:
-            api.models.set_visibility(mesh_id, False)
-            hidden_count += 1
     
+    # One server-side command instead of a request per mesh
+    hidden_count = api.models.hide_unselected()
     print(f"Hidden {hidden_count} meshes")
 
 
 def show_all():
     """Show all meshes"""
     api = spz.get_api()
-    all_ids = api.scene.get_all_mesh_ids()
-    
-    for mesh_id in all_ids:
-        api.models.set_visibility(mesh_id, True)
-    
-    print(f"Shown {len(all_ids)} meshes")
+    shown_count = api.models.show_all()
+    print(f"Shown {shown_count} meshes")
 
 
 def print_scene_info():
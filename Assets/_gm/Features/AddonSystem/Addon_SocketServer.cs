@@ -2,10 +2,14 @@ using System;
 using System.Collections;
 using System.Collections.Generic;
 using System.Collections.Concurrent;
+using System.IO;
+using System.IO.MemoryMappedFiles;
 using System.Net;
 using System.Net.Sockets;
+using System.Runtime.InteropServices;
 using System.Text;
 using System.Threading;
+using System.Threading.Tasks;
 using UnityEngine;
 using Newtonsoft.Json;
 using Newtonsoft.Json.Linq;
@@ -27,12 +31,33 @@ namespace spz {
 		// Thread-safe queue for commands from background thread to main thread
 		private ConcurrentQueue<Action> _mainThreadQueue = new ConcurrentQueue<Action>();
 		
-		// Dictionary to store pending responses by request ID
-		private ConcurrentDictionary<string, JObject> _pendingResponses = new ConcurrentDictionary<string, JObject>();
-		
 		// Maximum commands to process per frame
 		private const int MAX_COMMANDS_PER_FRAME = 10;
 		
+		// How long a queued command may wait for the main thread before it fails,
+		// unless the request carries its own "timeout_ms" (capped at MAX_COMMAND_TIMEOUT_MS)
+		private const int COMMAND_TIMEOUT_MS = 1000;
+		private const int MAX_COMMAND_TIMEOUT_MS = 60000;
+		
+		// Error code of commands that timed out before the main thread got to them
+		private const int TIMEOUT_ERROR_CODE = -32001;
+		
+		// FastPath_API readiness, refreshed every frame so "spz.sys.ping" can answer off the main thread
+		private volatile bool _fastPathReady = false;
+		
+		// Events clients can subscribe to; each fires when the state it tracks flips (see PublishEvents)
+		static readonly string[] EVENTS = {
+			"generation_started", "generation_finished",
+			"gen3d_started", "gen3d_finished",
+			"project_operation_started", "project_operation_finished"
+		};
+		
+		// Connections subscribed to at least one event
+		private readonly ConcurrentDictionary<ClientConnection, bool> _subscribers = new ConcurrentDictionary<ClientConnection, bool>();
+		
+		// Last sampled state of each event source: SD generation, 3D generation, project save/load
+		private readonly bool[] _eventStates = new bool[3];
+		
 		void Awake() {
 			if (instance != null) { DestroyImmediate(this); return; }
 			instance = this;
@@ -96,45 +121,253 @@ namespace spz {
 		}
 		
 		/// <summary>
-		/// Handles a single client connection
+		/// Per-client connection state shared by the reader loop and response writers
+		/// </summary>
+		class ClientConnection {
+			public NetworkStream stream;
+			public readonly object writeLock = new object();
+			
+			// Set once the client negotiated binary framing (see HandleHandshake)
+			public volatile bool binary;
+			
+			// Shared-memory buffer attached with "spz.sys.shm_attach" (see HandleSharedMemoryAttach)
+			public SharedBuffer shared;
+			
+			// Events pushed to this client, set with "spz.sys.subscribe" (see HandleSubscribe)
+			public volatile HashSet<string> events;
+			
+			// Event messages are written one after another, off the main thread
+			public Task eventWrites = Task.CompletedTask;
+		}
+		
+		/// <summary>
+		/// A client's memory-mapped file. Bulk arrays referenced as
+		/// {"$shm": [byteOffset, count, dtype]} are read from and written to it
+		/// directly instead of travelling over the socket.
+		/// </summary>
+		class SharedBuffer : IDisposable {
+			// Largest buffer a client may attach
+			public const long MAX_SIZE = 1L << 30;
+			
+			readonly FileStream _file;
+			readonly MemoryMappedFile _map;
+			public readonly MemoryMappedViewAccessor view;
+			public readonly long size;
+			
+			public SharedBuffer(string path, long size) {
+				// The client keeps the file open and mapped, so it has to be shared read/write
+				_file = new FileStream(path, FileMode.Open, FileAccess.ReadWrite, FileShare.ReadWrite | FileShare.Delete);
+				if (_file.Length < size) {
+					_file.Dispose();
+					throw new ArgumentException("Shared memory file is smaller than the requested size");
+				}
+				_map = MemoryMappedFile.CreateFromFile(_file, null, size, MemoryMappedFileAccess.ReadWrite,
+				                                       HandleInheritability.None, false);
+				view = _map.CreateViewAccessor(0, size, MemoryMappedFileAccess.ReadWrite);
+				this.size = size;
+			}
+			
+			public void Dispose() {
+				view.Dispose();
+				_map.Dispose();
+				_file.Dispose();
+			}
+		}
+		
+		/// <summary>
+		/// Packed array data travelling with one message: the binary frame payload,
+		/// the connection's shared memory, and the payload of the reply (bulk results
+		/// are appended to it on binary connections).
+		/// </summary>
+		class PackedArrays {
+			public byte[] payload;
+			public SharedBuffer shared;
+			public MemoryStream output;
+		}
+		
+		/// <summary>
+		/// Buffered reader for both wire formats: newline-delimited JSON and
+		/// length-prefixed binary frames. Keeps unread bytes between messages.
+		/// </summary>
+		class MessageReader {
+			readonly Stream _stream;
+			byte[] _buffer = new byte[65536];
+			int _start;
+			int _end;
+			
+			public MessageReader(Stream stream) {
+				_stream = stream;
+			}
+			
+			/// <summary>
+			/// Reads more bytes from the stream; returns false at end of stream
+			/// </summary>
+			bool Fill() {
+				if (_start > 0) {
+					Buffer.BlockCopy(_buffer, _start, _buffer, 0, _end - _start);
+					_end -= _start;
+					_start = 0;
+				}
+				if (_end == _buffer.Length) {
+					Array.Resize(ref _buffer, _buffer.Length * 2);
+				}
+				int read = _stream.Read(_buffer, _end, _buffer.Length - _end);
+				if (read <= 0) return false;
+				_end += read;
+				return true;
+			}
+			
+			/// <summary>
+			/// Reads one newline-terminated line (without the newline), or null at end of stream
+			/// </summary>
+			public string ReadLine() {
+				int scannedFromStart = 0;
+				while (true) {
+					int from = _start + scannedFromStart;
+					int newline = Array.IndexOf(_buffer, (byte)'\n', from, _end - from);
+					if (newline >= 0) {
+						string line = Encoding.UTF8.GetString(_buffer, _start, newline - _start);
+						_start = newline + 1;
+						return line;
+					}
+					scannedFromStart = _end - _start;
+					if (!Fill()) return null;
+				}
+			}
+			
+			/// <summary>
+			/// Reads exactly count bytes, or null at end of stream
+			/// </summary>
+			public byte[] ReadBytes(int count) {
+				while (_end - _start < count) {
+					if (!Fill()) return null;
+				}
+				var data = new byte[count];
+				Buffer.BlockCopy(_buffer, _start, data, 0, count);
+				_start += count;
+				return data;
+			}
+			
+			/// <summary>
+			/// Reads one binary frame: [uint32 header length][uint32 payload length][JSON header][payload].
+			/// Lengths are little-endian. Returns false at end of stream.
+			/// </summary>
+			public bool ReadFrame(out string header, out byte[] payload) {
+				header = null;
+				payload = null;
+				byte[] lengths = ReadBytes(8);
+				if (lengths == null) return false;
+				int headerLength = ReadInt32LE(lengths, 0);
+				int payloadLength = ReadInt32LE(lengths, 4);
+				if (headerLength < 0 || payloadLength < 0) throw new InvalidDataException("Invalid frame length");
+				
+				byte[] headerBytes = ReadBytes(headerLength);
+				if (headerBytes == null) return false;
+				payload = ReadBytes(payloadLength);
+				if (payload == null) return false;
+				header = Encoding.UTF8.GetString(headerBytes);
+				return true;
+			}
+		}
+		
+		static int ReadInt32LE(byte[] data, int offset) {
+			return data[offset] | (data[offset + 1] << 8) | (data[offset + 2] << 16) | (data[offset + 3] << 24);
+		}
+		
+		static void WriteInt32LE(byte[] data, int offset, int value) {
+			data[offset] = (byte)value;
+			data[offset + 1] = (byte)(value >> 8);
+			data[offset + 2] = (byte)(value >> 16);
+			data[offset + 3] = (byte)(value >> 24);
+		}
+		
+		/// <summary>
+		/// Handles a single client connection.
+		/// Requests are newline-delimited and dispatched without waiting for earlier
+		/// ones to finish, so a client may keep many requests in flight on one socket.
+		/// Responses carry the request id and may be written out of order.
+		/// A line holding a JSON array is a JSON-RPC batch and gets one array response.
+		/// After a "spz.sys.handshake" the connection may switch to binary frames.
 		/// </summary>
 		void HandleClient(TcpClient client) {
+			ClientConnection connection = null;
 			try {
-				NetworkStream stream = client.GetStream();
-				byte[] buffer = new byte[4096];
+				connection = new ClientConnection { stream = client.GetStream() };
+				var reader = new MessageReader(connection.stream);
 				
-				while (client.Connected && _isRunning) {
-					int bytesRead = stream.Read(buffer, 0, buffer.Length);
-					if (bytesRead == 0) break;
-					
-					string message = Encoding.UTF8.GetString(buffer, 0, bytesRead);
+				while (_isRunning) {
+					string text;
+					byte[] payload = null;
+					if (connection.binary) {
+						if (!reader.ReadFrame(out text, out payload)) break;
+					}
+					else {
+						text = reader.ReadLine();
+						if (text == null) break;
+						if (string.IsNullOrWhiteSpace(text)) continue;
+					}
 					
-					// Parse JSON-RPC request
+					// Parse JSON-RPC request (or batch)
+					JToken message;
 					try {
-						var request = JObject.Parse(message);
-						var response = ProcessRequest(request);
-						
-						// Send response back to client
-						string responseJson = JsonConvert.SerializeObject(response);
-						byte[] responseBytes = Encoding.UTF8.GetBytes(responseJson + "\n");
-						stream.Write(responseBytes, 0, responseBytes.Length);
+						message = JToken.Parse(text);
 					}
 					catch (Exception e) {
 						UnityEngine.Debug.LogError($"[Addon_SocketServer] Error processing request: {e.Message}");
 						
 						// Send error response
-						var errorResponse = new JObject {
-							["jsonrpc"] = "2.0",
-							["error"] = new JObject {
-								["code"] = -32700,
-								["message"] = "Parse error"
-							},
-							["id"] = null
-						};
-						string errorJson = JsonConvert.SerializeObject(errorResponse);
-						byte[] errorBytes = Encoding.UTF8.GetBytes(errorJson + "\n");
-						stream.Write(errorBytes, 0, errorBytes.Length);
+						WriteResponse(connection, CreateErrorResponse(-32700, "Parse error", null));
+						continue;
+					}
+					
+					// Connection setup requests are answered right away, before any later request is read
+					string setupMethod = (message as JObject)?["method"]?.ToString();
+					if (setupMethod == "spz.sys.handshake") {
+						HandleHandshake(connection, (JObject)message);
+						continue;
+					}
+					if (setupMethod == "spz.sys.shm_attach") {
+						HandleSharedMemoryAttach(connection, (JObject)message);
+						continue;
+					}
+					if (setupMethod == "spz.sys.ping") {
+						HandlePing(connection, (JObject)message);
+						continue;
 					}
+					if (setupMethod == "spz.sys.subscribe") {
+						HandleSubscribe(connection, (JObject)message);
+						continue;
+					}
+					
+					var packed = new PackedArrays {
+						payload = payload,
+						shared = connection.shared,
+						output = connection.binary ? new MemoryStream() : null
+					};
+					
+					Task<JToken> pending;
+					if (message is JArray batch) {
+						pending = ProcessBatch(batch, packed);
+					}
+					else if (message is JObject request) {
+						if (request["id"] == null) {
+							// Notification: no reply unless it failed
+							pending = ProcessRequest(request, packed).ContinueWith(task => (JToken)NotificationFailure(request, task.Result));
+						}
+						else {
+							pending = ProcessRequest(request, packed).ContinueWith(task => (JToken)task.Result);
+						}
+					}
+					else {
+						WriteResponse(connection, CreateErrorResponse(-32600, "Invalid Request", null));
+						continue;
+					}
+					
+					pending.ContinueWith(task => {
+						// Nothing to send for notifications that succeeded
+						if (task.Result == null || (task.Result is JArray replies && replies.Count == 0)) return;
+						WriteResponse(connection, task.Result, packed.output);
+					});
 				}
 			}
 			catch (Exception e) {
@@ -142,64 +375,299 @@ namespace spz {
 			}
 			finally {
 				client.Close();
+				connection?.shared?.Dispose();
+				if (connection != null) _subscribers.TryRemove(connection, out _);
 			}
 		}
 		
 		/// <summary>
-		/// Processes a JSON-RPC request and queues the command for main thread execution
+		/// Negotiates the wire format. The reply is sent in the current (newline) format;
+		/// everything after it uses the chosen one. Clients that never send a handshake
+		/// keep newline-delimited JSON.
 		/// </summary>
-		JObject ProcessRequest(JObject request) {
+		void HandleHandshake(ClientConnection connection, JObject request) {
+			var offered = request["params"]?["protocols"] as JArray;
+			bool binary = false;
+			if (offered != null) {
+				foreach (var protocol in offered) {
+					if (protocol.ToString() == "binary") { binary = true; break; }
+				}
+			}
+			
+			var response = new JObject {
+				["jsonrpc"] = "2.0",
+				["result"] = new JObject {
+					["success"] = true,
+					["protocol"] = binary ? "binary" : "ndjson",
+					["features"] = new JArray("notifications", "events")
+				},
+				["id"] = request["id"]
+			};
+			WriteResponse(connection, response);
+			connection.binary = binary;
+		}
+		
+		/// <summary>
+		/// Answers a readiness probe straight from the socket thread, without waiting
+		/// for a main-thread slot, so clients can poll it cheaply while Unity starts up
+		/// </summary>
+		void HandlePing(ClientConnection connection, JObject request) {
+			WriteResponse(connection, new JObject {
+				["jsonrpc"] = "2.0",
+				["result"] = new JObject { ["success"] = true, ["ready"] = _fastPathReady },
+				["id"] = request["id"]
+			});
+		}
+		
+		/// <summary>
+		/// Sets which events are pushed to this connection as "spz.event" messages.
+		/// params: {"events": [names]}; replaces the previous subscription, an empty list ends it
+		/// </summary>
+		void HandleSubscribe(ClientConnection connection, JObject request) {
+			var id = request["id"];
+			var names = new HashSet<string>();
+			if (request["params"]?["events"] is JArray requested) {
+				foreach (var token in requested) {
+					string name = token.ToString();
+					if (Array.IndexOf(EVENTS, name) < 0) {
+						WriteResponse(connection, CreateErrorResponse(-32602, $"Unknown event: {name}", id));
+						return;
+					}
+					names.Add(name);
+				}
+			}
+			
+			connection.events = names;
+			if (names.Count > 0) {
+				_subscribers[connection] = true;
+			}
+			else {
+				_subscribers.TryRemove(connection, out _);
+			}
+			WriteResponse(connection, new JObject {
+				["jsonrpc"] = "2.0",
+				["result"] = new JObject { ["success"] = true, ["events"] = JArray.FromObject(names) },
+				["id"] = id
+			});
+		}
+		
+		/// <summary>
+		/// Maps the client's shared-memory file for this connection.
+		/// params: {"path": file path, "size": bytes}
+		/// </summary>
+		void HandleSharedMemoryAttach(ClientConnection connection, JObject request) {
+			var id = request["id"];
+			string path = request["params"]?["path"]?.ToString();
+			long size = request["params"]?["size"]?.ToObject<long>() ?? 0;
+			
+			if (connection.shared != null) {
+				WriteResponse(connection, CreateErrorResponse(-32602, "Shared memory already attached", id));
+				return;
+			}
+			if (string.IsNullOrEmpty(path) || size <= 0 || size > SharedBuffer.MAX_SIZE) {
+				WriteResponse(connection, CreateErrorResponse(-32602, "Invalid params", id));
+				return;
+			}
+			
+			try {
+				connection.shared = new SharedBuffer(path, size);
+			}
+			catch (Exception e) {
+				WriteResponse(connection, CreateErrorResponse(-32603, $"Could not map shared memory: {e.Message}", id));
+				return;
+			}
+			
+			WriteResponse(connection, new JObject {
+				["jsonrpc"] = "2.0",
+				["result"] = new JObject { ["success"] = true, ["size"] = size },
+				["id"] = id
+			});
+		}
+		
+		/// <summary>
+		/// Writes one response in the connection's wire format
+		/// (responses from concurrent requests must not interleave).
+		/// output holds packed array results for the frame payload, if any.
+		/// </summary>
+		void WriteResponse(ClientConnection connection, JToken response, MemoryStream output = null) {
+			string responseJson = JsonConvert.SerializeObject(response);
+			byte[] responseBytes;
+			if (connection.binary) {
+				int headerLength = Encoding.UTF8.GetByteCount(responseJson);
+				int payloadLength = output != null ? (int)output.Length : 0;
+				responseBytes = new byte[8 + headerLength + payloadLength];
+				WriteInt32LE(responseBytes, 0, headerLength);
+				WriteInt32LE(responseBytes, 4, payloadLength);
+				Encoding.UTF8.GetBytes(responseJson, 0, responseJson.Length, responseBytes, 8);
+				if (payloadLength > 0) {
+					Buffer.BlockCopy(output.GetBuffer(), 0, responseBytes, 8 + headerLength, payloadLength);
+				}
+			}
+			else {
+				responseBytes = Encoding.UTF8.GetBytes(responseJson + "\n");
+			}
+			try {
+				lock (connection.writeLock) {
+					connection.stream.Write(responseBytes, 0, responseBytes.Length);
+				}
+			}
+			catch (Exception e) {
+				// Client went away while the command was running
+				UnityEngine.Debug.LogWarning($"[Addon_SocketServer] Could not send response: {e.Message}");
+			}
+		}
+		
+		/// <summary>
+		/// Processes a JSON-RPC request and queues the command for main thread execution.
+		/// The returned task completes once the main thread has run the command (or it timed out).
+		/// </summary>
+		Task<JObject> ProcessRequest(JObject request, PackedArrays packed = null) {
 			string method = request["method"]?.ToString();
 			var @params = request["params"] as JObject;
 			var id = request["id"]?.ToString() ?? Guid.NewGuid().ToString();
 			
 			if (string.IsNullOrEmpty(method)) {
-				return CreateErrorResponse(-32600, "Invalid Request", JToken.FromObject(id));
+				return Task.FromResult(CreateErrorResponse(-32600, "Invalid Request", JToken.FromObject(id)));
 			}
 			
+			// Continuations (writing the response) must not run on the main thread
+			var completion = new TaskCompletionSource<JObject>(TaskCreationOptions.RunContinuationsAsynchronously);
+			
 			// Queue command for main thread execution
-			_pendingResponses[id] = null; // Mark as pending
 			_mainThreadQueue.Enqueue(() => {
-				JObject response;
-				try {
-					response = ExecuteCommand(method, @params);
-					response["id"] = JToken.FromObject(id);
-				}
-				catch (Exception e) {
-					response = CreateErrorResponse(-32603, $"Internal error: {e.Message}", JToken.FromObject(id));
+				// The caller was already told it timed out; don't run it late
+				if (completion.Task.IsCompleted) return;
+				completion.TrySetResult(ExecuteRequest(method, @params, id, packed));
+			});
+			
+			// Fail the request if the main thread doesn't get to it in time
+			Task.Delay(GetCommandTimeoutMs(request)).ContinueWith(_ => {
+				completion.TrySetResult(CreateErrorResponse(TIMEOUT_ERROR_CODE, "Command execution timeout", JToken.FromObject(id)));
+			});
+			
+			return completion.Task;
+		}
+		
+		/// <summary>
+		/// Processes a JSON-RPC batch. All commands of the batch run back to back
+		/// in a single main-thread slot, so a batch costs one frame instead of one per command.
+		/// </summary>
+		Task<JToken> ProcessBatch(JArray batch, PackedArrays packed = null) {
+			if (batch.Count == 0) {
+				return Task.FromResult<JToken>(CreateErrorResponse(-32600, "Invalid Request", null));
+			}
+			
+			var completion = new TaskCompletionSource<JToken>(TaskCreationOptions.RunContinuationsAsynchronously);
+			
+			_mainThreadQueue.Enqueue(() => {
+				if (completion.Task.IsCompleted) return;
+				var responses = new JArray();
+				foreach (var item in batch) {
+					var request = item as JObject;
+					string method = request?["method"]?.ToString();
+					var id = request?["id"]?.ToString() ?? Guid.NewGuid().ToString();
+					
+					if (string.IsNullOrEmpty(method)) {
+						responses.Add(CreateErrorResponse(-32600, "Invalid Request", JToken.FromObject(id)));
+						continue;
+					}
+					var response = ExecuteRequest(method, request["params"] as JObject, id, packed);
+					if (request["id"] == null) {
+						var failure = NotificationFailure(request, response);
+						if (failure != null) responses.Add(failure);
+						continue;
+					}
+					responses.Add(response);
 				}
-				_pendingResponses[id] = response;
+				completion.TrySetResult(responses);
 			});
 			
-			// Wait for command to execute (with timeout)
-			int timeout = 1000; // 1 second
-			int elapsed = 0;
-			while (elapsed < timeout) {
-				if (_pendingResponses.TryGetValue(id, out JObject response) && response != null) {
-					_pendingResponses.TryRemove(id, out _);
-					return response;
+			Task.Delay(GetCommandTimeoutMs(batch.First as JObject)).ContinueWith(_ => {
+				var responses = new JArray();
+				foreach (var item in batch) {
+					var itemRequest = item as JObject;
+					var timeoutResponse = CreateErrorResponse(TIMEOUT_ERROR_CODE, "Command execution timeout",
+						itemRequest?["id"] != null ? JToken.FromObject(itemRequest["id"].ToString()) : null);
+					if (itemRequest != null && itemRequest["id"] == null) {
+						responses.Add(NotificationFailure(itemRequest, timeoutResponse));
+						continue;
+					}
+					responses.Add(timeoutResponse);
 				}
-				Thread.Sleep(10);
-				elapsed += 10;
+				completion.TrySetResult(responses);
+			});
+			
+			return completion.Task;
+		}
+		
+		/// <summary>
+		/// Notifications (requests without an id) get no reply. For one that failed this builds
+		/// the "spz.sys.notification_failed" message sent in its place; null if it succeeded.
+		/// </summary>
+		static JObject NotificationFailure(JObject request, JObject response) {
+			string error = response["error"]?["message"]?.ToString();
+			var success = response["result"]?["success"];
+			if (error == null && success != null && success.Type == JTokenType.Boolean && !success.ToObject<bool>()) {
+				error = response["result"]["error"]?.ToString() ?? "Command failed";
 			}
+			if (error == null) return null;
 			
-			_pendingResponses.TryRemove(id, out _);
-			return CreateErrorResponse(-32603, "Command execution timeout", JToken.FromObject(id));
+			return new JObject {
+				["jsonrpc"] = "2.0",
+				["method"] = "spz.sys.notification_failed",
+				["params"] = new JObject {
+					["method"] = request["method"]?.ToString(),
+					["error"] = error
+				}
+			};
+		}
+		
+		/// <summary>
+		/// How long a request may wait for the main thread: its "timeout_ms" if the client
+		/// sent one (a batch uses its first request's), otherwise COMMAND_TIMEOUT_MS
+		/// </summary>
+		static int GetCommandTimeoutMs(JObject request) {
+			var token = request?["timeout_ms"];
+			if (token == null || (token.Type != JTokenType.Integer && token.Type != JTokenType.Float)) {
+				return COMMAND_TIMEOUT_MS;
+			}
+			double timeoutMs = token.ToObject<double>();
+			return (int)Math.Max(1, Math.Min(timeoutMs, MAX_COMMAND_TIMEOUT_MS));
+		}
+		
+		/// <summary>
+		/// Runs one request on the main thread and builds its response
+		/// </summary>
+		JObject ExecuteRequest(string method, JObject @params, string id, PackedArrays packed) {
+			JObject response;
+			try {
+				response = ExecuteCommand(method, @params, packed);
+				response["id"] = JToken.FromObject(id);
+			}
+			catch (Exception e) {
+				response = CreateErrorResponse(-32603, $"Internal error: {e.Message}", JToken.FromObject(id));
+			}
+			return response;
 		}
 		
 		/// <summary>
 		/// Executes a command on the main thread
 		/// </summary>
-		JObject ExecuteCommand(string method, JObject @params) {
+		JObject ExecuteCommand(string method, JObject @params, PackedArrays packed = null) {
 			var result = new JObject();
 			
 			// Route to appropriate handler
 			if (method.StartsWith("spz.cmd.")) {
-				result = ExecuteFastPathCommand(method, @params);
+				result = ExecuteFastPathCommand(method, @params, packed);
 			}
 			else if (method.StartsWith("spz.ui.")) {
 				result = ExecuteUICommand(method, @params);
 			}
+			else if (method == "spz.sys.sync") {
+				// Runs in queue order: once it replies, every earlier request of the connection
+				// has run and failed notifications have been reported
+				result["success"] = true;
+			}
 			else {
 				return CreateErrorResponse(-32601, $"Method not found: {method}", null);
 			}
@@ -228,7 +696,7 @@ namespace spz {
 		/// <summary>
 		/// Executes fast-path commands
 		/// </summary>
-		JObject ExecuteFastPathCommand(string method, JObject @params) {
+		JObject ExecuteFastPathCommand(string method, JObject @params, PackedArrays packed) {
 			if (FastPath_API.instance == null || !FastPath_API.instance.IsReady()) {
 				return new JObject { ["success"] = false, ["error"] = "FastPath_API not ready" };
 			}
@@ -255,6 +723,26 @@ namespace spz {
 						result["success"] = fastPath.SetCameraRotation(camIdx, x, y, z, w);
 						break;
 						
+					case "spz.cmd.set_camera_pose":
+						// Position (x, y, z), rotation (qx, qy, qz, qw) and fov are each optional
+						camIdx = @params["camera_index"]?.ToObject<int>() ?? 0;
+						Vector3? posePosition = null;
+						if (@params["x"] != null || @params["y"] != null || @params["z"] != null) {
+							posePosition = new Vector3(@params["x"]?.ToObject<float>() ?? 0f,
+							                           @params["y"]?.ToObject<float>() ?? 0f,
+							                           @params["z"]?.ToObject<float>() ?? 0f);
+						}
+						Quaternion? poseRotation = null;
+						if (@params["qx"] != null || @params["qy"] != null || @params["qz"] != null || @params["qw"] != null) {
+							poseRotation = new Quaternion(@params["qx"]?.ToObject<float>() ?? 0f,
+							                              @params["qy"]?.ToObject<float>() ?? 0f,
+							                              @params["qz"]?.ToObject<float>() ?? 0f,
+							                              @params["qw"]?.ToObject<float>() ?? 1f);
+						}
+						float? poseFov = @params["fov"]?.ToObject<float?>();
+						result["success"] = fastPath.SetCameraPose(camIdx, posePosition, poseRotation, poseFov);
+						break;
+						
 					case "spz.cmd.set_camera_fov":
 						camIdx = @params["camera_index"]?.ToObject<int>() ?? 0;
 						float fov = @params["fov"]?.ToObject<float>() ?? 60f;
@@ -290,6 +778,17 @@ namespace spz {
 						result["mesh_ids"] = JArray.FromObject(selectedIds);
 						break;
 						
+					case "spz.cmd.select_meshes":
+					case "spz.cmd.deselect_meshes":
+						var meshIdsSel = ReadMeshIds(@params["mesh_ids"], packed);
+						if (meshIdsSel != null) {
+							result["success"] = true;
+							result["count"] = fastPath.SetMeshesSelected(meshIdsSel, method == "spz.cmd.select_meshes");
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
 					case "spz.cmd.select_all_meshes":
 						result["success"] = fastPath.SelectAllMeshes();
 						break;
@@ -329,6 +828,24 @@ namespace spz {
 						result["success"] = fastPath.SetMeshVisibility(meshId, visible);
 						break;
 						
+					case "spz.cmd.set_mesh_visibilities":
+						var meshIdsVis = ReadMeshIds(@params["mesh_ids"], packed);
+						var visibleList = ReadFlags(@params["visible"], packed);
+						if (meshIdsVis != null && visibleList != null) {
+							result["success"] = true;
+							result["count"] = fastPath.SetMeshVisibilities(meshIdsVis, visibleList);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
+					case "spz.cmd.set_visibility_by_selection":
+						bool? selectedVisible = @params["selected"]?.Type == JTokenType.Boolean ? @params["selected"].ToObject<bool>() : (bool?)null;
+						bool? unselectedVisible = @params["unselected"]?.Type == JTokenType.Boolean ? @params["unselected"].ToObject<bool>() : (bool?)null;
+						result["success"] = true;
+						result["count"] = fastPath.SetVisibilityBySelection(selectedVisible, unselectedVisible);
+						break;
+						
 					case "spz.cmd.get_mesh_pos":
 						meshId = @params["mesh_id"]?.ToObject<ushort>() ?? 0;
 						pos = fastPath.GetMeshPosition(meshId);
@@ -544,11 +1061,11 @@ namespace spz {
 						
 					case "spz.cmd.export_projection_textures":
 						bool dilate = @params["is_dilate"]?.ToObject<bool>() ?? true;
-						result["success"] = fastPath.ExportProjectionTextures(dilate);
+						result["success"] = fastPath.ExportProjectionTextures(dilate, @params["path"]?.ToString());
 						break;
 						
 					case "spz.cmd.export_view_textures":
-						result["success"] = fastPath.ExportViewTextures();
+						result["success"] = fastPath.ExportViewTextures(@params["path"]?.ToString());
 						break;
 						
 					case "spz.cmd.get_workflow_mode":
@@ -662,27 +1179,9 @@ namespace spz {
 						break;
 						
 					case "spz.cmd.set_mesh_positions":
-						var meshIdsJson = @params["mesh_ids"] as JArray;
-						var positionsJson = @params["positions"] as JArray;
-						if (meshIdsJson != null && positionsJson != null) {
-							var meshIdsList = new List<ushort>();
-							var positionsList = new List<Vector3>();
-							
-							foreach (var id in meshIdsJson) {
-								meshIdsList.Add(id.ToObject<ushort>());
-							}
-							
-							foreach (var posItem in positionsJson) {
-								var posObj = posItem as JObject;
-								if (posObj != null) {
-									positionsList.Add(new Vector3(
-										posObj["x"]?.ToObject<float>() ?? 0f,
-										posObj["y"]?.ToObject<float>() ?? 0f,
-										posObj["z"]?.ToObject<float>() ?? 0f
-									));
-								}
-							}
-							
+						var meshIdsList = ReadMeshIds(@params["mesh_ids"], packed);
+						var positionsList = ReadVector3List(@params["positions"], packed, 0f);
+						if (meshIdsList != null && positionsList != null) {
 							int successCountPos = fastPath.SetMeshPositions(meshIdsList, positionsList);
 							result["success"] = true;
 							result["count"] = successCountPos;
@@ -692,28 +1191,9 @@ namespace spz {
 						break;
 						
 					case "spz.cmd.set_mesh_rotations":
-						meshIdsJson = @params["mesh_ids"] as JArray;
-						var rotationsJson = @params["rotations"] as JArray;
-						if (meshIdsJson != null && rotationsJson != null) {
-							var meshIdsRot = new List<ushort>();
-							var rotationsList = new List<Quaternion>();
-							
-							foreach (var id in meshIdsJson) {
-								meshIdsRot.Add(id.ToObject<ushort>());
-							}
-							
-							foreach (var rotItem in rotationsJson) {
-								var rotObj = rotItem as JObject;
-								if (rotObj != null) {
-									rotationsList.Add(new Quaternion(
-										rotObj["x"]?.ToObject<float>() ?? 0f,
-										rotObj["y"]?.ToObject<float>() ?? 0f,
-										rotObj["z"]?.ToObject<float>() ?? 0f,
-										rotObj["w"]?.ToObject<float>() ?? 1f
-									));
-								}
-							}
-							
+						var meshIdsRot = ReadMeshIds(@params["mesh_ids"], packed);
+						var rotationsList = ReadQuaternionList(@params["rotations"], packed);
+						if (meshIdsRot != null && rotationsList != null) {
 							int successCountRot = fastPath.SetMeshRotations(meshIdsRot, rotationsList);
 							result["success"] = true;
 							result["count"] = successCountRot;
@@ -723,27 +1203,9 @@ namespace spz {
 						break;
 						
 					case "spz.cmd.set_mesh_scales":
-						meshIdsJson = @params["mesh_ids"] as JArray;
-						var scalesJson = @params["scales"] as JArray;
-						if (meshIdsJson != null && scalesJson != null) {
-							var meshIdsScale = new List<ushort>();
-							var scalesList = new List<Vector3>();
-							
-							foreach (var id in meshIdsJson) {
-								meshIdsScale.Add(id.ToObject<ushort>());
-							}
-							
-							foreach (var scaleItem in scalesJson) {
-								var scaleObj = scaleItem as JObject;
-								if (scaleObj != null) {
-									scalesList.Add(new Vector3(
-										scaleObj["x"]?.ToObject<float>() ?? 1f,
-										scaleObj["y"]?.ToObject<float>() ?? 1f,
-										scaleObj["z"]?.ToObject<float>() ?? 1f
-									));
-								}
-							}
-							
+						var meshIdsScale = ReadMeshIds(@params["mesh_ids"], packed);
+						var scalesList = ReadVector3List(@params["scales"], packed, 1f);
+						if (meshIdsScale != null && scalesList != null) {
 							int successCountScale = fastPath.SetMeshScales(meshIdsScale, scalesList);
 							result["success"] = true;
 							result["count"] = successCountScale;
@@ -752,6 +1214,95 @@ namespace spz {
 						}
 						break;
 						
+					case "spz.cmd.get_mesh_positions":
+						var meshIdsGetPos = ReadMeshIds(@params["mesh_ids"], packed);
+						var positionValues = meshIdsGetPos != null ? fastPath.GetMeshPositions(meshIdsGetPos) : null;
+						if (positionValues != null) {
+							result["success"] = true;
+							result["positions"] = WritePacked(positionValues, "f32", @params["out"], packed)
+							                      ?? VectorListToJson(positionValues, XYZ_KEYS);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
+					case "spz.cmd.get_mesh_rotations":
+						var meshIdsGetRot = ReadMeshIds(@params["mesh_ids"], packed);
+						var rotationValues = meshIdsGetRot != null ? fastPath.GetMeshRotations(meshIdsGetRot) : null;
+						if (rotationValues != null) {
+							result["success"] = true;
+							result["rotations"] = WritePacked(rotationValues, "f32", @params["out"], packed)
+							                      ?? VectorListToJson(rotationValues, XYZW_KEYS);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
+					case "spz.cmd.get_mesh_scales":
+						var meshIdsGetScale = ReadMeshIds(@params["mesh_ids"], packed);
+						var scaleValues = meshIdsGetScale != null ? fastPath.GetMeshScales(meshIdsGetScale) : null;
+						if (scaleValues != null) {
+							result["success"] = true;
+							result["scales"] = WritePacked(scaleValues, "f32", @params["out"], packed)
+							                   ?? VectorListToJson(scaleValues, XYZ_KEYS);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
+					case "spz.cmd.get_mesh_bounds_many":
+						var meshIdsGetBounds = ReadMeshIds(@params["mesh_ids"], packed);
+						var boundsValues = meshIdsGetBounds != null ? fastPath.GetMeshBoundsMany(meshIdsGetBounds) : null;
+						if (boundsValues != null) {
+							result["success"] = true;
+							result["bounds"] = WritePacked(boundsValues, "f32", @params["out"], packed)
+							                   ?? VectorListToJson(boundsValues, BOUNDS_KEYS);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
+					case "spz.cmd.get_mesh_visibilities":
+						var meshIdsGetVis = ReadMeshIds(@params["mesh_ids"], packed);
+						var visibilityValues = meshIdsGetVis != null ? fastPath.GetMeshVisibilities(meshIdsGetVis) : null;
+						if (visibilityValues != null) {
+							result["success"] = true;
+							result["visible"] = WritePacked(visibilityValues, "u8", null, packed)
+							                    ?? VisibilitiesToJson(visibilityValues);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
+					case "spz.cmd.get_mesh_names":
+						var meshIdsGetNames = ReadMeshIds(@params["mesh_ids"], packed);
+						var nameValues = meshIdsGetNames != null ? fastPath.GetMeshNames(meshIdsGetNames) : null;
+						if (nameValues != null) {
+							result["success"] = true;
+							result["names"] = JArray.FromObject(nameValues);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
+					case "spz.cmd.get_scene_snapshot":
+						var snapshot = fastPath.GetSceneSnapshot();
+						if (snapshot != null) {
+							result["success"] = true;
+							result["count"] = snapshot.ids.Length;
+							result["mesh_ids"] = WritePacked(snapshot.ids, "u16", null, packed) ?? JArray.FromObject(snapshot.ids);
+							result["names"] = JArray.FromObject(snapshot.names);
+							result["positions"] = WritePacked(snapshot.positions, "f32", null, packed) ?? JArray.FromObject(snapshot.positions);
+							result["rotations"] = WritePacked(snapshot.rotations, "f32", null, packed) ?? JArray.FromObject(snapshot.rotations);
+							result["scales"] = WritePacked(snapshot.scales, "f32", null, packed) ?? JArray.FromObject(snapshot.scales);
+							result["bounds"] = WritePacked(snapshot.bounds, "f32", null, packed) ?? JArray.FromObject(snapshot.bounds);
+							result["visible"] = WritePacked(snapshot.visible, "u8", null, packed) ?? FlagsToJson(snapshot.visible);
+							result["selected"] = WritePacked(snapshot.selected, "u8", null, packed) ?? FlagsToJson(snapshot.selected);
+						} else {
+							result["success"] = false;
+						}
+						break;
+						
 					case "spz.cmd.save_project":
 						result["success"] = fastPath.SaveProject();
 						break;
@@ -861,6 +1412,232 @@ namespace spz {
 			return result;
 		}
 		
+		// ============================================
+		// PACKED ARRAYS (binary frames, shared memory)
+		// ============================================
+		
+		/// <summary>
+		/// Reads a packed array descriptor: {"$f32": [byteOffset, count]} (or "$u16", "$u8")
+		/// in the frame payload, or {"$shm": [byteOffset, count, "f32"]} in the connection's
+		/// shared memory. Returns false if the token isn't a descriptor.
+		/// Packed data is little-endian, like every platform StableProjectorz runs on.
+		/// </summary>
+		static bool TryReadPacked<T>(JToken token, PackedArrays packed, string dtype, out T[] values) where T : struct {
+			values = null;
+			var descriptor = token as JObject;
+			if (descriptor == null || packed == null) return false;
+			int elementSize = Marshal.SizeOf<T>();
+			
+			var range = descriptor["$" + dtype] as JArray;
+			if (range != null && packed.payload != null) {
+				GetPackedRange(range, 2, elementSize, packed.payload.Length, out int offset, out int count);
+				values = new T[count];
+				Buffer.BlockCopy(packed.payload, offset, values, 0, count * elementSize);
+				return true;
+			}
+			
+			range = descriptor["$shm"] as JArray;
+			if (range != null && packed.shared != null) {
+				if (range.Count != 3 || range[2].ToString() != dtype) {
+					throw new ArgumentException($"Expected a shared {dtype} array");
+				}
+				GetPackedRange(range, 3, elementSize, packed.shared.size, out int offset, out int count);
+				values = new T[count];
+				packed.shared.view.ReadArray(offset, values, 0, count);
+				return true;
+			}
+			return false;
+		}
+		
+		/// <summary>
+		/// Stores a bulk result: in the shared-memory range the client passed as "out",
+		/// or in the reply payload on binary connections. Returns the descriptor to put
+		/// in the result, or null if the result has to be sent as JSON.
+		/// </summary>
+		static JToken WritePacked<T>(T[] values, string dtype, JToken outToken, PackedArrays packed) where T : struct {
+			if (packed == null) return null;
+			int elementSize = Marshal.SizeOf<T>();
+			
+			var range = (outToken as JObject)?["$shm"] as JArray;
+			if (range != null && packed.shared != null) {
+				if (range.Count != 3 || range[2].ToString() != dtype) {
+					throw new ArgumentException($"Expected a shared {dtype} array for the result");
+				}
+				GetPackedRange(range, 3, elementSize, packed.shared.size, out int offset, out int count);
+				if (count < values.Length) {
+					throw new ArgumentException("Shared memory range is too small for the result");
+				}
+				packed.shared.view.WriteArray(offset, values, 0, values.Length);
+				return new JObject { ["$shm"] = new JArray(offset, values.Length, dtype) };
+			}
+			
+			if (packed.output != null) {
+				long payloadOffset = packed.output.Length;
+				var bytes = new byte[values.Length * elementSize];
+				Buffer.BlockCopy(values, 0, bytes, 0, bytes.Length);
+				packed.output.Write(bytes, 0, bytes.Length);
+				return new JObject { ["$" + dtype] = new JArray(payloadOffset, values.Length) };
+			}
+			return null;
+		}
+		
+		static void GetPackedRange(JArray range, int expectedCount, int elementSize, long available, out int offset, out int count) {
+			if (range.Count != expectedCount) {
+				throw new ArgumentException("Invalid packed array descriptor");
+			}
+			offset = range[0].ToObject<int>();
+			count = range[1].ToObject<int>();
+			if (offset < 0 || count < 0 || offset + (long)count * elementSize > available) {
+				throw new ArgumentException("Packed array out of bounds");
+			}
+		}
+		
+		/// <summary>
+		/// Reads mesh ids from a JSON array or a packed uint16 array
+		/// </summary>
+		static List<ushort> ReadMeshIds(JToken token, PackedArrays packed) {
+			if (TryReadPacked(token, packed, "u16", out ushort[] packedIds)) {
+				return new List<ushort>(packedIds);
+			}
+			
+			var idsJson = token as JArray;
+			if (idsJson == null) return null;
+			var ids = new List<ushort>(idsJson.Count);
+			foreach (var id in idsJson) {
+				ids.Add(id.ToObject<ushort>());
+			}
+			return ids;
+		}
+		
+		/// <summary>
+		/// Reads flags from a packed uint8 array (nonzero is true), a JSON array of bools,
+		/// or a single bool (returned as a one-element list)
+		/// </summary>
+		static List<bool> ReadFlags(JToken token, PackedArrays packed) {
+			if (TryReadPacked(token, packed, "u8", out byte[] packedFlags)) {
+				var flags = new List<bool>(packedFlags.Length);
+				foreach (byte flag in packedFlags) {
+					flags.Add(flag != 0);
+				}
+				return flags;
+			}
+			
+			if (token?.Type == JTokenType.Boolean) {
+				return new List<bool> { token.ToObject<bool>() };
+			}
+			var flagsJson = token as JArray;
+			if (flagsJson == null) return null;
+			var values = new List<bool>(flagsJson.Count);
+			foreach (var flag in flagsJson) {
+				values.Add(flag.ToObject<bool>());
+			}
+			return values;
+		}
+		
+		/// <summary>
+		/// Reads vectors from a JSON array of {x, y, z} objects or a packed float32 array
+		/// </summary>
+		static List<Vector3> ReadVector3List(JToken token, PackedArrays packed, float defaultValue) {
+			if (TryReadPacked(token, packed, "f32", out float[] values)) {
+				var packedVectors = new List<Vector3>(values.Length / 3);
+				for (int i = 0; i + 2 < values.Length; i += 3) {
+					packedVectors.Add(new Vector3(values[i], values[i + 1], values[i + 2]));
+				}
+				return packedVectors;
+			}
+			
+			var vectorsJson = token as JArray;
+			if (vectorsJson == null) return null;
+			var vectors = new List<Vector3>(vectorsJson.Count);
+			foreach (var item in vectorsJson) {
+				var obj = item as JObject;
+				if (obj != null) {
+					vectors.Add(new Vector3(
+						obj["x"]?.ToObject<float>() ?? defaultValue,
+						obj["y"]?.ToObject<float>() ?? defaultValue,
+						obj["z"]?.ToObject<float>() ?? defaultValue
+					));
+				}
+			}
+			return vectors;
+		}
+		
+		/// <summary>
+		/// Reads quaternions from a JSON array of {x, y, z, w} objects or a packed float32 array
+		/// </summary>
+		static List<Quaternion> ReadQuaternionList(JToken token, PackedArrays packed) {
+			if (TryReadPacked(token, packed, "f32", out float[] values)) {
+				var packedRotations = new List<Quaternion>(values.Length / 4);
+				for (int i = 0; i + 3 < values.Length; i += 4) {
+					packedRotations.Add(new Quaternion(values[i], values[i + 1], values[i + 2], values[i + 3]));
+				}
+				return packedRotations;
+			}
+			
+			var rotationsJson = token as JArray;
+			if (rotationsJson == null) return null;
+			var rotations = new List<Quaternion>(rotationsJson.Count);
+			foreach (var item in rotationsJson) {
+				var obj = item as JObject;
+				if (obj != null) {
+					rotations.Add(new Quaternion(
+						obj["x"]?.ToObject<float>() ?? 0f,
+						obj["y"]?.ToObject<float>() ?? 0f,
+						obj["z"]?.ToObject<float>() ?? 0f,
+						obj["w"]?.ToObject<float>() ?? 1f
+					));
+				}
+			}
+			return rotations;
+		}
+		
+		/// <summary>
+		/// JSON form of packed 0/1 flags (a byte[] would otherwise be written as base64)
+		/// </summary>
+		static JArray FlagsToJson(byte[] flags) {
+			var values = new JArray();
+			foreach (byte flag in flags) {
+				values.Add(flag != 0 ? 1 : 0);
+			}
+			return values;
+		}
+		
+		static readonly string[] XYZ_KEYS = { "x", "y", "z" };
+		static readonly string[] XYZW_KEYS = { "x", "y", "z", "w" };
+		static readonly string[] BOUNDS_KEYS = { "center_x", "center_y", "center_z", "size_x", "size_y", "size_z" };
+		
+		/// <summary>
+		/// JSON form of packed vectors: one object per vector with the given component keys,
+		/// null where the values are NaN (missing meshes)
+		/// </summary>
+		static JArray VectorListToJson(float[] values, string[] keys) {
+			var vectors = new JArray();
+			int width = keys.Length;
+			for (int i = 0; i + width - 1 < values.Length; i += width) {
+				if (float.IsNaN(values[i])) {
+					vectors.Add(JValue.CreateNull());
+					continue;
+				}
+				var vector = new JObject();
+				for (int j = 0; j < width; j++) {
+					vector[keys[j]] = values[i + j];
+				}
+				vectors.Add(vector);
+			}
+			return vectors;
+		}
+		
+		/// <summary>
+		/// JSON form of packed visibility flags: true, false, or null for missing meshes (255)
+		/// </summary>
+		static JArray VisibilitiesToJson(byte[] flags) {
+			var values = new JArray();
+			foreach (byte flag in flags) {
+				values.Add(flag == 255 ? JValue.CreateNull() : new JValue(flag != 0));
+			}
+			return values;
+		}
+		
 		/// <summary>
 		/// Executes UI commands (delegates to AddonUI_MGR)
 		/// </summary>
@@ -1013,6 +1790,8 @@ namespace spz {
 		/// Processes queued commands on the main thread (called from Update)
 		/// </summary>
 		void Update() {
+			_fastPathReady = FastPath_API.instance != null && FastPath_API.instance.IsReady();
+			
 			int processed = 0;
 			while (processed < MAX_COMMANDS_PER_FRAME && _mainThreadQueue.TryDequeue(out Action action)) {
 				try {
@@ -1023,6 +1802,39 @@ namespace spz {
 				}
 				processed++;
 			}
+			
+			PublishEvents();
+		}
+		
+		/// <summary>
+		/// Samples the states events track once per frame and pushes an event to its
+		/// subscribers whenever one flips, so add-ons don't have to poll for them
+		/// </summary>
+		void PublishEvents() {
+			var fastPath = FastPath_API.instance;
+			if (fastPath == null) return;
+			
+			PublishTransition(0, fastPath.IsGenerating(), "generation_started", "generation_finished");
+			PublishTransition(1, fastPath.Is3DGenerationInProgress(), "gen3d_started", "gen3d_finished");
+			PublishTransition(2, fastPath.IsProjectOperationInProgress(), "project_operation_started", "project_operation_finished");
+		}
+		
+		void PublishTransition(int source, bool state, string started, string finished) {
+			if (state == _eventStates[source]) return;
+			_eventStates[source] = state;
+			if (_subscribers.IsEmpty) return;
+			
+			string name = state ? started : finished;
+			var message = new JObject {
+				["jsonrpc"] = "2.0",
+				["method"] = "spz.event",
+				["params"] = new JObject { ["event"] = name, ["time"] = Time.realtimeSinceStartup }
+			};
+			foreach (var connection in _subscribers.Keys) {
+				if (connection.events?.Contains(name) != true) continue;
+				// Chained per connection: events arrive in order and a slow client can't stall the frame
+				connection.eventWrites = connection.eventWrites.ContinueWith(_ => WriteResponse(connection, message));
+			}
 		}
 		
 		void OnDestroy() {
@@ -1,5 +1,6 @@
 using System.Collections;
 using System.Collections.Generic;
+using System.IO;
 using UnityEngine;
 
 namespace spz {
@@ -98,6 +99,56 @@ namespace spz {
 			return true;
 		}
 		
+		/// <summary>
+		/// Fast camera pose update: position, rotation and FOV (each optional, null
+		/// keeps the current one) under one rate-limit check, so a pose is never
+		/// applied half-way
+		/// </summary>
+		public bool SetCameraPose(int cameraIndex, Vector3? position, Quaternion? rotation, float? fov = null) {
+			if (!_isInitialized) return false;
+			if (Time.time - _lastCameraUpdate < MIN_CAMERA_UPDATE_INTERVAL) return false;
+			
+			var cameras = UserCameras_MGR.instance;
+			if (cameras == null) return false;
+			
+			var camera = cameras.GetViewCamera(cameraIndex);
+			if (camera == null || !camera.gameObject.activeInHierarchy) return false;
+			
+			if (position.HasValue) {
+				var p = position.Value;
+				if (!IsValidFloat(p.x) || !IsValidFloat(p.y) || !IsValidFloat(p.z)) return false;
+			}
+			if (rotation.HasValue) {
+				var q = rotation.Value;
+				if (!IsValidFloat(q.x) || !IsValidFloat(q.y) || !IsValidFloat(q.z) || !IsValidFloat(q.w)) return false;
+				if (Mathf.Abs(q.x) < 0.01f && Mathf.Abs(q.y) < 0.01f && Mathf.Abs(q.z) < 0.01f && Mathf.Abs(q.w) < 0.01f) {
+					return false; // Invalid quaternion
+				}
+			}
+			if (fov.HasValue && (!IsValidFloat(fov.Value) || fov.Value < 1f || fov.Value > 179f)) {
+				return false;
+			}
+			
+			if (position.HasValue) {
+				var p = position.Value;
+				camera.transform.position = new Vector3(Mathf.Clamp(p.x, -1000f, 1000f),
+				                                         Mathf.Clamp(p.y, -1000f, 1000f),
+				                                         Mathf.Clamp(p.z, -1000f, 1000f));
+			}
+			if (rotation.HasValue) {
+				var quat = rotation.Value;
+				quat.Normalize();
+				camera.transform.rotation = quat;
+			}
+			if (fov.HasValue && camera.myCamera != null) {
+				camera.myCamera.fieldOfView = fov.Value;
+			}
+			if (position.HasValue || rotation.HasValue) {
+				_lastCameraUpdate = Time.time;
+			}
+			return true;
+		}
+		
 		/// <summary>
 		/// Fast camera FOV update
 		/// </summary>
@@ -194,6 +245,20 @@ namespace spz {
 			return true;
 		}
 		
+		/// <summary>
+		/// Batch select or deselect meshes (missing ids are skipped)
+		/// </summary>
+		public int SetMeshesSelected(List<ushort> meshIds, bool select) {
+			if (!_isInitialized) return 0;
+			if (meshIds == null) return 0;
+			
+			int successCount = 0;
+			foreach (var meshId in meshIds) {
+				if (select ? SelectMesh(meshId) : DeselectMesh(meshId)) successCount++;
+			}
+			return successCount;
+		}
+		
 		// ============================================
 		// TRANSFORM OPERATIONS (Real-time)
 		// ============================================
@@ -414,6 +479,50 @@ namespace spz {
 			return true;
 		}
 		
+		/// <summary>
+		/// Batch set mesh visibility. visible holds one flag per mesh, or a single flag for all of them
+		/// </summary>
+		public int SetMeshVisibilities(List<ushort> meshIds, List<bool> visible) {
+			if (!_isInitialized) return 0;
+			if (meshIds == null || visible == null || visible.Count == 0) return 0;
+			if (visible.Count != 1 && visible.Count != meshIds.Count) return 0;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return 0;
+			
+			int successCount = 0;
+			for (int i = 0; i < meshIds.Count; i++) {
+				var mesh = modelsHandler.getMesh_byUniqueID(meshIds[i]);
+				if (mesh == null) continue;
+				
+				mesh.ToggleRender(visible.Count == 1 ? visible[0] : visible[i]);
+				successCount++;
+			}
+			return successCount;
+		}
+		
+		/// <summary>
+		/// Show or hide meshes by selection state; a null flag leaves that group as it is
+		/// </summary>
+		public int SetVisibilityBySelection(bool? selectedVisible, bool? unselectedVisible) {
+			if (!_isInitialized) return 0;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return 0;
+			
+			int changedCount = 0;
+			foreach (var mesh in modelsHandler.meshes) {
+				if (mesh == null) continue;
+				
+				bool? visible = mesh._isSelected ? selectedVisible : unselectedVisible;
+				if (!visible.HasValue) continue;
+				
+				mesh.ToggleRender(visible.Value);
+				changedCount++;
+			}
+			return changedCount;
+		}
+		
 		/// <summary>
 		/// Get mesh position
 		/// </summary>
@@ -429,6 +538,134 @@ namespace spz {
 			return mesh.transform.position;
 		}
 		
+		/// <summary>
+		/// Batch get mesh positions as packed x, y, z values (NaN for missing meshes)
+		/// </summary>
+		public float[] GetMeshPositions(List<ushort> meshIds) {
+			if (!_isInitialized) return null;
+			if (meshIds == null) return null;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return null;
+			
+			var values = new float[meshIds.Count * 3];
+			for (int i = 0; i < meshIds.Count; i++) {
+				var mesh = modelsHandler.getMesh_byUniqueID(meshIds[i]);
+				var pos = mesh != null ? mesh.transform.position : new Vector3(float.NaN, float.NaN, float.NaN);
+				values[3 * i] = pos.x;
+				values[3 * i + 1] = pos.y;
+				values[3 * i + 2] = pos.z;
+			}
+			return values;
+		}
+		
+		/// <summary>
+		/// Batch get mesh rotations as packed x, y, z, w values (NaN for missing meshes)
+		/// </summary>
+		public float[] GetMeshRotations(List<ushort> meshIds) {
+			if (!_isInitialized) return null;
+			if (meshIds == null) return null;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return null;
+			
+			var values = new float[meshIds.Count * 4];
+			for (int i = 0; i < meshIds.Count; i++) {
+				var mesh = modelsHandler.getMesh_byUniqueID(meshIds[i]);
+				var rot = mesh != null ? mesh.transform.rotation : new Quaternion(float.NaN, float.NaN, float.NaN, float.NaN);
+				values[4 * i] = rot.x;
+				values[4 * i + 1] = rot.y;
+				values[4 * i + 2] = rot.z;
+				values[4 * i + 3] = rot.w;
+			}
+			return values;
+		}
+		
+		/// <summary>
+		/// Batch get mesh scales as packed x, y, z values (NaN for missing meshes)
+		/// </summary>
+		public float[] GetMeshScales(List<ushort> meshIds) {
+			if (!_isInitialized) return null;
+			if (meshIds == null) return null;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return null;
+			
+			var values = new float[meshIds.Count * 3];
+			for (int i = 0; i < meshIds.Count; i++) {
+				var mesh = modelsHandler.getMesh_byUniqueID(meshIds[i]);
+				var scale = mesh != null ? mesh.transform.localScale : new Vector3(float.NaN, float.NaN, float.NaN);
+				values[3 * i] = scale.x;
+				values[3 * i + 1] = scale.y;
+				values[3 * i + 2] = scale.z;
+			}
+			return values;
+		}
+		
+		/// <summary>
+		/// Batch get mesh bounds as packed center x, y, z, size x, y, z values (NaN for missing meshes)
+		/// </summary>
+		public float[] GetMeshBoundsMany(List<ushort> meshIds) {
+			if (!_isInitialized) return null;
+			if (meshIds == null) return null;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return null;
+			
+			var values = new float[meshIds.Count * 6];
+			for (int i = 0; i < meshIds.Count; i++) {
+				var mesh = modelsHandler.getMesh_byUniqueID(meshIds[i]);
+				if (mesh == null) {
+					for (int j = 0; j < 6; j++) values[6 * i + j] = float.NaN;
+					continue;
+				}
+				var bounds = mesh.bounds;
+				values[6 * i] = bounds.center.x;
+				values[6 * i + 1] = bounds.center.y;
+				values[6 * i + 2] = bounds.center.z;
+				values[6 * i + 3] = bounds.size.x;
+				values[6 * i + 4] = bounds.size.y;
+				values[6 * i + 5] = bounds.size.z;
+			}
+			return values;
+		}
+		
+		/// <summary>
+		/// Batch get mesh visibility: 1 visible, 0 hidden, 255 for missing meshes
+		/// </summary>
+		public byte[] GetMeshVisibilities(List<ushort> meshIds) {
+			if (!_isInitialized) return null;
+			if (meshIds == null) return null;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return null;
+			
+			var values = new byte[meshIds.Count];
+			for (int i = 0; i < meshIds.Count; i++) {
+				var mesh = modelsHandler.getMesh_byUniqueID(meshIds[i]);
+				values[i] = mesh == null ? (byte)255 : (byte)(mesh._isVisible ? 1 : 0);
+			}
+			return values;
+		}
+		
+		/// <summary>
+		/// Batch get mesh names (null for missing meshes)
+		/// </summary>
+		public string[] GetMeshNames(List<ushort> meshIds) {
+			if (!_isInitialized) return null;
+			if (meshIds == null) return null;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return null;
+			
+			var names = new string[meshIds.Count];
+			for (int i = 0; i < meshIds.Count; i++) {
+				var mesh = modelsHandler.getMesh_byUniqueID(meshIds[i]);
+				names[i] = mesh != null ? mesh.gameObject.name : null;
+			}
+			return names;
+		}
+		
 		/// <summary>
 		/// Get mesh rotation
 		/// </summary>
@@ -736,6 +973,78 @@ namespace spz {
 			return ids;
 		}
 		
+		/// <summary>
+		/// State of every mesh in the scene as parallel packed arrays, gathered in one pass
+		/// </summary>
+		public class SceneSnapshot {
+			public ushort[] ids;
+			public string[] names;
+			public float[] positions;  // x, y, z per mesh
+			public float[] rotations;  // x, y, z, w per mesh
+			public float[] scales;     // x, y, z per mesh
+			public float[] bounds;     // center x, y, z, size x, y, z per mesh
+			public byte[] visible;     // 1 if visible
+			public byte[] selected;    // 1 if selected
+		}
+		
+		/// <summary>
+		/// Get the id, name, transform, bounds, visibility and selection of every mesh
+		/// </summary>
+		public SceneSnapshot GetSceneSnapshot() {
+			if (!_isInitialized) return null;
+			
+			var modelsHandler = ModelsHandler_3D.instance;
+			if (modelsHandler == null) return null;
+			
+			var meshes = new List<SD_3D_Mesh>();
+			foreach (var mesh in modelsHandler.meshes) {
+				if (mesh != null) meshes.Add(mesh);
+			}
+			var selectedIds = new HashSet<ushort>(GetSelectedMeshIDs());
+			
+			int count = meshes.Count;
+			var snapshot = new SceneSnapshot {
+				ids = new ushort[count],
+				names = new string[count],
+				positions = new float[count * 3],
+				rotations = new float[count * 4],
+				scales = new float[count * 3],
+				bounds = new float[count * 6],
+				visible = new byte[count],
+				selected = new byte[count]
+			};
+			for (int i = 0; i < count; i++) {
+				var mesh = meshes[i];
+				var transform = mesh.transform;
+				var pos = transform.position;
+				var rot = transform.rotation;
+				var scale = transform.localScale;
+				var bounds = mesh.bounds;
+				
+				snapshot.ids[i] = mesh.unique_id;
+				snapshot.names[i] = mesh.gameObject.name;
+				snapshot.positions[3 * i] = pos.x;
+				snapshot.positions[3 * i + 1] = pos.y;
+				snapshot.positions[3 * i + 2] = pos.z;
+				snapshot.rotations[4 * i] = rot.x;
+				snapshot.rotations[4 * i + 1] = rot.y;
+				snapshot.rotations[4 * i + 2] = rot.z;
+				snapshot.rotations[4 * i + 3] = rot.w;
+				snapshot.scales[3 * i] = scale.x;
+				snapshot.scales[3 * i + 1] = scale.y;
+				snapshot.scales[3 * i + 2] = scale.z;
+				snapshot.bounds[6 * i] = bounds.center.x;
+				snapshot.bounds[6 * i + 1] = bounds.center.y;
+				snapshot.bounds[6 * i + 2] = bounds.center.z;
+				snapshot.bounds[6 * i + 3] = bounds.size.x;
+				snapshot.bounds[6 * i + 4] = bounds.size.y;
+				snapshot.bounds[6 * i + 5] = bounds.size.z;
+				snapshot.visible[i] = (byte)(mesh._isVisible ? 1 : 0);
+				snapshot.selected[i] = (byte)(selectedIds.Contains(mesh.unique_id) ? 1 : 0);
+			}
+			return snapshot;
+		}
+		
 		/// <summary>
 		/// Get bounds of all selected meshes
 		/// </summary>
@@ -944,31 +1253,45 @@ namespace spz {
 		}
 		
 		/// <summary>
-		/// Export projection textures
+		/// Export projection textures (to basePath if given, else wherever the user picks)
 		/// </summary>
-		public bool ExportProjectionTextures(bool isDilate = true) {
+		public bool ExportProjectionTextures(bool isDilate = true, string basePath = null) {
 			if (!_isInitialized) return false;
+			if (!IsValidExportPath(basePath)) return false;
 			
 			var saveMGR = Save_MGR.instance;
 			if (saveMGR == null) return false;
 			
-			saveMGR.SaveProjectionTextures(isDilate);
+			saveMGR.SaveProjectionTextures(isDilate, basePath);
 			return true;
 		}
 		
 		/// <summary>
-		/// Export view textures (what camera sees)
+		/// Export view textures (what camera sees), to basePath if given
 		/// </summary>
-		public bool ExportViewTextures() {
+		public bool ExportViewTextures(string basePath = null) {
 			if (!_isInitialized) return false;
+			if (!IsValidExportPath(basePath)) return false;
 			
 			var saveMGR = Save_MGR.instance;
 			if (saveMGR == null) return false;
 			
-			saveMGR.SaveViewTextures();
+			saveMGR.SaveViewTextures(basePath);
 			return true;
 		}
 		
+		/// <summary>
+		/// An export base path must be absolute and in an existing directory (null: ask the user)
+		/// </summary>
+		bool IsValidExportPath(string basePath) {
+			if (string.IsNullOrEmpty(basePath)) return true;
+			try {
+				return Path.IsPathRooted(basePath) && Directory.Exists(Path.GetDirectoryName(basePath));
+			} catch (System.ArgumentException) {
+				return false;
+			}
+		}
+		
 		// ============================================
 		// WORKFLOW MODE OPERATIONS
 		// ============================================
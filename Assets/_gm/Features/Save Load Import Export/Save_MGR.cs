@@ -128,18 +128,22 @@ namespace spz {
 	        }
 	    }
 
-	    public void SaveViewTextures(){ //save whatever the camera is observing (view,depth,normals,etc)
+	    //basePath: save there without asking (used by add-ons). Null or empty shows the save dialog.
+	    public void SaveViewTextures(string basePath=null){ //save whatever the camera is observing (view,depth,normals,etc)
 	        _isSaving = true;
 	        string defaultName = "Tex_StableProjectorz";
+	        if(!string.IsNullOrEmpty(basePath)){ OnSaveViewTextures_PathChosen(basePath,OnReady);  return; }
 	        GetBasePathForTextures(defaultName, onComplete:(path) => OnSaveViewTextures_PathChosen(path,OnReady));
 	        void OnReady() =>_isSaving=false;
 	    }
 
 
 	    //dilation allows to "spread" the texture outwards from uv-chunks. Helps to avoid seams.
-	    public void SaveProjectionTextures(bool isDilate){
+	    //basePath: save there without asking (used by add-ons). Null or empty shows the save dialog.
+	    public void SaveProjectionTextures(bool isDilate, string basePath=null){
 	        _isSaving = true;
 	        string defaultName = "Tex_StableProjectorz";
+	        if(!string.IsNullOrEmpty(basePath)){ OnSaveProjTextures_PathChosen(basePath,isDilate,OnReady);  return; }
 	        GetBasePathForTextures( defaultName, onComplete:(path)=>OnSaveProjTextures_PathChosen(path,isDilate,OnReady) );
         
 	        void OnReady()=> _isSaving = false;